@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from app.api.drive_routes import drive_router
 from app.api.summarize_routes import summarize_router
+from app.api.metrics_routes import metrics_router
 
 
 def register_routes(app: FastAPI):
@@ -11,4 +12,5 @@ def register_routes(app: FastAPI):
         app (FastAPI): The FastAPI application instance.
     """
     app.include_router(drive_router)
-    app.include_router(summarize_router)
\ No newline at end of file
+    app.include_router(summarize_router)
+    app.include_router(metrics_router)
\ No newline at end of file
@@ -0,0 +1,48 @@
+from typing import Optional
+
+from fastapi import Header, HTTPException, Query, Request
+
+from app.services.app_services import AppServices
+from app.services.job_manager import JobManager
+
+
+def get_services(request: Request) -> AppServices:
+    """
+    Return the AppServices created by the application's lifespan handler.
+    """
+    return request.app.state.services
+
+
+def get_job_manager(request: Request) -> JobManager:
+    """
+    Return the shared JobManager.
+    """
+    return get_services(request).job_manager
+
+
+# Accepted values of ?profile= / X-Profile and the profiling mode they select
+PROFILE_FLAGS = {
+    "1": "spans", "true": "spans", "spans": "spans",
+    "cprofile": "cprofile",
+}
+
+
+def get_profile_mode(
+    profile: Optional[str] = Query(
+        default=None, description="Profile this request: 'spans' (or 1/true) or 'cprofile'"
+    ),
+    x_profile: Optional[str] = Header(default=None),
+) -> Optional[str]:
+    """
+    Profiling mode requested by the ?profile= query flag or the X-Profile
+    header, or None when profiling is off.
+    """
+    value = (profile or x_profile or "").strip().lower()
+    if value in ("", "0", "false"):
+        return None
+    if value not in PROFILE_FLAGS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown profile flag: '{value}'. Use 'spans' or 'cprofile'."
+        )
+    return PROFILE_FLAGS[value]
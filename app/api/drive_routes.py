@@ -1,6 +1,7 @@
 import logging
-from fastapi import APIRouter, HTTPException, Query
-from app.clients.drive_client import DriveClient
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.api.dependencies import get_services
+from app.services.app_services import AppServices
 
 logger = logging.getLogger(__name__)
 
@@ -8,13 +9,13 @@ drive_router = APIRouter(prefix="/drive", tags=["Google Drive"])
 
 
 @drive_router.get("/connect")
-def connect():
+def connect(services: AppServices = Depends(get_services)):
     """
     Test Google Drive connection.
     Authenticates using OAuth2 and confirms the connection is working.
     """
     try:
-        DriveClient()
+        services.drive_client
         logger.info("Google Drive connected successfully.")
         return {
             "status": "connected",
@@ -34,7 +35,8 @@ def connect():
 
 
 @drive_router.get("/files")
-def list_files(folder_id: str | None = Query(default=None, description="Google Drive Folder ID")):
+def list_files(folder_id: str | None = Query(default=None, description="Google Drive Folder ID"),
+               services: AppServices = Depends(get_services)):
     """
     List all supported files (.pdf, .docx, .txt) in a Google Drive folder.
     """
@@ -49,8 +51,7 @@ def list_files(folder_id: str | None = Query(default=None, description="Google D
                 detail="Folder ID not provided and not set in config."
             )
 
-        client = DriveClient()
-        files = client.list_files(folder_id)
+        files = services.drive_client.list_files(folder_id)
 
         return {
             "status": "success",
@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.metrics import CONTENT_TYPE, get_registry
+
+metrics_router = APIRouter(tags=["Monitoring"])
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus scrape endpoint: Drive, parse and LLM latency histograms,
+    bytes downloaded, characters extracted and token counters.
+    """
+    return PlainTextResponse(get_registry().render(), media_type=CONTENT_TYPE)
@@ -1,20 +1,32 @@
+import json
 import logging
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Iterator, Optional
+from app.api.dependencies import get_job_manager, get_profile_mode, get_services
+from app.services.app_services import AppServices
+from app.services.job_manager import JobManager
 from app.services.pipeline import Pipeline
+from app.services.profiler import RunProfiler, load_profile
 from app.config import Config
 
 logger = logging.getLogger(__name__)
 
 summarize_router = APIRouter(prefix="/summarize", tags=["Summarizer"])
 
+LAST_RESULTS = []
+
 class SummarizeRequest(BaseModel):
     folder_id: Optional[str] = None
     download_dir: Optional[str] = "downloads"
 
+class JobRequest(SummarizeRequest):
+    backfill: bool = False
+
 @summarize_router.post("")
-def summarize(request: SummarizeRequest):
+def summarize(request: SummarizeRequest, services: AppServices = Depends(get_services),
+              profile_mode: Optional[str] = Depends(get_profile_mode)):
     """
     Trigger the full summarization pipeline for a Google Drive folder.
 
@@ -22,7 +34,10 @@ def summarize(request: SummarizeRequest):
     - Parses text from each document
     - Summarizes each document using OpenAI GPT
     - Returns structured results
+    - With ?profile=spans|cprofile (or the X-Profile header), also returns the
+      run's trace under "profile", saved for GET /summarize/profiles/{run_id}
     """
+    profiler = None
     try:
         folder_id = request.folder_id if request.folder_id else Config.DRIVE_FOLDER_ID
         if not folder_id:
@@ -32,22 +47,23 @@ def summarize(request: SummarizeRequest):
             )
         logger.info(f"Starting pipeline for folder: {folder_id}")
 
-        pipeline = Pipeline(
-            folder_id=folder_id,
-            download_dir=request.download_dir
-        )
-        results = pipeline.run()
+        if profile_mode:
+            profiler = RunProfiler(profile_mode, folder_id=folder_id)
+        pipeline = services.create_pipeline(folder_id, request.download_dir, profiler=profiler)
         results = pipeline.run()
 
         global LAST_RESULTS
         LAST_RESULTS = results
 
+        profile = {"profile": _save_profile(profiler)} if profiler else {}
+
         if not results:
             return {
                 "status": "success",
                 "message": "No supported files found in the specified folder.",
                 "total": 0,
-                "results": []
+                "results": [],
+                **profile
             }
 
         success = [r for r in results if r["status"] == "success"]
@@ -61,24 +77,184 @@ def summarize(request: SummarizeRequest):
             "total": len(results),
             "success_count": len(success),
             "failed_count": len(failed),
-            "results": results
+            "results": results,
+            **profile
         }
 
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        logger.error(f"Pipeline error: {e}")
+        detail = f"Pipeline failed: {str(e)}"
+        if profiler:
+            _save_profile(profiler, e)
+            detail += f" (profile: /summarize/profiles/{profiler.run_id})"
+        raise HTTPException(status_code=500, detail=detail)
+
+
+@summarize_router.post("/stream")
+def summarize_stream(
+    request: SummarizeRequest,
+    format: str = Query(default="ndjson", pattern="^(ndjson|sse)$",
+                        description="ndjson or sse (Server-Sent Events)"),
+    services: AppServices = Depends(get_services),
+    profile_mode: Optional[str] = Depends(get_profile_mode)
+):
+    """
+    Run the pipeline and stream each document's result as soon as it is ready.
+
+    - One record per document: {"type": "result", "file_id": ..., <result dict>}
+    - A final record: {"type": "summary", "total": ..., "success_count": ..., "failed_count": ...}
+    - If the run fails midway: {"type": "error", "detail": ...}
+    - When profiled, the final (summary or error) record carries the trace under "profile"
+    """
+    folder_id = request.folder_id if request.folder_id else Config.DRIVE_FOLDER_ID
+    if not folder_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Folder ID not provided and not set in config."
+        )
+
+    profiler = RunProfiler(profile_mode, folder_id=folder_id) if profile_mode else None
+    try:
+        pipeline = services.create_pipeline(folder_id, request.download_dir, profiler=profiler)
     except Exception as e:
         logger.error(f"Pipeline error: {e}")
         raise HTTPException(status_code=500, detail=f"Pipeline failed: {str(e)}")
 
+    logger.info(f"Streaming pipeline for folder: {folder_id} ({format})")
+    encode = _encode_sse if format == "sse" else _encode_ndjson
+
+    return StreamingResponse(
+        (encode(record) for record in _stream_records(pipeline, folder_id, profiler)),
+        media_type="text/event-stream" if format == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _stream_records(pipeline: Pipeline, folder_id: str,
+                    profiler: Optional[RunProfiler] = None) -> Iterator[Dict]:
+    """
+    Turn pipeline results into stream records, keeping only running counts.
+    """
+    total = success = failed = 0
+
+    try:
+        for file, result in pipeline.iter_results():
+            total += 1
+            if result["status"] == "success":
+                success += 1
+            else:
+                failed += 1
+            yield {"type": "result", "file_id": file.get("id"), **result}
+
+    except Exception as e:
+        logger.error(f"Pipeline error: {e}")
+        profile = {"profile": _save_profile(profiler, e)} if profiler else {}
+        yield {"type": "error", "detail": f"Pipeline failed: {str(e)}", **profile}
+        return
+
+    logger.info(f"Pipeline done. Success: {success} | Failed: {failed}")
+    yield {
+        "type": "summary",
+        "status": "success",
+        "folder_id": folder_id,
+        "total": total,
+        "success_count": success,
+        "failed_count": failed,
+        **({"profile": _save_profile(profiler)} if profiler else {}),
+    }
+
+
+def _save_profile(profiler: RunProfiler, error: Optional[Exception] = None) -> Dict:
+    """
+    Close a run's profile and save it under its run ID.
+    Saving is best-effort: a failure is logged and the trace still returned.
+    """
+    profiler.finish(error)
+    try:
+        return profiler.save()
+    except OSError as e:
+        logger.warning(f"Could not save profile {profiler.run_id}: {e}")
+        return profiler.to_dict()
+
+
+@summarize_router.get("/profiles/{run_id}")
+def get_profile(run_id: str):
+    """
+    Return the saved trace of a profiled run.
+    """
+    trace = load_profile(run_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"Profile not found: {run_id}")
+    return trace
+
+
+def _encode_ndjson(record: Dict) -> str:
+    return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _encode_sse(record: Dict) -> str:
+    return f"event: {record['type']}\ndata: {json.dumps(record, ensure_ascii=False)}\n\n"
+
+
+@summarize_router.post("/jobs", status_code=202)
+def submit_job(request: JobRequest, jobs: JobManager = Depends(get_job_manager)):
+    """
+    Start the summarization pipeline in the background and return a job ID.
+    If a job for the same folder is already running, its ID is returned instead.
+    With backfill=true, documents are summarized through the OpenAI Batch API
+    (cheaper, but can take hours); resubmitting after a restart resumes the batches.
+    """
+    folder_id = request.folder_id if request.folder_id else Config.DRIVE_FOLDER_ID
+    if not folder_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Folder ID not provided and not set in config."
+        )
+
+    job, created = jobs.submit(folder_id, request.download_dir, request.backfill)
+
+    return {
+        "status": job.status,
+        "job_id": job.id,
+        "folder_id": folder_id,
+        "attached": not created,
+        "poll": f"/summarize/jobs/{job.id}"
+    }
+
+
+@summarize_router.get("/jobs/{job_id}")
+def get_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    """
+    Report a job's status, progress and the results produced so far.
+    """
+    job = jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    return job.to_dict()
+
 
 @summarize_router.get("/download/csv")
-def download_csv():
+def download_csv(job_id: Optional[str] = Query(default=None, description="Export a job's results"),
+                 jobs: JobManager = Depends(get_job_manager)):
     import csv, io
     from fastapi.responses import StreamingResponse
 
+    results = LAST_RESULTS
+    if job_id:
+        job = jobs.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        results = job.to_dict()["results"]
+
     output = io.StringIO()
     writer = csv.writer(output)
     writer.writerow(["File Name", "Status", "Summary"])
 
-    for r in LAST_RESULTS:
+    for r in results:
         writer.writerow([
             r.get("file_name") or r.get("name"),
             r.get("status"),
@@ -1,5 +1,10 @@
 import os
+import json
 import logging
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -12,6 +17,222 @@ SCOPES = ["https://www.googleapis.com/auth/drive.readonly"]
 
 GOOGLE_CREDENTIALS_PATH = config.Config.GOOGLE_CREDENTIALS_PATH
 GOOGLE_TOKEN_PATH = config.Config.GOOGLE_TOKEN_PATH
+TOKEN_REFRESH_MARGIN = config.Config.GOOGLE_TOKEN_REFRESH_MARGIN
+
+# Wait before retrying a failed background refresh, and the longest the refresher sleeps
+REFRESH_RETRY_SECONDS = 30
+MAX_REFRESH_WAIT_SECONDS = 3600
+
+
+class SharedCredentials(Credentials):
+    """
+    Credentials shared by every Drive session in the process.
+    Concurrent refreshes are single-flight: the first caller refreshes and
+    the others wait for it instead of hitting the token endpoint again.
+    Every refreshed token is persisted through on_refresh.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._refresh_lock = threading.Lock()
+        self.on_refresh = None
+
+    def refresh(self, request):
+        expiry_before = self.expiry
+        with self._refresh_lock:
+            # Someone else refreshed while we waited for the lock
+            if self.expiry != expiry_before and self.valid:
+                return
+            super().refresh(request)
+            logger.info("Token refreshed successfully.")
+            if self.on_refresh:
+                self.on_refresh(self)
+
+
+class CredentialManager:
+    """
+    Process-wide holder of the Google OAuth2 credentials.
+    The token file is read once; afterwards a background thread refreshes
+    the access token shortly before it expires, so request threads always
+    find a valid token in memory and never wait on a refresh.
+    """
+
+    def __init__(self, credentials_path: str = GOOGLE_CREDENTIALS_PATH,
+                 token_path: str = GOOGLE_TOKEN_PATH,
+                 refresh_margin: float = TOKEN_REFRESH_MARGIN):
+        """
+        Args:
+            credentials_path (str): Path to OAuth2 credentials JSON from Google Cloud Console.
+            token_path (str): Path to save/load the access token.
+            refresh_margin (float): Seconds before expiry at which to refresh.
+        """
+        self.credentials_path = credentials_path
+        self.token_path = token_path
+        self.refresh_margin = refresh_margin
+
+        self._creds: Optional[SharedCredentials] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+
+    def get(self) -> Credentials:
+        """
+        Return the cached credentials, loading them on first use.
+
+        Returns:
+            Credentials: Valid Google OAuth2 credentials object.
+        """
+        creds = self._creds
+        if creds is not None:
+            return creds
+
+        with self._lock:
+            if self._creds is None:
+                self._creds = self._load()
+                self._start_refresher()
+            return self._creds
+
+
+    def stop(self):
+        """
+        Stop the background refresher.
+        """
+        self._stop.set()
+        self._wake.set()
+
+
+    def _load(self) -> SharedCredentials:
+        """
+        Load the saved token, refreshing or re-authenticating if needed.
+        - First run: Opens browser for user login and saves token.
+        - Next runs: Loads saved token and refreshes it if expired.
+        """
+        creds = None
+
+        # Load existing token if available
+        if os.path.exists(self.token_path):
+            creds = SharedCredentials.from_authorized_user_file(self.token_path, SCOPES)
+            logger.info("Loaded existing token from file.")
+
+        if not creds or not (creds.valid or (creds.expired and creds.refresh_token)):
+            if not os.path.exists(self.credentials_path):
+                raise FileNotFoundError(
+                    f"credentials.json not found at: {self.credentials_path}\n"
+                    "Download it from Google Cloud Console > APIs & Services > Credentials."
+                )
+            flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, SCOPES)
+            login = flow.run_local_server(port=0)
+            logger.info("New OAuth2 login completed.")
+            creds = SharedCredentials.from_authorized_user_info(json.loads(login.to_json()), SCOPES)
+            save_token(creds, self.token_path)
+
+        creds.on_refresh = lambda refreshed: save_token(refreshed, self.token_path)
+        if not creds.valid:
+            creds.refresh(Request())
+        return creds
+
+
+    def _start_refresher(self):
+        """
+        Start the background refresh thread (once).
+        """
+        if self._refresher is not None or not self._creds.refresh_token:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name="token-refresher", daemon=True
+        )
+        self._refresher.start()
+
+
+    def _refresh_loop(self):
+        """
+        Sleep until refresh_margin seconds before expiry, then refresh.
+        """
+        request = Request()
+        while not self._stop.is_set():
+            wait = self._seconds_until_refresh()
+            if wait > 0:
+                self._wake.wait(min(wait, MAX_REFRESH_WAIT_SECONDS))
+                self._wake.clear()
+                continue
+
+            try:
+                self._creds.refresh(request)
+            except Exception as e:
+                logger.error(f"Background token refresh failed: {e}")
+                self._wake.wait(REFRESH_RETRY_SECONDS)
+                self._wake.clear()
+
+
+    def _seconds_until_refresh(self) -> float:
+        """
+        Seconds until the token enters the refresh margin (<= 0 means refresh now).
+        """
+        expiry = self._creds.expiry
+        if expiry is None:
+            return MAX_REFRESH_WAIT_SECONDS
+        # google-auth stores expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return (expiry - now).total_seconds() - self.refresh_margin
+
+
+def save_token(creds: Credentials, token_path: str):
+    """
+    Write the token file atomically, so a concurrent reader or a crash
+    never sees a half-written file.
+
+    Args:
+        creds (Credentials): Credentials to persist.
+        token_path (str): Path of the token file.
+    """
+    directory = os.path.dirname(token_path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".token-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as token_file:
+            token_file.write(creds.to_json())
+            token_file.flush()
+            os.fsync(token_file.fileno())
+        os.replace(tmp_path, token_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    logger.info(f"Token saved to: {token_path}")
+
+
+_managers: Dict[str, CredentialManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_credential_manager(
+    credentials_path: str = GOOGLE_CREDENTIALS_PATH,
+    token_path: str = GOOGLE_TOKEN_PATH
+) -> CredentialManager:
+    """
+    Return the process-wide CredentialManager for a token file, creating it on first use.
+
+    Returns:
+        CredentialManager: Shared credential holder.
+    """
+    with _managers_lock:
+        manager = _managers.get(token_path)
+        if manager is None:
+            manager = CredentialManager(credentials_path, token_path)
+            _managers[token_path] = manager
+        return manager
+
+
+def stop_credential_refresh():
+    """
+    Stop every background token refresher.
+    """
+    with _managers_lock:
+        for manager in _managers.values():
+            manager.stop()
+
 
 def get_credentials(
     credentials_path: str =GOOGLE_CREDENTIALS_PATH,
@@ -20,7 +241,7 @@ def get_credentials(
     """
     Authenticate with Google using OAuth2.
     - First run: Opens browser for user login and saves token.
-    - Next runs: Loads saved token and auto-refreshes if expired.
+    - Next runs: Returns the in-memory credentials, kept fresh in the background.
 
     Args:
         credentials_path (str): Path to OAuth2 credentials JSON from Google Cloud Console.
@@ -29,32 +250,4 @@ def get_credentials(
     Returns:
         Credentials: Valid Google OAuth2 credentials object.
     """
-    creds = None
-
-    # Load existing token if available
-    if os.path.exists(token_path):
-        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-        logger.info("Loaded existing token from file.")
-
-    # If no valid credentials, refresh or re-authenticate
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-            logger.info("Token refreshed successfully.")
-        else:
-            if not os.path.exists(credentials_path):
-                raise FileNotFoundError(
-                    f"credentials.json not found at: {credentials_path}\n"
-                    "Download it from Google Cloud Console > APIs & Services > Credentials."
-                )
-            flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
-            creds = flow.run_local_server(port=0)
-            logger.info("New OAuth2 login completed.")
-
-        # Save token for future use
-        os.makedirs(os.path.dirname(token_path), exist_ok=True)
-        with open(token_path, "w") as token_file:
-            token_file.write(creds.to_json())
-        logger.info(f"Token saved to: {token_path}")
-
-    return creds
\ No newline at end of file
+    return get_credential_manager(credentials_path, token_path).get()
@@ -0,0 +1,184 @@
+import json
+import time
+import logging
+from typing import Dict, Optional
+
+from openai import OpenAIError
+
+from app.clients.llm_client import LLMClient
+import app.config as config
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_POLL_INTERVAL     = config.Config.BACKFILL_POLL_INTERVAL
+BACKFILL_COMPLETION_WINDOW = config.Config.BACKFILL_COMPLETION_WINDOW
+
+CHAT_ENDPOINT = "/v1/chat/completions"
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchClient:
+    """
+    OpenAI Batch API client for chat completions.
+    Requests are written to a JSONL file, uploaded and processed offline by
+    OpenAI at a lower price; results are fetched once the batch completes.
+    Shares the OpenAI client and model settings of an LLMClient.
+    """
+
+    def __init__(self, llm_client: Optional[LLMClient] = None,
+                 completion_window: str = BACKFILL_COMPLETION_WINDOW):
+        """
+        Args:
+            llm_client (LLMClient): Client whose connection and model settings are used.
+                                    Creates a new one if not provided.
+            completion_window (str): Batch completion window (OpenAI supports "24h").
+        """
+        self.llm = llm_client or LLMClient()
+        self.client = self.llm.client
+        self.completion_window = completion_window
+
+
+    def request_line(self, custom_id: str, system_prompt: str, user_prompt: str) -> Dict:
+        """
+        Build one JSONL request for the batch input file.
+
+        Args:
+            custom_id (str): Identifier used to match the output back to its input.
+            system_prompt (str): Instructions for the AI role/behavior.
+            user_prompt (str): The actual user message / content to process.
+
+        Returns:
+            Dict: Batch request line.
+        """
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": CHAT_ENDPOINT,
+            "body": {
+                "model": self.llm.model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user",   "content": user_prompt},
+                ],
+                "max_tokens": self.llm.max_tokens,
+                "temperature": self.llm.temperature,
+            },
+        }
+
+
+    def submit(self, input_path: str, metadata: Optional[Dict[str, str]] = None) -> str:
+        """
+        Upload a JSONL input file and start a batch for it.
+
+        Args:
+            input_path (str): Path of the JSONL file of request lines.
+            metadata (Dict[str, str]): Optional labels stored with the batch.
+
+        Returns:
+            str: Batch ID.
+        """
+        try:
+            with open(input_path, "rb") as f:
+                uploaded = self.client.files.create(file=f, purpose="batch")
+            batch = self.client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint=CHAT_ENDPOINT,
+                completion_window=self.completion_window,
+                metadata=metadata,
+            )
+        except OpenAIError as e:
+            logger.error(f"Batch submission failed: {e}")
+            raise RuntimeError(f"Batch submission failed: {e}") from e
+
+        logger.info(f"Batch submitted: {batch.id} (input file {uploaded.id})")
+        return batch.id
+
+
+    def wait(self, batch_id: str, poll_interval: float = BACKFILL_POLL_INTERVAL,
+             timeout: Optional[float] = None):
+        """
+        Poll a batch until it reaches a terminal status.
+        Transient polling errors are logged and retried on the next poll.
+
+        Args:
+            batch_id (str): Batch ID returned by submit.
+            poll_interval (float): Seconds between status checks.
+            timeout (float): Give up after this many seconds (None = wait forever).
+
+        Returns:
+            Batch: The batch object in its final state.
+
+        Raises:
+            RuntimeError: If the timeout expires first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        last_status = None
+
+        while True:
+            try:
+                batch = self.client.batches.retrieve(batch_id)
+            except OpenAIError as e:
+                logger.warning(f"Polling batch {batch_id} failed, will retry: {e}")
+                batch = None
+
+            if batch is not None:
+                if batch.status != last_status:
+                    counts = batch.request_counts
+                    progress = f" ({counts.completed}/{counts.total})" if counts else ""
+                    logger.info(f"Batch {batch_id}: {batch.status}{progress}")
+                    last_status = batch.status
+                if batch.status in TERMINAL_STATUSES:
+                    return batch
+
+            if deadline is not None and time.monotonic() >= deadline:
+                raise RuntimeError(f"Timed out waiting for batch {batch_id}.")
+            time.sleep(poll_interval)
+
+
+    def results(self, batch) -> Dict[str, Dict]:
+        """
+        Download and parse the output and error files of a finished batch.
+
+        Args:
+            batch (Batch): Batch object returned by wait.
+
+        Returns:
+            Dict[str, Dict]: By custom_id, either {"content": str} or {"error": str}.
+                             Requests the batch never processed are absent.
+        """
+        results: Dict[str, Dict] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            try:
+                text = self.client.files.content(file_id).text
+            except OpenAIError as e:
+                raise RuntimeError(f"Could not download batch file {file_id}: {e}") from e
+
+            for line in text.splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    results[record["custom_id"]] = self._parse_record(record)
+
+        return results
+
+
+    @staticmethod
+    def _parse_record(record: Dict) -> Dict:
+        """
+        Turn one output/error line into {"content": ...} or {"error": ...}.
+        """
+        if record.get("error"):
+            return {"error": record["error"].get("message") or str(record["error"])}
+
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            body = response.get("body") or {}
+            message = (body.get("error") or {}).get("message") or f"HTTP {response.get('status_code')}"
+            return {"error": message}
+
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            return {"error": "Malformed batch response."}
+        return {"content": (content or "").strip()}
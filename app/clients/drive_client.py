@@ -1,15 +1,33 @@
-import os
 import io
+import os
+import time
+import queue
+import tempfile
 import logging
-from typing import List, Dict
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, Dict, Optional
 
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload
 
 from app.auth.google_auth import get_credentials
+from app.metrics import DRIVE_DOWNLOADED_BYTES, DRIVE_ERRORS, DRIVE_REQUEST_SECONDS
+import app.config as config
 
 logger = logging.getLogger(__name__)
 
+DOWNLOAD_WORKERS = config.Config.DRIVE_DOWNLOAD_WORKERS
+DOWNLOAD_TIMEOUT = config.Config.DRIVE_DOWNLOAD_TIMEOUT
+DOWNLOAD_CHUNK_SIZE = config.Config.DRIVE_DOWNLOAD_CHUNK_SIZE
+SESSION_POOL_SIZE = config.Config.DRIVE_SESSION_POOL_SIZE
+API_ENDPOINT = config.Config.DRIVE_API_ENDPOINT or None
+NUM_RETRIES = config.Config.DRIVE_NUM_RETRIES
+IN_MEMORY_MAX_BYTES = config.Config.DOWNLOAD_IN_MEMORY_MAX_BYTES
+
 
 SUPPORTED_MIME_TYPES = {
     "application/pdf": ".pdf",
@@ -18,19 +36,101 @@ SUPPORTED_MIME_TYPES = {
 }
 
 
+class DriveSessionPool:
+    """
+    Thread-safe pool of Drive API sessions.
+    Each session is a Drive service with its own authorized httplib2
+    transport (which is not thread-safe), so a session is only ever used by
+    one thread at a time and is reused afterwards instead of rebuilt.
+    """
+
+    def __init__(self, credentials, max_size: int = SESSION_POOL_SIZE,
+                 timeout: Optional[float] = DOWNLOAD_TIMEOUT,
+                 api_endpoint: Optional[str] = API_ENDPOINT):
+        """
+        Args:
+            credentials: Google OAuth2 credentials shared by every session.
+            max_size (int): Maximum number of sessions; borrowers wait when all are in use.
+            timeout (float): Socket timeout in seconds for each session's transport.
+            api_endpoint (str): Optional Drive API base URL, e.g. a local fake server's
+                                "http://127.0.0.1:8001/drive/v3/".
+        """
+        self.credentials = credentials
+        self.api_endpoint = api_endpoint
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+
+    @contextmanager
+    def session(self):
+        """
+        Borrow a Drive service for the duration of the with-block.
+        """
+        service = self._acquire()
+        try:
+            yield service
+        finally:
+            self._idle.put(service)
+
+
+    def _acquire(self):
+        """
+        Return an idle session, build a new one if under max_size, or wait.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.max_size
+            if create:
+                self._created += 1
+
+        if create:
+            try:
+                http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+                options = {"api_endpoint": self.api_endpoint} if self.api_endpoint else None
+                service = build(
+                    "drive", "v3", http=http, cache_discovery=False, client_options=options
+                )
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+            logger.debug(f"Drive session created ({self._created}/{self.max_size}).")
+            return service
+
+        return self._idle.get()
+
+
 class DriveClient:
     """
     Google Drive client.
     Uses credentials from google_auth.py to list and download documents.
+    Safe to share between threads: every call borrows a session from a pool.
     """
 
-    def __init__(self):
+    def __init__(self, credentials=None, pool_size: int = SESSION_POOL_SIZE,
+                 api_endpoint: Optional[str] = API_ENDPOINT):
         """
         Initialize DriveClient by getting credentials from google_auth
-        and building the Drive API service.
+        and preparing a pool of Drive API sessions.
+
+        Args:
+            credentials: Optional Google credentials. Loaded via get_credentials if omitted.
+            pool_size (int): Maximum number of concurrent Drive sessions.
+            api_endpoint (str): Optional Drive API base URL (e.g. a local fake server).
         """
-        creds = get_credentials()
-        self.service = build("drive", "v3", credentials=creds)
+        self.creds = credentials or get_credentials()
+        self.sessions = DriveSessionPool(self.creds, max_size=pool_size, api_endpoint=api_endpoint)
+
+        # Build the first session now so configuration errors surface immediately
+        with self.sessions.session():
+            pass
         logger.info("Google Drive service initialized.")
 
 
@@ -42,7 +142,8 @@ class DriveClient:
             folder_id (str): Google Drive folder ID.
 
         Returns:
-            List[Dict]: List of file metadata dicts (id, name, mimeType, extension).
+            List[Dict]: List of file metadata dicts (id, name, mimeType, extension,
+                        md5Checksum, modifiedTime, size).
         """
         mime_query = " or ".join(
             [f"mimeType='{mime}'" for mime in SUPPORTED_MIME_TYPES.keys()]
@@ -53,60 +154,69 @@ class DriveClient:
         page_token = None
 
         try:
-            while True:
-                response = self.service.files().list(
-                    q=query,
-                    spaces="drive",
-                    fields="nextPageToken, files(id, name, mimeType)",
-                    pageToken=page_token
-                ).execute()
-
-                for file in response.get("files", []):
-                    file["extension"] = SUPPORTED_MIME_TYPES.get(file["mimeType"], "")
-                    files.append(file)
-                    logger.debug(f"Found: {file['name']} ({file['mimeType']})")
-
-                page_token = response.get("nextPageToken")
-                if not page_token:
-                    break
+            with DRIVE_REQUEST_SECONDS.time(operation="list_files"), \
+                    self.sessions.session() as service:
+                while True:
+                    response = service.files().list(
+                        q=query,
+                        spaces="drive",
+                        fields="nextPageToken, files(id, name, mimeType, md5Checksum, modifiedTime, size)",
+                        pageToken=page_token
+                    ).execute(num_retries=NUM_RETRIES)
+
+                    for file in response.get("files", []):
+                        file["extension"] = SUPPORTED_MIME_TYPES.get(file["mimeType"], "")
+                        files.append(file)
+                        logger.debug(f"Found: {file['name']} ({file['mimeType']})")
+
+                    page_token = response.get("nextPageToken")
+                    if not page_token:
+                        break
 
             logger.info(f"Total files found in folder '{folder_id}': {len(files)}")
             return files
 
         except Exception as e:
+            DRIVE_ERRORS.inc(operation="list_files")
             logger.error(f"Error listing files: {e}")
             raise RuntimeError(f"Failed to list files from Google Drive: {e}") from e
 
 
     def download_file(self, file_id: str, file_name: str,
-                      download_dir: str = "downloads") -> str:
+                      download_dir: str = "downloads",
+                      timeout: Optional[float] = None,
+                      chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> str:
         """
         Download a single file from Google Drive.
+        Chunks are streamed into a temporary file next to the target,
+        which is renamed into place once complete, so memory use stays
+        at one chunk and a partial download never replaces a good file.
+        The file is saved as <file_id><extension>, so same-named files (or
+        concurrent runs sharing download_dir) never overwrite each other.
 
         Args:
             file_id (str): Google Drive file ID.
-            file_name (str): Name to save file as locally.
+            file_name (str): Drive file name (its extension is kept).
             download_dir (str): Local folder to save the file.
+            timeout (float): Optional time limit in seconds for the whole download.
+            chunk_size (int): Bytes requested per chunk.
 
         Returns:
             str: Local file path of the downloaded file.
         """
         os.makedirs(download_dir, exist_ok=True)
-        local_path = os.path.join(download_dir, file_name)
+        local_path = os.path.join(download_dir, file_id + os.path.splitext(file_name)[1])
+        deadline = time.monotonic() + timeout if timeout else None
+        tmp_path = None
 
         try:
-            request = self.service.files().get_media(fileId=file_id)
-            buffer = io.BytesIO()
-            downloader = MediaIoBaseDownload(buffer, request)
+            fd, tmp_path = tempfile.mkstemp(dir=download_dir, prefix=".download-", suffix=".part")
 
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-                if status:
-                    logger.debug(f"Downloading '{file_name}': {int(status.progress() * 100)}%")
+            with os.fdopen(fd, "wb") as f:
+                self._stream_media(file_id, file_name, f, deadline, timeout, chunk_size)
 
-            with open(local_path, "wb") as f:
-                f.write(buffer.getvalue())
+            os.replace(tmp_path, local_path)
+            tmp_path = None
 
             logger.info(f"Downloaded: '{file_name}' -> {local_path}")
             return local_path
@@ -115,16 +225,79 @@ class DriveClient:
             logger.error(f"Error downloading '{file_name}': {e}")
             raise RuntimeError(f"Failed to download file: {e}") from e
 
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+    def download_bytes(self, file_id: str, file_name: str,
+                       timeout: Optional[float] = None,
+                       chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> bytes:
+        """
+        Download a single file from Google Drive into memory, skipping the disk.
+
+        Args:
+            file_id (str): Google Drive file ID.
+            file_name (str): File name, used in logs.
+            timeout (float): Optional time limit in seconds for the whole download.
+            chunk_size (int): Bytes requested per chunk.
+
+        Returns:
+            bytes: The file content.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        buffer = io.BytesIO()
+
+        try:
+            self._stream_media(file_id, file_name, buffer, deadline, timeout, chunk_size)
+        except Exception as e:
+            logger.error(f"Error downloading '{file_name}': {e}")
+            raise RuntimeError(f"Failed to download file: {e}") from e
+
+        logger.info(f"Downloaded: '{file_name}' -> memory ({buffer.tell()} bytes)")
+        return buffer.getvalue()
+
+
+    def _stream_media(self, file_id: str, file_name: str, fh: BinaryIO,
+                      deadline: Optional[float], timeout: Optional[float], chunk_size: int):
+        """
+        Write a file's content into fh chunk by chunk on a pooled Drive session,
+        checking the deadline between chunks.
+        """
+        start = fh.tell()
+        try:
+            with DRIVE_REQUEST_SECONDS.time(operation="download"), \
+                    self.sessions.session() as service:
+                request = service.files().get_media(fileId=file_id)
+                downloader = MediaIoBaseDownload(fh, request, chunksize=chunk_size)
+
+                done = False
+                while not done:
+                    if deadline and time.monotonic() > deadline:
+                        raise TimeoutError(f"Download exceeded {timeout}s")
+                    status, done = downloader.next_chunk(num_retries=NUM_RETRIES)
+                    if status:
+                        logger.debug(f"Downloading '{file_name}': {int(status.progress() * 100)}%")
+        except Exception:
+            DRIVE_ERRORS.inc(operation="download")
+            raise
+        finally:
+            DRIVE_DOWNLOADED_BYTES.inc(max(0, fh.tell() - start))
+
 
 
     def download_all_files(self, folder_id: str,
-                           download_dir: str = "downloads") -> List[Dict]:
+                           download_dir: str = "downloads",
+                           max_workers: int = DOWNLOAD_WORKERS,
+                           timeout: Optional[float] = DOWNLOAD_TIMEOUT) -> List[Dict]:
         """
         List and download all supported files from a Drive folder.
 
         Args:
             folder_id (str): Google Drive folder ID.
             download_dir (str): Local directory to save files.
+            max_workers (int): Number of parallel downloads (1 = sequential).
+            timeout (float): Per-file download time limit in seconds.
 
         Returns:
             List[Dict]: File metadata with added 'local_path' key.
@@ -135,18 +308,91 @@ class DriveClient:
             logger.warning(f"No supported files found in folder: {folder_id}")
             return []
 
+        return self.download_files(files, download_dir, max_workers, timeout)
+
+
+    def download_files(self, files: List[Dict],
+                       download_dir: str = "downloads",
+                       max_workers: int = DOWNLOAD_WORKERS,
+                       timeout: Optional[float] = DOWNLOAD_TIMEOUT,
+                       in_memory: bool = False) -> List[Dict]:
+        """
+        Download already-listed files.
+        With max_workers > 1 files are downloaded in parallel, each download
+        using its own pooled Drive session. Results keep the listing order.
+
+        Args:
+            files (List[Dict]): File metadata dicts from list_files.
+            download_dir (str): Local directory to save files.
+            max_workers (int): Number of parallel downloads (1 = sequential).
+            timeout (float): Per-file download time limit in seconds.
+            in_memory (bool): Keep file content in memory (see download_entry).
+
+        Returns:
+            List[Dict]: File metadata with added 'local_path' or 'content' key.
+        """
+        if not files:
+            return []
+
         downloaded = []
-        for file in files:
-            try:
-                local_path = self.download_file(
+        if max_workers <= 1:
+            for file in files:
+                if self.download_entry(file, download_dir, timeout, in_memory):
+                    downloaded.append(file)
+        else:
+            workers = min(max_workers, len(files))
+            logger.info(f"Downloading {len(files)} files with {workers} workers.")
+            with ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="drive-download"
+            ) as executor:
+                futures = [
+                    executor.submit(self.download_entry, file, download_dir, timeout, in_memory)
+                    for file in files
+                ]
+                # Collect in submission order so output stays deterministic
+                for file, future in zip(files, futures):
+                    if future.result():
+                        downloaded.append(file)
+
+        logger.info(f"Downloaded {len(downloaded)}/{len(files)} files.")
+        return downloaded
+
+
+    def download_entry(self, file: Dict, download_dir: str,
+                       timeout: Optional[float] = None,
+                       in_memory: bool = False) -> bool:
+        """
+        Download one listed file and record its 'local_path', or with in_memory
+        its 'content' bytes. Files larger than IN_MEMORY_MAX_BYTES (per the
+        listed size) always go to disk.
+        Failures are logged and skipped so one bad file does not stop the batch.
+
+        Args:
+            file (Dict): File metadata from list_files.
+            download_dir (str): Local directory to save the file.
+            timeout (float): Per-file download time limit in seconds.
+            in_memory (bool): Download into memory instead of download_dir.
+
+        Returns:
+            bool: True if the file was downloaded.
+        """
+        try:
+            if in_memory and int(file.get("size") or 0) <= IN_MEMORY_MAX_BYTES:
+                file["content"] = self.download_bytes(
                     file_id=file["id"],
                     file_name=file["name"],
-                    download_dir=download_dir
+                    timeout=timeout
                 )
-                file["local_path"] = local_path
-                downloaded.append(file)
-            except RuntimeError as e:
-                logger.warning(f"Skipping '{file['name']}': {e}")
-
-        logger.info(f"Downloaded {len(downloaded)}/{len(files)} files.")
-        return downloaded
\ No newline at end of file
+                return True
+
+            file["local_path"] = self.download_file(
+                file_id=file["id"],
+                file_name=file["name"],
+                download_dir=download_dir,
+                timeout=timeout
+            )
+            return True
+        except RuntimeError as e:
+            logger.warning(f"Skipping '{file['name']}': {e}")
+            return False
@@ -1,9 +1,19 @@
 import os
+import time
+import asyncio
 import logging
-from typing import Optional
+import threading
+from contextlib import nullcontext
+from typing import Dict, Optional
 
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from openai import AuthenticationError, RateLimitError, APIConnectionError, OpenAIError
+from app.clients.rate_limiter import (
+    AdaptiveConcurrencyController, AsyncRateLimiter, RateBudget,
+    get_concurrency_controller, get_default_limiter, get_rate_budget,
+)
+from app.clients.retry import RetryBudget, is_retryable, retry_delay, server_retry_hint
+from app.metrics import LLM_ERRORS, LLM_REQUEST_SECONDS, record_llm_usage
 import app.config as config
 
 logger = logging.getLogger(__name__)
@@ -12,6 +22,14 @@ OPENAI_API_KEY = config.Config.OPENAI_API_KEY
 OPENAI_MODEL = config.Config.OPENAI_MODEL
 OPENAI_MAX_TOKENS = config.Config.OPENAI_MAX_TOKENS
 OPENAI_TEMPERATURE = config.Config.OPENAI_TEMPERATURE
+OPENAI_BASE_URL = config.Config.OPENAI_BASE_URL or None
+LLM_MAX_RETRIES = config.Config.LLM_MAX_RETRIES
+LLM_RETRY_BASE_DELAY = config.Config.LLM_RETRY_BASE_DELAY
+LLM_RETRY_MAX_DELAY = config.Config.LLM_RETRY_MAX_DELAY
+LLM_ADAPTIVE_CONCURRENCY = config.Config.LLM_ADAPTIVE_CONCURRENCY
+
+# Rough size of a summary, used to reserve token budget before the response arrives
+COMPLETION_TOKEN_ESTIMATE = 600
 
 class LLMClient:
     """
@@ -26,6 +44,10 @@ class LLMClient:
         model: str = OPENAI_MODEL,
         max_tokens: int = OPENAI_MAX_TOKENS,
         temperature: float = OPENAI_TEMPERATURE,
+        base_url: Optional[str] = OPENAI_BASE_URL,
+        max_retries: int = LLM_MAX_RETRIES,
+        concurrency: Optional[AdaptiveConcurrencyController] = None,
+        budget: Optional[RateBudget] = None,
     ):
         """
         Initialize the OpenAI client.
@@ -35,6 +57,13 @@ class LLMClient:
             model (str): GPT model to use.
             max_tokens (int): Max tokens for the response.
             temperature (float): Sampling temperature.
+            base_url (str): Optional OpenAI-compatible endpoint (e.g. a local fake server).
+            max_retries (int): Retries per call for rate-limit, connection and 5xx errors.
+            concurrency (AdaptiveConcurrencyController): Cap on in-flight calls.
+                Defaults to the model's shared controller when
+                LLM_ADAPTIVE_CONCURRENCY is on (no cap otherwise).
+            budget (RateBudget): Requests/tokens-per-minute budget to draw from.
+                Defaults to the process-wide one.
         """
         self.api_key = api_key
 
@@ -47,50 +76,290 @@ class LLMClient:
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
-        self.client = OpenAI(api_key=self.api_key)
+        self.max_retries = max_retries
+        self.retry_stats = RetryStats()
+        if concurrency is None and LLM_ADAPTIVE_CONCURRENCY:
+            concurrency = get_concurrency_controller(model)
+        self.concurrency = concurrency
+        self.budget = budget or get_rate_budget()
+        # Retries are handled here (with server hints and budgets), not by the SDK
+        self.client = OpenAI(api_key=self.api_key, base_url=base_url, max_retries=0)
 
         logger.info(f"LLMClient initialized with model: {self.model}")
 
-    def chat(self, system_prompt: str, user_prompt: str) -> str:
+    def chat(self, system_prompt: str, user_prompt: str,
+             retry_budget: Optional[RetryBudget] = None,
+             response_format: Optional[Dict] = None) -> str:
         """
         Send a chat request to OpenAI and return the response text.
+        Rate-limit, connection and server errors are retried with backoff,
+        honouring Retry-After / x-ratelimit-reset-* headers. Calls wait for
+        the requests/tokens-per-minute budget and then for a slot of the
+        adaptive concurrency controller, which is fed the x-ratelimit-remaining-*
+        headers, latency and 429s of each attempt. Budget waits happen outside
+        the slot, so throttled calls do not count as in flight.
 
         Args:
             system_prompt (str): Instructions for the AI role/behavior.
             user_prompt (str): The actual user message / content to process.
+            retry_budget (RetryBudget): Optional retry allowance shared across a run.
+            response_format (Dict): Optional structured-output setting,
+                                    e.g. {"type": "json_object"}.
 
         Returns:
             str: The model's response text.
         """
-        try:
-            logger.info(f"Sending request to OpenAI model: {self.model}")
-
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user",   "content": user_prompt},
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
+        extra = {"response_format": response_format} if response_format else {}
+        estimated = estimate_tokens(system_prompt + user_prompt) + min(
+            self.max_tokens, COMPLETION_TOKEN_ESTIMATE
+        )
+        attempt = 0
+        while True:
+            try:
+                self.budget.wait(estimated)
+                with self.concurrency.acquire() if self.concurrency else nullcontext():
+                    logger.info(f"Sending request to OpenAI model: {self.model}")
+
+                    start = time.perf_counter()
+                    with LLM_REQUEST_SECONDS.time(model=self.model):
+                        raw = self.client.chat.completions.with_raw_response.create(
+                            model=self.model,
+                            messages=[
+                                {"role": "system", "content": system_prompt},
+                                {"role": "user",   "content": user_prompt},
+                            ],
+                            max_tokens=self.max_tokens,
+                            temperature=self.temperature,
+                            **extra,
+                        )
+                    latency = time.perf_counter() - start
+
+                response = raw.parse()
+                if self.concurrency:
+                    self.concurrency.record_success(raw.headers, latency)
+                if response.usage:
+                    self.budget.reconcile(estimated, response.usage.total_tokens)
+                self.budget.record_success()
+                record_llm_usage(self.model, response.usage)
+
+                result = response.choices[0].message.content.strip()
+                logger.info("OpenAI response received successfully.")
+                return result
+
+            except OpenAIError as e:
+                LLM_ERRORS.inc(model=self.model)
+                if isinstance(e, RateLimitError):
+                    self.budget.record_rate_limited(server_retry_hint(e))
+                    if self.concurrency:
+                        self.concurrency.record_rate_limited()
+
+                delay = _next_retry_delay(e, attempt, self.max_retries, retry_budget)
+                if delay is None:
+                    raise _translate_error(e)
+
+                self.retry_stats.record(delay)
+                attempt += 1
+                time.sleep(delay)
+
+
+class AsyncLLMClient:
+    """
+    Async counterpart of LLMClient built on AsyncOpenAI.
+    Every call goes through a shared AsyncRateLimiter, so many documents can be
+    in flight at once without exceeding the requests/tokens-per-minute budgets.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = OPENAI_API_KEY,
+        model: str = OPENAI_MODEL,
+        max_tokens: int = OPENAI_MAX_TOKENS,
+        temperature: float = OPENAI_TEMPERATURE,
+        base_url: Optional[str] = OPENAI_BASE_URL,
+        limiter: Optional[AsyncRateLimiter] = None,
+        max_retries: int = LLM_MAX_RETRIES,
+    ):
+        """
+        Initialize the async OpenAI client.
+
+        Args:
+            api_key (str): OpenAI API key. Defaults to OPENAI_API_KEY env variable.
+            model (str): GPT model to use.
+            max_tokens (int): Max tokens for the response.
+            temperature (float): Sampling temperature.
+            base_url (str): Optional OpenAI-compatible endpoint (e.g. a local fake server).
+            limiter (AsyncRateLimiter): Limiter to share. Defaults to the limiter of
+                                        the event loop each call runs on.
+            max_retries (int): Retries per call for rate-limit, connection and 5xx errors.
+        """
+        self.api_key = api_key
+
+        if not self.api_key:
+            raise ValueError(
+                "OpenAI API key not found. "
+                "Set OPENAI_API_KEY in your .env file or pass it directly."
             )
 
-            result = response.choices[0].message.content.strip()
-            logger.info("OpenAI response received successfully.")
-            return result
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self._limiter = limiter
+        self.max_retries = max_retries
+        self.retry_stats = RetryStats()
+        # Rate limiting and retries are handled here, not by the SDK
+        self.client = AsyncOpenAI(api_key=self.api_key, base_url=base_url, max_retries=0)
+
+        logger.info(f"AsyncLLMClient initialized with model: {self.model}")
+
+    @property
+    def limiter(self) -> AsyncRateLimiter:
+        """
+        The limiter given at construction, or the running loop's shared one.
+        """
+        return self._limiter or get_default_limiter()
+
+    async def chat(self, system_prompt: str, user_prompt: str,
+                   retry_budget: Optional[RetryBudget] = None) -> str:
+        """
+        Send a chat request to OpenAI and return the response text.
+        Waits for the shared limiter before sending and retries like LLMClient.chat.
+
+        Args:
+            system_prompt (str): Instructions for the AI role/behavior.
+            user_prompt (str): The actual user message / content to process.
+            retry_budget (RetryBudget): Optional retry allowance shared across a run.
+
+        Returns:
+            str: The model's response text.
+        """
+        estimated = estimate_tokens(system_prompt + user_prompt) + min(
+            self.max_tokens, COMPLETION_TOKEN_ESTIMATE
+        )
+
+        limiter = self.limiter
+        attempt = 0
+        while True:
+            try:
+                async with limiter.acquire(estimated):
+                    logger.info(f"Sending async request to OpenAI model: {self.model}")
+
+                    with LLM_REQUEST_SECONDS.time(model=self.model):
+                        response = await self.client.chat.completions.create(
+                            model=self.model,
+                            messages=[
+                                {"role": "system", "content": system_prompt},
+                                {"role": "user",   "content": user_prompt},
+                            ],
+                            max_tokens=self.max_tokens,
+                            temperature=self.temperature,
+                        )
+                record_llm_usage(self.model, response.usage)
+
+                if response.usage:
+                    limiter.reconcile(estimated, response.usage.total_tokens)
+                limiter.record_success()
 
-        except AuthenticationError:
-            logger.error("Invalid OpenAI API key.")
-            raise ValueError("Invalid OpenAI API key. Please check your OPENAI_API_KEY.")
+                result = response.choices[0].message.content.strip()
+                logger.info("OpenAI response received successfully.")
+                return result
+
+            except OpenAIError as e:
+                LLM_ERRORS.inc(model=self.model)
+                if isinstance(e, RateLimitError):
+                    limiter.record_rate_limited(server_retry_hint(e))
+
+                delay = _next_retry_delay(e, attempt, self.max_retries, retry_budget)
+                if delay is None:
+                    raise _translate_error(e)
+
+                self.retry_stats.record(delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+
+class RetryStats:
+    """
+    Thread-safe counters of retries taken by a client and the time spent backing off.
+    """
+
+    def __init__(self):
+        self.retries = 0
+        self.backoff_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, delay: float):
+        """
+        Record one retry and its delay.
+        """
+        with self._lock:
+            self.retries += 1
+            self.backoff_seconds += delay
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (about 4 characters per token for English text).
+
+    Args:
+        text (str): Prompt text.
+
+    Returns:
+        int: Estimated token count.
+    """
+    return len(text) // 4 + 1
+
+
+def _next_retry_delay(error: OpenAIError, attempt: int, max_retries: int,
+                      retry_budget: Optional[RetryBudget]) -> Optional[float]:
+    """
+    Decide whether a failed call should be retried and how long to wait.
+
+    Args:
+        error (OpenAIError): Error raised by the attempt.
+        attempt (int): Zero-based number of the failed attempt.
+        max_retries (int): Per-call retry limit.
+        retry_budget (RetryBudget): Optional run-wide retry allowance.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None to give up.
+    """
+    if not is_retryable(error) or attempt >= max_retries:
+        return None
+
+    delay = retry_delay(error, attempt, LLM_RETRY_BASE_DELAY, LLM_RETRY_MAX_DELAY)
+
+    if retry_budget is not None and not retry_budget.try_consume(delay):
+        logger.warning("Run retry budget exhausted; not retrying OpenAI call.")
+        return None
+
+    logger.warning(
+        f"OpenAI call failed ({type(error).__name__}); "
+        f"retry {attempt + 1}/{max_retries} in {delay:.2f}s"
+    )
+    return delay
+
+
+def _translate_error(error: OpenAIError) -> Exception:
+    """
+    Map an OpenAI SDK error to the exception raised by the clients.
+
+    Args:
+        error (OpenAIError): Final error after retries.
+
+    Returns:
+        Exception: ValueError for bad credentials, RuntimeError otherwise.
+    """
+    if isinstance(error, AuthenticationError):
+        logger.error("Invalid OpenAI API key.")
+        return ValueError("Invalid OpenAI API key. Please check your OPENAI_API_KEY.")
 
-        except RateLimitError:
-            logger.error("OpenAI rate limit exceeded.")
-            raise RuntimeError("OpenAI rate limit exceeded. Please wait and try again.")
+    if isinstance(error, RateLimitError):
+        logger.error("OpenAI rate limit exceeded.")
+        return RuntimeError("OpenAI rate limit exceeded. Please wait and try again.")
 
-        except APIConnectionError:
-            logger.error("Failed to connect to OpenAI API.")
-            raise RuntimeError("Could not connect to OpenAI API. Check your internet connection.")
+    if isinstance(error, APIConnectionError):
+        logger.error("Failed to connect to OpenAI API.")
+        return RuntimeError("Could not connect to OpenAI API. Check your internet connection.")
 
-        except OpenAIError as e:
-            logger.error(f"OpenAI API error: {e}")
-            raise RuntimeError(f"OpenAI API error: {e}") from e
\ No newline at end of file
+    logger.error(f"OpenAI API error: {error}")
+    return RuntimeError(f"OpenAI API error: {error}")
@@ -0,0 +1,472 @@
+import time
+import asyncio
+import logging
+import weakref
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Iterator, Mapping, Optional
+
+import app.config as config
+from app.metrics import LLM_CONCURRENCY_LIMIT, LLM_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+LLM_MAX_CONCURRENCY     = config.Config.LLM_MAX_CONCURRENCY
+LLM_REQUESTS_PER_MINUTE = config.Config.LLM_REQUESTS_PER_MINUTE
+LLM_TOKENS_PER_MINUTE   = config.Config.LLM_TOKENS_PER_MINUTE
+LLM_MIN_CONCURRENCY     = config.Config.LLM_MIN_CONCURRENCY
+LLM_INITIAL_CONCURRENCY = config.Config.LLM_INITIAL_CONCURRENCY
+
+# Adaptive backoff: each 429 halves the allowed rate (at most once per
+# cooldown window); every success wins back a small step.
+MIN_SCALE          = 0.1
+DECREASE_FACTOR    = 0.5
+INCREASE_STEP      = 0.02
+DECREASE_COOLDOWN  = 5.0
+
+# Adaptive concurrency (AIMD): below LOW_HEADROOM of the quota left, the limit
+# shrinks by HEADROOM_DECREASE_FACTOR (a 429 uses DECREASE_FACTOR). It only
+# grows while the smoothed latency stays within LATENCY_TOLERANCE of the best
+# seen over the last LATENCY_WINDOW responses (a windowed minimum, so one early
+# fast call does not pin the baseline while document sizes vary).
+LOW_HEADROOM              = 0.1
+HEADROOM_DECREASE_FACTOR  = 0.75
+LATENCY_TOLERANCE         = 2.0
+LATENCY_SMOOTHING         = 0.2
+LATENCY_WINDOW            = 50
+
+
+class TokenBucket:
+    """
+    Continuously refilled token bucket holding up to one minute of budget.
+    """
+
+    def __init__(self, per_minute: float):
+        """
+        Args:
+            per_minute (float): Budget refilled every minute (also the bucket capacity).
+        """
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, scale: float = 1.0):
+        """
+        Add the budget accrued since the last refill.
+
+        Args:
+            scale (float): Fraction of the nominal rate currently allowed.
+        """
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated) * self.capacity / 60.0 * scale
+        )
+        self.updated = now
+
+    def wait_time(self, amount: float, scale: float = 1.0) -> float:
+        """
+        Seconds until `amount` is available at the current (scaled) rate.
+        """
+        missing = amount - self.tokens
+        if missing <= 0:
+            return 0.0
+        return missing / (self.capacity / 60.0 * scale)
+
+
+class RateBudget:
+    """
+    Thread-safe requests-per-minute and tokens-per-minute budget shared by
+    every LLM call in the process, sync and async alike. Both budgets are
+    scaled down when the API answers with 429 and slowly restored after
+    successful calls.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+    ):
+        """
+        Args:
+            requests_per_minute (int): Request budget per minute.
+            tokens_per_minute (int): Token budget (prompt + completion) per minute.
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.scale = 1.0
+        self.rate_limited = 0
+
+        self._last_decrease = 0.0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, estimated_tokens: int) -> float:
+        """
+        Debit one request and the estimated tokens if both are available now.
+
+        Args:
+            estimated_tokens (int): Expected prompt + completion tokens.
+
+        Returns:
+            float: 0 once debited, otherwise the seconds to wait before trying
+            again (nothing is debited).
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            amount = min(float(estimated_tokens), self.tokens.capacity)
+            self.requests.refill(self.scale)
+            self.tokens.refill(self.scale)
+            delay = max(
+                self.requests.wait_time(1, self.scale),
+                self.tokens.wait_time(amount, self.scale)
+            )
+            if delay == 0:
+                self.requests.tokens -= 1
+                self.tokens.tokens -= amount
+            return delay
+
+    def wait(self, estimated_tokens: int):
+        """
+        Block the calling thread until reserve() succeeds.
+
+        Args:
+            estimated_tokens (int): Expected prompt + completion tokens.
+        """
+        while True:
+            delay = self.reserve(estimated_tokens)
+            if delay == 0:
+                return
+            time.sleep(delay)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int):
+        """
+        Correct the token bucket once the real usage is known.
+
+        Args:
+            estimated_tokens (int): Amount debited by reserve().
+            actual_tokens (int): Tokens reported in response.usage.
+        """
+        with self._lock:
+            self.tokens.tokens -= actual_tokens - min(estimated_tokens, self.tokens.capacity)
+
+    def record_success(self):
+        """
+        Slowly restore the allowed rate after successful calls.
+        """
+        with self._lock:
+            if self.scale < 1.0:
+                self.scale = min(1.0, self.scale + INCREASE_STEP)
+
+    def record_rate_limited(self, retry_after: Optional[float] = None):
+        """
+        Back off after a 429: scale the budgets down and pause new requests.
+
+        Args:
+            retry_after (float): Seconds the server asked us to wait, if given.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.rate_limited += 1
+
+            if now - self._last_decrease >= DECREASE_COOLDOWN:
+                self.scale = max(MIN_SCALE, self.scale * DECREASE_FACTOR)
+                self._last_decrease = now
+                logger.warning(f"Rate limited by OpenAI; LLM budgets scaled to {self.scale:.2f}.")
+
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+
+
+class AsyncRateLimiter:
+    """
+    Limiter for async LLM calls on one event loop.
+    Enforces a concurrency cap (scaled down with the budget after 429s) plus
+    the process-wide requests/tokens-per-minute RateBudget. Its asyncio
+    primitives belong to one loop, so get_default_limiter keeps one per loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        budget: Optional[RateBudget] = None,
+    ):
+        """
+        Args:
+            max_concurrency (int): Maximum requests in flight.
+            budget (RateBudget): Budget to draw from. Defaults to the process-wide one.
+        """
+        self.max_concurrency = max_concurrency
+        self.budget = budget or get_rate_budget()
+        self.in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def concurrency_limit(self) -> int:
+        """
+        Current cap on in-flight requests after adaptive scaling.
+        """
+        return max(1, int(self.max_concurrency * self.budget.scale))
+
+    @asynccontextmanager
+    async def acquire(self, estimated_tokens: int):
+        """
+        Wait for a concurrency slot and enough request/token budget.
+
+        Args:
+            estimated_tokens (int): Expected prompt + completion tokens.
+        """
+        condition = self._get_condition()
+
+        async with condition:
+            while True:
+                if self.in_flight >= self.concurrency_limit:
+                    delay = None
+                else:
+                    delay = self.budget.reserve(estimated_tokens)
+                    if delay == 0:
+                        break
+
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            self.in_flight += 1
+
+        try:
+            yield
+        finally:
+            async with condition:
+                self.in_flight -= 1
+                condition.notify_all()
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int):
+        """
+        Correct the shared token budget once the real usage is known.
+        """
+        self.budget.reconcile(estimated_tokens, actual_tokens)
+
+    def record_success(self):
+        self.budget.record_success()
+
+    def record_rate_limited(self, retry_after: Optional[float] = None):
+        self.budget.record_rate_limited(retry_after)
+
+    def _get_condition(self) -> asyncio.Condition:
+        """
+        Create the condition lazily so the limiter can be built outside a loop.
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+
+class AdaptiveConcurrencyController:
+    """
+    Thread-safe, self-tuning cap on in-flight sync LLM calls.
+    Works like TCP congestion control (AIMD): every healthy response adds
+    1/limit to the limit (about +1 per round of calls), while a 429 halves it
+    and a response whose x-ratelimit-remaining-* headers show the quota nearly
+    used cuts it by a quarter. Growth pauses while latency is well above the
+    best observed recently, since a slowing API is usually close to its limits.
+    The current limit and in-flight count are exported as metrics.
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        min_limit: int = LLM_MIN_CONCURRENCY,
+        max_limit: int = LLM_MAX_CONCURRENCY,
+        initial_limit: int = LLM_INITIAL_CONCURRENCY,
+    ):
+        """
+        Args:
+            name (str): Label of the exported metrics (the model name).
+            min_limit (int): Lowest allowed limit.
+            max_limit (int): Highest allowed limit.
+            initial_limit (int): Limit before any feedback arrives.
+        """
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.in_flight = 0
+        self.rate_limited = 0
+
+        self._latency: Optional[float] = None
+        self._recent_latencies = deque(maxlen=LATENCY_WINDOW)
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+        LLM_CONCURRENCY_LIMIT.set(self.concurrency_limit, model=self.name)
+
+    @property
+    def concurrency_limit(self) -> int:
+        """
+        Current cap on in-flight requests.
+        """
+        return int(self.limit)
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        """
+        Block until fewer than concurrency_limit calls are in flight, and
+        hold a slot for the duration of the with-block.
+        """
+        with self._condition:
+            while self.in_flight >= self.concurrency_limit:
+                self._condition.wait()
+            self.in_flight += 1
+            LLM_IN_FLIGHT.set(self.in_flight, model=self.name)
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                LLM_IN_FLIGHT.set(self.in_flight, model=self.name)
+                self._condition.notify_all()
+
+    def record_success(self, headers: Optional[Mapping[str, str]], latency: float):
+        """
+        Feed back a successful response.
+
+        Args:
+            headers (Mapping[str, str]): Response headers (x-ratelimit-* are read).
+            latency (float): Seconds the call took.
+        """
+        headroom = ratelimit_headroom(headers)
+
+        with self._condition:
+            if self._latency is None:
+                self._latency = latency
+            else:
+                self._latency += LATENCY_SMOOTHING * (latency - self._latency)
+            self._recent_latencies.append(self._latency)
+            baseline = min(self._recent_latencies)
+
+            if headroom is not None and headroom < LOW_HEADROOM:
+                self._decrease(HEADROOM_DECREASE_FACTOR, f"quota headroom {headroom:.0%}")
+            elif self._latency <= baseline * LATENCY_TOLERANCE:
+                self._set_limit(self.limit + 1.0 / self.limit)
+
+    def record_rate_limited(self):
+        """
+        Feed back a 429: halve the limit (at most once per cooldown window).
+        """
+        with self._condition:
+            self.rate_limited += 1
+            self._decrease(DECREASE_FACTOR, "rate limited")
+
+    def _decrease(self, factor: float, reason: str):
+        """
+        Multiplicative decrease; callers hold the condition.
+        One burst of bad responses counts once, as they reflect the same limit.
+        """
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self._set_limit(self.limit * factor)
+        logger.warning(
+            f"LLM concurrency for {self.name} lowered to {self.concurrency_limit} ({reason})."
+        )
+
+    def _set_limit(self, limit: float):
+        """
+        Clamp and apply a new limit; callers hold the condition.
+        """
+        self.limit = min(max(limit, float(self.min_limit)), float(self.max_limit))
+        LLM_CONCURRENCY_LIMIT.set(self.concurrency_limit, model=self.name)
+        self._condition.notify_all()
+
+
+def ratelimit_headroom(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    Fraction of the request or token quota still available, whichever is
+    lower, from the x-ratelimit-remaining-* / x-ratelimit-limit-* headers.
+
+    Args:
+        headers (Mapping[str, str]): Response headers.
+
+    Returns:
+        Optional[float]: Remaining fraction (0-1), or None if the headers are missing.
+    """
+    if not headers:
+        return None
+
+    fractions = []
+    for kind in ("requests", "tokens"):
+        try:
+            remaining = float(headers.get(f"x-ratelimit-remaining-{kind}"))
+            limit = float(headers.get(f"x-ratelimit-limit-{kind}"))
+        except (TypeError, ValueError):
+            continue
+        if limit > 0:
+            fractions.append(max(0.0, remaining / limit))
+    return min(fractions) if fractions else None
+
+
+_default_budget: Optional[RateBudget] = None
+_default_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncRateLimiter]" = (
+    weakref.WeakKeyDictionary()
+)
+_defaults_lock = threading.Lock()
+_controllers: Dict[str, AdaptiveConcurrencyController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_rate_budget() -> RateBudget:
+    """
+    Return the process-wide requests/tokens-per-minute budget.
+
+    Returns:
+        RateBudget: Shared budget built from Config.
+    """
+    global _default_budget
+    with _defaults_lock:
+        if _default_budget is None:
+            _default_budget = RateBudget()
+        return _default_budget
+
+
+def get_default_limiter() -> AsyncRateLimiter:
+    """
+    Return the limiter of the running event loop, shared by the
+    AsyncLLMClient calls on it. All loops draw from the same RateBudget.
+    Must be called from a coroutine.
+
+    Returns:
+        AsyncRateLimiter: The loop's limiter, built from Config on first use.
+    """
+    loop = asyncio.get_running_loop()
+    budget = get_rate_budget()
+    with _defaults_lock:
+        limiter = _default_limiters.get(loop)
+        if limiter is None:
+            limiter = AsyncRateLimiter(budget=budget)
+            _default_limiters[loop] = limiter
+        return limiter
+
+
+def get_concurrency_controller(model: str) -> AdaptiveConcurrencyController:
+    """
+    Return the process-wide adaptive controller for a model.
+    Quotas are per model, so each model gets its own controller.
+
+    Args:
+        model (str): Model name.
+
+    Returns:
+        AdaptiveConcurrencyController: Shared controller built from Config.
+    """
+    with _controllers_lock:
+        controller = _controllers.get(model)
+        if controller is None:
+            controller = AdaptiveConcurrencyController(name=model)
+            _controllers[model] = controller
+        return controller
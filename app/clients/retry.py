@@ -0,0 +1,154 @@
+import re
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from openai import RateLimitError, APIConnectionError, InternalServerError, APIStatusError
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+# Matches the duration format used by x-ratelimit-reset-* headers, e.g. "1s", "6m0s", "20ms"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class RetryBudget:
+    """
+    Thread-safe retry allowance shared by every LLM call in one pipeline run,
+    plus a record of each backoff delay taken.
+    """
+
+    def __init__(self, max_retries: int):
+        """
+        Args:
+            max_retries (int): Total retries allowed across the run.
+        """
+        self.max_retries = max_retries
+        self.delays: List[float] = []
+        self._lock = threading.Lock()
+
+    @property
+    def used(self) -> int:
+        """
+        Number of retries taken so far.
+        """
+        return len(self.delays)
+
+    @property
+    def total_delay(self) -> float:
+        """
+        Total seconds spent backing off.
+        """
+        return sum(self.delays)
+
+    def try_consume(self, delay: float) -> bool:
+        """
+        Take one retry from the budget and record its delay.
+
+        Args:
+            delay (float): Backoff delay about to be slept.
+
+        Returns:
+            bool: False if the budget is exhausted.
+        """
+        with self._lock:
+            if len(self.delays) >= self.max_retries:
+                return False
+            self.delays.append(delay)
+            return True
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Whether an OpenAI error is worth retrying (429, connection errors, 5xx).
+    """
+    return isinstance(error, RETRYABLE_ERRORS)
+
+
+def retry_delay(error: Exception, attempt: int,
+                base_delay: float, max_delay: float) -> float:
+    """
+    Compute how long to wait before the next attempt.
+    A server hint (Retry-After / retry-after-ms / x-ratelimit-reset-*) wins;
+    otherwise exponential backoff with full jitter is used.
+
+    Args:
+        error (Exception): The error raised by the failed attempt.
+        attempt (int): Zero-based number of the failed attempt.
+        base_delay (float): Backoff for the first retry, in seconds.
+        max_delay (float): Upper bound on any single delay, in seconds.
+
+    Returns:
+        float: Delay in seconds.
+    """
+    hint = server_retry_hint(error)
+    if hint is not None:
+        # A little jitter keeps concurrent callers from retrying in lockstep
+        return min(max_delay, hint + random.uniform(0, 0.1 * hint + 0.05))
+
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def server_retry_hint(error: Exception) -> Optional[float]:
+    """
+    Read the wait time the server asked for, in seconds.
+
+    Args:
+        error (Exception): OpenAI error, possibly carrying an HTTP response.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the response gave no hint.
+    """
+    if not isinstance(error, APIStatusError):
+        return None
+
+    headers = error.response.headers
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000.0)
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after)
+                return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+            except (TypeError, ValueError):
+                pass
+
+    resets = [
+        parse_duration(headers.get(name))
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+    ]
+    resets = [r for r in resets if r is not None]
+    return max(resets) if resets else None
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parse durations such as "1s", "6m0s", "20ms" or "1h2m3.5s" into seconds.
+
+    Args:
+        value (str): Header value.
+
+    Returns:
+        Optional[float]: Seconds, or None if the value is missing or malformed.
+    """
+    if not value:
+        return None
+
+    parts = _DURATION_PART.findall(value.strip())
+    if not parts or "".join(n + u for n, u in parts) != value.strip():
+        return None
+    return sum(float(n) * _DURATION_UNITS[u] for n, u in parts)
@@ -24,14 +24,94 @@ class Config:
     OPENAI_MODEL        = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     OPENAI_MAX_TOKENS   = int(os.getenv("OPENAI_MAX_TOKENS", 128000))
     OPENAI_TEMPERATURE  = float(os.getenv("OPENAI_TEMPERATURE", 0.4))
+    OPENAI_BASE_URL     = os.getenv("OPENAI_BASE_URL", "")
+
+    LLM_MAX_CONCURRENCY     = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+    LLM_REQUESTS_PER_MINUTE = int(os.getenv("LLM_REQUESTS_PER_MINUTE", 500))
+    LLM_TOKENS_PER_MINUTE   = int(os.getenv("LLM_TOKENS_PER_MINUTE", 200000))
+
+    LLM_ADAPTIVE_CONCURRENCY = os.getenv("LLM_ADAPTIVE_CONCURRENCY", "true").lower() == "true"
+    LLM_MIN_CONCURRENCY      = int(os.getenv("LLM_MIN_CONCURRENCY", 1))
+    LLM_INITIAL_CONCURRENCY  = int(os.getenv("LLM_INITIAL_CONCURRENCY", 4))
+
+    LLM_MAX_RETRIES         = int(os.getenv("LLM_MAX_RETRIES", 5))
+    LLM_RUN_RETRY_BUDGET    = int(os.getenv("LLM_RUN_RETRY_BUDGET", 100))
+    LLM_RETRY_BASE_DELAY    = float(os.getenv("LLM_RETRY_BASE_DELAY", 1.0))
+    LLM_RETRY_MAX_DELAY     = float(os.getenv("LLM_RETRY_MAX_DELAY", 60.0))
+
+    SUMMARY_MODE            = os.getenv("SUMMARY_MODE", "truncate").lower()
+    SUMMARY_CHUNK_CHARS     = int(os.getenv("SUMMARY_CHUNK_CHARS", 12000))
+    SUMMARY_CHUNK_OVERLAP   = int(os.getenv("SUMMARY_CHUNK_OVERLAP", 500))
+    SUMMARY_CHUNK_WORKERS   = int(os.getenv("SUMMARY_CHUNK_WORKERS", 4))
+
+    # Pack several small documents into one request (staged pipeline only)
+    SUMMARY_PACK_ENABLED      = os.getenv("SUMMARY_PACK_ENABLED", "false").lower() == "true"
+    SUMMARY_PACK_DOC_MAX_CHARS = int(os.getenv("SUMMARY_PACK_DOC_MAX_CHARS", 2000))
+    SUMMARY_PACK_MAX_CHARS    = int(os.getenv("SUMMARY_PACK_MAX_CHARS", 12000))
+    SUMMARY_PACK_MAX_DOCS     = int(os.getenv("SUMMARY_PACK_MAX_DOCS", 8))
+    SUMMARY_PACK_LINGER       = float(os.getenv("SUMMARY_PACK_LINGER", 0.5))
+
+    NEAR_DUPLICATE_ENABLED     = os.getenv("NEAR_DUPLICATE_ENABLED", "false").lower() == "true"
+    NEAR_DUPLICATE_THRESHOLD   = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", 0.9))
+    NEAR_DUPLICATE_MAX_ENTRIES = int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", 10000))
+    NEAR_DUPLICATE_CROSS_FOLDER = os.getenv("NEAR_DUPLICATE_CROSS_FOLDER", "false").lower() == "true"
+    NEAR_DUPLICATE_WAIT_TIMEOUT = float(os.getenv("NEAR_DUPLICATE_WAIT_TIMEOUT", 60))
+
+    SUMMARY_CACHE_ENABLED   = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+    SUMMARY_CACHE_PATH      = os.getenv("SUMMARY_CACHE_PATH", "cache/summaries.db")
+    SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", 50 * 1024 * 1024))
 
 
     GOOGLE_CREDENTIALS_PATH = os.getenv("GOOGLE_CREDENTIALS_PATH", "credentials/credentials.json")
     GOOGLE_TOKEN_PATH        = os.getenv("GOOGLE_TOKEN_PATH", "credentials/token.json")
+    GOOGLE_TOKEN_REFRESH_MARGIN = int(os.getenv("GOOGLE_TOKEN_REFRESH_MARGIN", 300))
     DRIVE_FOLDER_ID          = os.getenv("DRIVE_FOLDER_ID", "")
 
 
     DOWNLOAD_DIR = os.getenv("DOWNLOAD_DIR", "downloads")
+    DRIVE_DOWNLOAD_WORKERS = int(os.getenv("DRIVE_DOWNLOAD_WORKERS", 4))
+    DRIVE_DOWNLOAD_TIMEOUT = float(os.getenv("DRIVE_DOWNLOAD_TIMEOUT", 300))
+    DRIVE_DOWNLOAD_CHUNK_SIZE = int(os.getenv("DRIVE_DOWNLOAD_CHUNK_SIZE", 8 * 1024 * 1024))
+    DRIVE_SESSION_POOL_SIZE = int(os.getenv("DRIVE_SESSION_POOL_SIZE", 8))
+    DRIVE_API_ENDPOINT      = os.getenv("DRIVE_API_ENDPOINT", "")
+    DRIVE_NUM_RETRIES       = int(os.getenv("DRIVE_NUM_RETRIES", 5))
+
+    # Download into memory and parse from the buffer (no files in DOWNLOAD_DIR)
+    DOWNLOAD_IN_MEMORY           = os.getenv("DOWNLOAD_IN_MEMORY", "false").lower() == "true"
+    DOWNLOAD_IN_MEMORY_MAX_BYTES = int(os.getenv("DOWNLOAD_IN_MEMORY_MAX_BYTES", 64 * 1024 * 1024))
+
+    INCREMENTAL_SYNC  = os.getenv("INCREMENTAL_SYNC", "true").lower() == "true"
+    SYNC_MANIFEST_DIR = os.getenv("SYNC_MANIFEST_DIR", "manifests")
+
+    PIPELINE_STAGED            = os.getenv("PIPELINE_STAGED", "true").lower() == "true"
+    PIPELINE_DOWNLOAD_WORKERS  = int(os.getenv("PIPELINE_DOWNLOAD_WORKERS", DRIVE_DOWNLOAD_WORKERS))
+    PIPELINE_PARSE_WORKERS     = int(os.getenv("PIPELINE_PARSE_WORKERS", 2))
+    PIPELINE_SUMMARIZE_WORKERS = int(os.getenv("PIPELINE_SUMMARIZE_WORKERS", 4))
+    PIPELINE_QUEUE_SIZE        = int(os.getenv("PIPELINE_QUEUE_SIZE", 8))
+
+    PARSE_MODE                = os.getenv("PARSE_MODE", "inline").lower()
+    PARSE_WORKERS             = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 2))
+    PARSE_TIMEOUT             = float(os.getenv("PARSE_TIMEOUT", 120))
+    PARSE_MEMORY_LIMIT_MB     = int(os.getenv("PARSE_MEMORY_LIMIT_MB", 1024))
+    PARSE_MAX_TASKS_PER_CHILD = int(os.getenv("PARSE_MAX_TASKS_PER_CHILD", 50))
+
+    # Compressed cache of extracted text, keyed by Drive file ID + md5Checksum
+    PARSE_CACHE_ENABLED   = os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+    PARSE_CACHE_PATH      = os.getenv("PARSE_CACHE_PATH", "cache/parsed.db")
+    PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+
+    # Where traces of profiled requests (?profile= / X-Profile) are saved
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+    JOB_WORKERS       = int(os.getenv("JOB_WORKERS", 2))
+    JOB_HISTORY_LIMIT = int(os.getenv("JOB_HISTORY_LIMIT", 100))
+
+    # Offline backfill through the OpenAI Batch API
+    BACKFILL_STATE_DIR         = os.getenv("BACKFILL_STATE_DIR", "backfill")
+    BACKFILL_POLL_INTERVAL     = float(os.getenv("BACKFILL_POLL_INTERVAL", 30))
+    BACKFILL_MAX_REQUESTS      = int(os.getenv("BACKFILL_MAX_REQUESTS", 50000))
+    BACKFILL_MAX_FILE_BYTES    = int(os.getenv("BACKFILL_MAX_FILE_BYTES", 190 * 1024 * 1024))
+    BACKFILL_COMPLETION_WINDOW = os.getenv("BACKFILL_COMPLETION_WINDOW", "24h")
 
 
     @classmethod
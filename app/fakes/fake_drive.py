@@ -0,0 +1,172 @@
+import re
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+
+# Folder id out of a files().list query like "'<folder>' in parents and (...)"
+_PARENT_QUERY = re.compile(r"'([^']+)' in parents")
+_RANGE = re.compile(r"bytes=(\d+)-(\d*)")
+
+
+class FakeDriveState:
+    """
+    Files, behaviour knobs and counters for the fake Drive server.
+    """
+
+    def __init__(self, latency: float = 0.0, rate_limit_every: int = 0,
+                 retry_after: float = 1.0, page_size: int = 100):
+        """
+        Args:
+            latency (float): Seconds to wait before answering each request.
+            rate_limit_every (int): Answer every N-th request with a 429 (0 = never).
+            retry_after (float): Value of the Retry-After header on injected 429s.
+            page_size (int): Files per files().list page.
+        """
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.page_size = max(1, page_size)
+
+        # folder id -> [file id], file id -> {"metadata": dict, "content": bytes}
+        self.folders: Dict[str, List[str]] = {}
+        self.files: Dict[str, Dict] = {}
+
+        self.requests = 0
+        self.rate_limited = 0
+        self.bytes_served = 0
+        self._lock = threading.Lock()
+
+
+    def add_file(self, folder_id: str, name: str, mime_type: str, content: bytes,
+                 file_id: Optional[str] = None) -> Dict:
+        """
+        Put a file into a folder.
+
+        Args:
+            folder_id (str): Folder the file is listed under.
+            name (str): File name.
+            mime_type (str): MIME type (decides the extension the client assigns).
+            content (bytes): File content served by get_media.
+            file_id (str): Optional ID; derived from the folder and name if omitted.
+
+        Returns:
+            Dict: The file metadata as files().list returns it.
+        """
+        file_id = file_id or hashlib.sha1(f"{folder_id}/{name}".encode()).hexdigest()[:28]
+        metadata = {
+            "id": file_id,
+            "name": name,
+            "mimeType": mime_type,
+            "md5Checksum": hashlib.md5(content).hexdigest(),
+            "modifiedTime": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+            "size": str(len(content)),
+        }
+        with self._lock:
+            self.files[file_id] = {"metadata": metadata, "content": content}
+            self.folders.setdefault(folder_id, []).append(file_id)
+        return metadata
+
+
+def create_fake_drive_app(state: FakeDriveState = None) -> FastAPI:
+    """
+    Build a minimal Drive v3 API serving files().list and files().get_media
+    (with Range requests, as MediaIoBaseDownload sends them), with optional
+    latency and injected 429 responses.
+    Point a DriveClient at it with api_endpoint=f"{server.url}/drive/v3/".
+
+    Args:
+        state (FakeDriveState): Shared files/behaviour/counters. Created if not given.
+
+    Returns:
+        FastAPI: The fake API; `app.state.fake` holds the FakeDriveState.
+    """
+    state = state or FakeDriveState()
+    app = FastAPI(title="Fake Google Drive")
+    app.state.fake = state
+
+    async def throttle() -> Optional[Response]:
+        """
+        Count the request, apply latency, and return a 429 response if one is due.
+        """
+        with state._lock:
+            state.requests += 1
+            limited = state.rate_limit_every and state.requests % state.rate_limit_every == 0
+            if limited:
+                state.rate_limited += 1
+
+        if state.latency:
+            await asyncio.sleep(state.latency)
+
+        if limited:
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": str(state.retry_after)},
+                content={"error": {
+                    "code": 429,
+                    "message": "User rate limit exceeded (fake server).",
+                    "errors": [{"reason": "userRateLimitExceeded"}],
+                }},
+            )
+        return None
+
+    @app.get("/drive/v3/files")
+    async def list_files(q: str = Query(default=""),
+                         pageToken: Optional[str] = Query(default=None),
+                         pageSize: Optional[int] = Query(default=None)):
+        limited = await throttle()
+        if limited:
+            return limited
+
+        match = _PARENT_QUERY.search(q)
+        with state._lock:
+            file_ids = list(state.folders.get(match.group(1), [])) if match else []
+            listed = [state.files[file_id]["metadata"] for file_id in file_ids]
+
+        size = pageSize or state.page_size
+        start = int(pageToken or 0)
+        body = {"kind": "drive#fileList", "files": listed[start:start + size]}
+        if start + size < len(listed):
+            body["nextPageToken"] = str(start + size)
+        return body
+
+    @app.get("/drive/v3/files/{file_id}")
+    async def get_file(file_id: str, request: Request, alt: str = Query(default="json")):
+        limited = await throttle()
+        if limited:
+            return limited
+
+        stored = state.files.get(file_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail=f"File not found: {file_id}")
+        if alt != "media":
+            return stored["metadata"]
+
+        content = stored["content"]
+        total = len(content)
+        match = _RANGE.fullmatch(request.headers.get("range", ""))
+        if not match:
+            with state._lock:
+                state.bytes_served += total
+            return Response(content=content, media_type="application/octet-stream")
+
+        start = int(match.group(1))
+        end = min(int(match.group(2)) if match.group(2) else total - 1, total - 1)
+        if start >= total:
+            return Response(status_code=416, headers={"content-range": f"bytes */{total}"})
+
+        chunk = content[start:end + 1]
+        with state._lock:
+            state.bytes_served += len(chunk)
+        return Response(
+            content=chunk,
+            status_code=206,
+            media_type="application/octet-stream",
+            headers={"content-range": f"bytes {start}-{end}/{total}"},
+        )
+
+    return app
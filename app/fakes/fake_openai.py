@@ -0,0 +1,315 @@
+import re
+import json
+import time
+import uuid
+import asyncio
+import threading
+from collections import deque
+from typing import Dict, Tuple
+
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import JSONResponse, Response
+
+# Document headers used by packed summarization prompts
+_PACKED_DOCUMENT = re.compile(r"^=== Document: (.+) ===$", re.MULTILINE)
+
+
+class FakeOpenAIState:
+    """
+    Behaviour knobs and counters for the fake OpenAI server.
+    """
+
+    def __init__(self, latency: float = 0.0, rate_limit_every: int = 0,
+                 retry_after: float = 1.0, batch_delay: float = 0.0,
+                 requests_per_minute: int = 0, batch_status: str = "completed"):
+        """
+        Args:
+            latency (float): Seconds to wait before answering each chat request.
+            rate_limit_every (int): Answer every N-th request with a 429 (0 = never).
+            retry_after (float): Value of the Retry-After header on injected 429s.
+            batch_delay (float): Seconds a batch stays in_progress before completing.
+            requests_per_minute (int): Sliding-window request quota, reported in
+                x-ratelimit-*-requests headers and enforced with 429s (0 = none).
+            batch_status (str): Status batches finish in; any other than
+                "completed" (e.g. "failed", "expired") processes no requests.
+        """
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.batch_delay = batch_delay
+        self.requests_per_minute = requests_per_minute
+        self.batch_status = batch_status
+        # Arrival times of chat requests counted against the quota
+        self.window = deque()
+
+        # Batch API storage: file id -> {"filename", "purpose", "content"}, batch id -> batch object
+        self.files = {}
+        self.batches = {}
+        # custom_ids whose batch request should fail
+        self.fail_custom_ids = set()
+
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+
+def create_fake_openai_app(state: FakeOpenAIState = None) -> FastAPI:
+    """
+    Build a minimal OpenAI-compatible API serving /v1/chat/completions and
+    the Batch API (/v1/files, /v1/batches).
+    Replies are deterministic and derived from the prompt, with usage counts,
+    optional latency and injected 429 responses. Batches run in a background
+    thread and complete after batch_delay seconds.
+
+    Args:
+        state (FakeOpenAIState): Shared behaviour/counters. Created if not given.
+
+    Returns:
+        FastAPI: The fake API; `app.state.fake` holds the FakeOpenAIState.
+    """
+    state = state or FakeOpenAIState()
+    app = FastAPI(title="Fake OpenAI")
+    app.state.fake = state
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+
+        with state._lock:
+            state.requests += 1
+            headers, over_quota = _quota_headers(state)
+            throttle = over_quota or (
+                state.rate_limit_every
+                and state.requests % state.rate_limit_every == 0
+            )
+            if throttle:
+                state.rate_limited += 1
+            else:
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+
+        if throttle:
+            return JSONResponse(
+                status_code=429,
+                headers={"retry-after": str(state.retry_after), **headers},
+                content={"error": {
+                    "message": "Rate limit reached (fake server).",
+                    "type": "requests",
+                    "code": "rate_limit_exceeded",
+                }},
+            )
+
+        try:
+            if state.latency:
+                await asyncio.sleep(state.latency)
+            return JSONResponse(content=fake_completion(body), headers=headers)
+        finally:
+            with state._lock:
+                state.in_flight -= 1
+
+    @app.post("/v1/files")
+    async def upload_file(file: UploadFile = File(...), purpose: str = Form(...)):
+        content = await file.read()
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        with state._lock:
+            state.files[file_id] = {
+                "filename": file.filename, "purpose": purpose, "content": content
+            }
+        return _file_object(file_id, state.files[file_id])
+
+    @app.get("/v1/files/{file_id}/content")
+    async def file_content(file_id: str):
+        stored = state.files.get(file_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail=f"No such file: {file_id}")
+        return Response(content=stored["content"], media_type="application/octet-stream")
+
+    @app.post("/v1/batches")
+    async def create_batch(request: Request):
+        body = await request.json()
+        if body.get("input_file_id") not in state.files:
+            raise HTTPException(status_code=400, detail="Unknown input_file_id.")
+
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex[:24]}",
+            "object": "batch",
+            "endpoint": body.get("endpoint"),
+            "input_file_id": body["input_file_id"],
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "validating",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": body.get("metadata"),
+        }
+        with state._lock:
+            state.batches[batch["id"]] = batch
+        threading.Thread(target=_run_batch, args=(state, batch["id"]), daemon=True).start()
+        return batch
+
+    @app.get("/v1/batches/{batch_id}")
+    async def retrieve_batch(batch_id: str):
+        with state._lock:
+            batch = state.batches.get(batch_id)
+            if batch is None:
+                raise HTTPException(status_code=404, detail=f"No such batch: {batch_id}")
+            return dict(batch)
+
+    return app
+
+
+def _quota_headers(state: FakeOpenAIState) -> Tuple[Dict[str, str], bool]:
+    """
+    Count a chat request against the per-minute quota and build the
+    x-ratelimit-*-requests headers. Called with the state lock held.
+
+    Returns:
+        Tuple[Dict[str, str], bool]: The headers, and whether the request is
+        over quota (such requests are not counted).
+    """
+    if not state.requests_per_minute:
+        return {}, False
+
+    now = time.monotonic()
+    while state.window and now - state.window[0] >= 60.0:
+        state.window.popleft()
+
+    over_quota = len(state.window) >= state.requests_per_minute
+    if not over_quota:
+        state.window.append(now)
+
+    reset = 60.0 - (now - state.window[0]) if state.window else 0.0
+    return {
+        "x-ratelimit-limit-requests": str(state.requests_per_minute),
+        "x-ratelimit-remaining-requests": str(state.requests_per_minute - len(state.window)),
+        "x-ratelimit-reset-requests": f"{reset:.3f}s",
+    }, over_quota
+
+
+def _file_object(file_id: str, stored: dict) -> dict:
+    return {
+        "id": file_id,
+        "object": "file",
+        "bytes": len(stored["content"]),
+        "created_at": int(time.time()),
+        "filename": stored["filename"],
+        "purpose": stored["purpose"],
+        "status": "processed",
+    }
+
+
+def _run_batch(state: FakeOpenAIState, batch_id: str):
+    """
+    Execute a fake batch: answer every JSONL request, then store the output
+    (and error) files and mark the batch completed.
+    """
+    with state._lock:
+        batch = state.batches[batch_id]
+        batch["status"] = "in_progress"
+        lines = state.files[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+
+    if state.batch_delay:
+        time.sleep(state.batch_delay)
+
+    if state.batch_status != "completed":
+        with state._lock:
+            batch["request_counts"] = {"total": len(lines), "completed": 0, "failed": 0}
+            batch["status"] = state.batch_status
+        return
+
+    outputs, errors = [], []
+    for line in lines:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        custom_id = request.get("custom_id")
+        if custom_id in state.fail_custom_ids:
+            errors.append({
+                "id": f"batch_req_{uuid.uuid4().hex[:24]}",
+                "custom_id": custom_id,
+                "response": None,
+                "error": {"code": "server_error", "message": "Injected failure (fake server)."},
+            })
+            continue
+        outputs.append({
+            "id": f"batch_req_{uuid.uuid4().hex[:24]}",
+            "custom_id": custom_id,
+            "response": {
+                "status_code": 200,
+                "request_id": uuid.uuid4().hex,
+                "body": fake_completion(request.get("body", {})),
+            },
+            "error": None,
+        })
+
+    with state._lock:
+        for key, records in (("output_file_id", outputs), ("error_file_id", errors)):
+            if not records:
+                continue
+            file_id = f"file-{uuid.uuid4().hex[:24]}"
+            state.files[file_id] = {
+                "filename": f"{batch_id}_{key}.jsonl",
+                "purpose": "batch_output",
+                "content": "".join(json.dumps(r) + "\n" for r in records).encode("utf-8"),
+            }
+            batch[key] = file_id
+        batch["request_counts"] = {
+            "total": len(outputs) + len(errors),
+            "completed": len(outputs),
+            "failed": len(errors),
+        }
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time.time())
+
+
+def fake_completion(body: dict) -> dict:
+    """
+    Build a chat.completion response for a request body.
+    With response_format json_object, packed prompts are answered with a JSON
+    object holding one summary per '=== Document: <name> ===' section.
+
+    Args:
+        body (dict): Chat completions request payload.
+
+    Returns:
+        dict: Response payload in the OpenAI format.
+    """
+    messages = body.get("messages", [])
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    user_text = str(messages[-1].get("content", "")) if messages else ""
+
+    if (body.get("response_format") or {}).get("type") == "json_object":
+        sections = _PACKED_DOCUMENT.split(user_text)[1:]
+        content = json.dumps({
+            name: _fake_summary(text) for name, text in zip(sections[::2], sections[1::2])
+        })
+    else:
+        content = _fake_summary(user_text)
+
+    prompt_tokens = len(prompt) // 4 + 1
+    completion_tokens = len(content) // 4 + 1
+
+    return {
+        "id": f"chatcmpl-fake-{time.monotonic_ns()}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake-model"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": "stop",
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def _fake_summary(text: str) -> str:
+    words = text.split()
+    return "Summary: " + " ".join(words[-40:]) if words else "Summary: (empty)"
@@ -0,0 +1,78 @@
+import time
+import socket
+import logging
+import threading
+
+import uvicorn
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundServer:
+    """
+    Run a FastAPI app with uvicorn on a free local port in a background thread.
+
+    Usage:
+        with BackgroundServer(app) as server:
+            client = LLMClient(base_url=f"{server.url}/v1")
+    """
+
+    def __init__(self, app: FastAPI, host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            app (FastAPI): Application to serve.
+            host (str): Interface to bind.
+            port (int): Port to bind; 0 picks a free one.
+        """
+        self.host = host
+        self.port = port or _free_port(host)
+        self.server = uvicorn.Server(
+            uvicorn.Config(app, host=self.host, port=self.port, log_level="warning")
+        )
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL of the running server.
+        """
+        return f"http://{self.host}:{self.port}"
+
+    def start(self, timeout: float = 10.0):
+        """
+        Start serving and wait until the server accepts connections.
+        """
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Fake server did not start on {self.url}")
+            time.sleep(0.01)
+        logger.info(f"Fake server listening on {self.url}")
+
+    def stop(self):
+        """
+        Ask uvicorn to shut down and wait for the thread to exit.
+        """
+        self.server.should_exit = True
+        if self._thread:
+            self._thread.join(timeout=10)
+
+    def __enter__(self) -> "BackgroundServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _free_port(host: str) -> int:
+    """
+    Ask the OS for an unused TCP port.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
@@ -1,11 +1,13 @@
 import logging
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from app.config import Config
 from app.api import register_routes
+from app.services.app_services import AppServices
 
 
 logging.basicConfig(
@@ -17,6 +19,23 @@ logger = logging.getLogger(__name__)
 
 templates = Jinja2Templates(directory="app/templates")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the shared clients once at startup and release them at shutdown.
+    """
+    services = AppServices()
+    services.warm_up()
+    app.state.services = services
+    logger.info("Document Summarizer API started.")
+
+    yield
+
+    services.shutdown()
+    logger.info("Document Summarizer API shutting down.")
+
+
 def create_app() -> FastAPI:
     """
     Create and configure the FastAPI application.
@@ -29,7 +48,8 @@ def create_app() -> FastAPI:
         description=Config.APP_DESCRIPTION,
         version=Config.APP_VERSION,
         docs_url="/docs",  
-        redoc_url="/redoc"     
+        redoc_url="/redoc",
+        lifespan=lifespan
     )
 
     # CORS Middleware
@@ -55,7 +75,12 @@ def create_app() -> FastAPI:
                 "drive_connect":  "GET  /drive/connect",
                 "drive_files":    "GET  /drive/files?folder_id=<id>",
                 "summarize":      "POST /summarize",
-                "summarize_ping": "GET  /summarize/status"
+                "summarize_stream": "POST /summarize/stream?format=ndjson|sse",
+                "summarize_job":  "POST /summarize/jobs",
+                "job_status":     "GET  /summarize/jobs/{job_id}",
+                "summarize_ping": "GET  /summarize/status",
+                "profile":        "GET  /summarize/profiles/{run_id}",
+                "metrics":        "GET  /metrics"
             }
         }
     
@@ -70,16 +95,6 @@ def create_app() -> FastAPI:
             }
         )
 
-
-    @app.on_event("startup")
-    async def startup():
-        logger.info(f"Document Summarizer API started.")
-
-
-    @app.on_event("shutdown")
-    async def shutdown():
-        logger.info("Document Summarizer API shutting down.")
-
     return app
 
 
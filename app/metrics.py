@@ -0,0 +1,351 @@
+import math
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, wide enough for multi-minute LLM calls and downloads
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric:
+    """
+    Base class of a labelled metric. Each distinct label combination is
+    tracked separately, like a Prometheus time series.
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        """
+        Label values in labelnames order.
+
+        Raises:
+            ValueError: If the labels do not match labelnames.
+        """
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric '{self.name}' expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing total (requests, bytes, tokens...).
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        """
+        Add to the counter.
+
+        Args:
+            amount (float): Non-negative increment.
+            **labels: Label values.
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase.")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._format_labels(key)} {_number(v)}" for key, v in values]
+
+
+class Gauge(_Metric):
+    """
+    Value that can go up and down (queue depth, concurrency limit...).
+    """
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{self._format_labels(key)} {_number(v)}" for key, v in values]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in cumulative buckets, plus their sum and count.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label key: [count per bucket (+Inf last), sum]
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels):
+        """
+        Record one observation.
+
+        Args:
+            value (float): Observed value (e.g. seconds).
+            **labels: Label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._values[key] = [counts, total + value]
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """
+        Observe the wall-clock duration of the with-block, also when it raises.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = ("le", "+Inf" if bound == math.inf else _number(bound))
+                lines.append(f"{self.name}_bucket{self._format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {_number(total)}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together in the Prometheus text format.
+    Registering a name twice returns the existing metric, so modules can
+    declare the metrics they use without import-order concerns.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format (0.0.4).
+
+        Returns:
+            str: Exposition text, ready to serve on /metrics.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if not isinstance(existing, cls) or existing.labelnames != tuple(labelnames):
+                    raise ValueError(f"Metric '{name}' is already registered differently.")
+                return existing
+            metric = cls(name, documentation, labelnames, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    """
+    Format a sample value: integers without a trailing .0, floats in repr form.
+    """
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """
+    Return the process-wide metrics registry served on /metrics.
+
+    Returns:
+        MetricsRegistry: Shared registry.
+    """
+    return _registry
+
+
+# ----------------------------------------------------------------------
+# Pipeline metrics
+# ----------------------------------------------------------------------
+
+DRIVE_REQUEST_SECONDS = _registry.histogram(
+    "drive_request_duration_seconds",
+    "Google Drive call latency.",
+    ["operation"]
+)
+DRIVE_ERRORS = _registry.counter(
+    "drive_errors_total",
+    "Failed Google Drive calls.",
+    ["operation"]
+)
+DRIVE_DOWNLOADED_BYTES = _registry.counter(
+    "drive_downloaded_bytes_total",
+    "Bytes downloaded from Google Drive."
+)
+
+PARSE_SECONDS = _registry.histogram(
+    "parse_duration_seconds",
+    "Text extraction latency per document.",
+    ["extension"]
+)
+PARSE_CHARACTERS = _registry.counter(
+    "parse_characters_total",
+    "Characters extracted from documents.",
+    ["extension"]
+)
+PARSE_ERRORS = _registry.counter(
+    "parse_errors_total",
+    "Documents that failed to parse.",
+    ["extension"]
+)
+
+LLM_REQUEST_SECONDS = _registry.histogram(
+    "llm_request_duration_seconds",
+    "OpenAI chat completion latency per attempt.",
+    ["model"]
+)
+LLM_ERRORS = _registry.counter(
+    "llm_errors_total",
+    "Failed OpenAI chat completion attempts (including retried ones).",
+    ["model"]
+)
+LLM_CONCURRENCY_LIMIT = _registry.gauge(
+    "llm_concurrency_limit",
+    "Current adaptive cap on in-flight sync chat completions.",
+    ["model"]
+)
+LLM_IN_FLIGHT = _registry.gauge(
+    "llm_in_flight_requests",
+    "Sync chat completions currently in flight.",
+    ["model"]
+)
+NEAR_DUPLICATE_REUSES = _registry.counter(
+    "near_duplicate_reuses_total",
+    "Summaries reused from a near-duplicate document instead of calling the LLM."
+)
+LLM_PROMPT_TOKENS = _registry.counter(
+    "llm_prompt_tokens_total",
+    "Prompt tokens reported in response.usage.",
+    ["model"]
+)
+LLM_COMPLETION_TOKENS = _registry.counter(
+    "llm_completion_tokens_total",
+    "Completion tokens reported in response.usage.",
+    ["model"]
+)
+
+
+def record_llm_usage(model: str, usage) -> None:
+    """
+    Add the token counts of a chat completion to the token counters.
+
+    Args:
+        model (str): Model the request was sent to.
+        usage (CompletionUsage): response.usage (may be None).
+    """
+    if usage is None:
+        return
+    LLM_PROMPT_TOKENS.inc(usage.prompt_tokens or 0, model=model)
+    LLM_COMPLETION_TOKENS.inc(usage.completion_tokens or 0, model=model)
@@ -1,11 +1,21 @@
-from .pdf_parser import extract_text_from_pdf
-from .docx_parser import extract_text_from_docx
-from .text_parser import extract_text_from_txt
-from .parser_factory import parse_document
+from .pdf_parser import extract_text_from_pdf, iter_pdf_pages
+from .docx_parser import extract_text_from_docx, iter_docx_blocks
+from .text_parser import extract_text_from_txt, iter_txt_chunks
+from .parser_factory import parse_document, iter_document
+from .process_pool import ParserPool
+from .source import DocumentSource
+from .parse_cache import ParseCache
 
 __all__ = [
     "extract_text_from_pdf",
     "extract_text_from_docx",
     "extract_text_from_txt",
-    "parse_document"
+    "iter_pdf_pages",
+    "iter_docx_blocks",
+    "iter_txt_chunks",
+    "parse_document",
+    "iter_document",
+    "ParserPool",
+    "DocumentSource",
+    "ParseCache"
 ]
\ No newline at end of file
@@ -1,45 +1,201 @@
 from docx import Document
+import io
+import zipfile
 import logging
+import xml.etree.ElementTree as ET
+from typing import Iterator, Optional
+
+from .source import DocumentSource, describe, is_path, read_bytes
+from .text_budget import collect_text
 
 logger = logging.getLogger(__name__)
 
+# WordprocessingML tags used by the streaming extractor
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_P   = W_NS + "p"
+W_R   = W_NS + "r"
+W_T   = W_NS + "t"
+W_TBL = W_NS + "tbl"
+W_TR  = W_NS + "tr"
+W_TC  = W_NS + "tc"
+
+# Run children that stand for a character (w:br only for plain line breaks)
+W_RUN_CHARS = {
+    W_NS + "tab": "\t",
+    W_NS + "ptab": "\t",
+    W_NS + "cr": "\n",
+    W_NS + "noBreakHyphen": "-",
+}
+W_BR = W_NS + "br"
+W_BR_TYPE = W_NS + "type"
+
+DOCUMENT_PART = "word/document.xml"
+
+# Depth of the children of <w:body> (<w:document> is 1, <w:body> is 2)
+BODY_CHILD_DEPTH = 3
+
+
+def iter_docx_blocks(source: DocumentSource, pages=None) -> Iterator[str]:
+    """
+    Lazily yield the non-empty paragraphs and table rows (cells joined with
+    " | ") of a DOCX file, in document order.
+    word/document.xml is streamed from the zip with an incremental XML parser,
+    so memory stays flat however large the document is. If the file cannot be
+    read that way, python-docx is used instead.
+
+    Args:
+        source (DocumentSource): Path to the DOCX file, or its bytes / a binary file object.
+        pages: Ignored; DOCX files carry no reliable page layout.
+
+    Yields:
+        str: One paragraph or table row.
+    """
+    file_path = describe(source)
+    if not is_path(source):
+        # Read a stream once so the fallback can start over from the same bytes
+        source = read_bytes(source)
+
+    yielded = False
+    try:
+        for block in _iter_docx_xml(source):
+            yielded = True
+            yield block
+        return
+
+    except (zipfile.BadZipFile, KeyError, ET.ParseError) as e:
+        if yielded:
+            logger.error(f"Error extracting text from DOCX '{file_path}': {e}")
+            raise RuntimeError(f"Failed to parse DOCX: {file_path}") from e
+        logger.warning(f"Streaming DOCX extraction failed for '{file_path}', using python-docx: {e}")
 
-def extract_text_from_docx(file_path: str) -> str:
+    yield from _iter_docx_dom(source)
+
+
+def extract_text_from_docx(source: DocumentSource, max_chars: Optional[int] = None,
+                           pages=None) -> str:
     """
-    Extract text content from a DOCX file using python-docx.
+    Extract text content from a DOCX file.
 
     Args:
-        file_path (str): Path to the DOCX file.
+        source (DocumentSource): Path to the DOCX file, or its bytes / a binary file object.
+        max_chars (int): Stop once this many characters are collected.
+        pages: Ignored; DOCX files carry no reliable page layout.
 
     Returns:
         str: Extracted text from paragraphs and tables.
     """
-    text_parts = []
-
+    file_path = describe(source)
     try:
-        doc = Document(file_path)
-        logger.info(f"Opened DOCX: {file_path}")
+        text = collect_text(iter_docx_blocks(source), max_chars, separator="\n")
 
+    except RuntimeError:
+        raise
 
-        for para in doc.paragraphs:
-            if para.text.strip():
-                text_parts.append(para.text.strip())
+    except Exception as e:
+        logger.error(f"Error extracting text from DOCX '{file_path}': {e}")
+        raise RuntimeError(f"Failed to parse DOCX: {file_path}") from e
+
+    if not text:
+        logger.warning(f"No text extracted from DOCX: {file_path}")
+        return ""
+
+    logger.info(f"Successfully extracted text from DOCX: {file_path}")
+    return text
+
+
+def _iter_docx_xml(source: DocumentSource) -> Iterator[str]:
+    """
+    Stream paragraphs and table rows out of word/document.xml.
+    Finished top-level elements are detached from the tree as soon as they
+    are handled, so only the block being read is held in memory. Text inside
+    nested tables is folded into the enclosing top-level cell.
+    """
+    archive_source = source if is_path(source) else io.BytesIO(read_bytes(source))
+    with zipfile.ZipFile(archive_source) as archive, archive.open(DOCUMENT_PART) as stream:
+        logger.info(f"Opened DOCX: {describe(source)}")
+
+        depth = 0
+        body = None
+        table_depth = 0
+        run_depth = 0
+        paragraphs = []          # stack of text parts, one list per open <w:p>
+        row_cells = []
+        cell_paragraphs = None   # paragraphs of the current top-level cell
+
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            tag = elem.tag
 
-        for table in doc.tables:
-            for row in table.rows:
-                row_text = " | ".join(
-                    cell.text.strip() for cell in row.cells if cell.text.strip()
-                )
+            if event == "start":
+                depth += 1
+                if depth == BODY_CHILD_DEPTH - 1:
+                    body = elem
+                elif tag == W_P:
+                    paragraphs.append([])
+                elif tag == W_R:
+                    run_depth += 1
+                elif tag == W_TBL:
+                    table_depth += 1
+                elif tag == W_TR and table_depth == 1:
+                    row_cells = []
+                elif tag == W_TC and table_depth == 1:
+                    cell_paragraphs = []
+                continue
+
+            depth -= 1
+
+            if tag == W_T:
+                if paragraphs:
+                    paragraphs[-1].append(elem.text or "")
+            elif run_depth and paragraphs and tag in W_RUN_CHARS:
+                paragraphs[-1].append(W_RUN_CHARS[tag])
+            elif run_depth and paragraphs and tag == W_BR:
+                if elem.get(W_BR_TYPE, "textWrapping") == "textWrapping":
+                    paragraphs[-1].append("\n")
+            elif tag == W_R:
+                run_depth -= 1
+            elif tag == W_P:
+                text = "".join(paragraphs.pop())
+                if table_depth and cell_paragraphs is not None:
+                    cell_paragraphs.append(text)
+                elif text.strip():
+                    yield text.strip()
+            elif tag == W_TC and table_depth == 1:
+                row_cells.append("\n".join(cell_paragraphs).strip())
+                cell_paragraphs = None
+            elif tag == W_TR and table_depth == 1:
+                row_text = " | ".join(cell for cell in row_cells if cell)
+                elem.clear()
                 if row_text:
-                    text_parts.append(row_text)
+                    yield row_text
+            elif tag == W_TBL:
+                table_depth -= 1
 
-        if not text_parts:
-            logger.warning(f"No text extracted from DOCX: {file_path}")
-            return ""
+            if depth == BODY_CHILD_DEPTH - 1 and body is not None:
+                body.remove(elem)
 
-        logger.info(f"Successfully extracted text from DOCX: {file_path}")
-        return "\n".join(text_parts)
 
+def _iter_docx_dom(source: DocumentSource) -> Iterator[str]:
+    """
+    Fallback: load the document with python-docx and yield its paragraphs,
+    then its table rows.
+    """
+    file_path = describe(source)
+    try:
+        doc = Document(source if is_path(source) else io.BytesIO(read_bytes(source)))
     except Exception as e:
         logger.error(f"Error extracting text from DOCX '{file_path}': {e}")
-        raise RuntimeError(f"Failed to parse DOCX: {file_path}") from e
\ No newline at end of file
+        raise RuntimeError(f"Failed to parse DOCX: {file_path}") from e
+
+    logger.info(f"Opened DOCX: {file_path}")
+
+    for para in doc.paragraphs:
+        if para.text.strip():
+            yield para.text.strip()
+
+    for table in doc.tables:
+        for row in table.rows:
+            row_text = " | ".join(
+                cell.text.strip() for cell in row.cells if cell.text.strip()
+            )
+            if row_text:
+                yield row_text
@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional
+
+from .source import DocumentSource, is_path
+import app.config as config
+
+logger = logging.getLogger(__name__)
+
+PARSE_CACHE_ENABLED   = config.Config.PARSE_CACHE_ENABLED
+PARSE_CACHE_PATH      = config.Config.PARSE_CACHE_PATH
+PARSE_CACHE_MAX_BYTES = config.Config.PARSE_CACHE_MAX_BYTES
+
+# Bump when parser output changes, so stale extractions are not served
+PARSE_CACHE_VERSION = 1
+
+# zlib level: extracted text compresses well even at moderate levels
+COMPRESSION_LEVEL = 6
+
+# Bytes read at a time when hashing a local file
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+class ParseCache:
+    """
+    On-disk cache of extracted document text, backed by SQLite.
+    Entries are keyed by Drive file ID plus md5Checksum (or by a hash of the
+    content when there is none), stored zlib-compressed, and evicted
+    least-recently-used once the compressed entries exceed max_bytes.
+    Re-running a folder with new prompts or models then skips parsing.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 200 * 1024 * 1024):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): Location of the SQLite database file.
+            max_bytes (int): Upper bound on the total size of compressed entries.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS parsed ("
+            " key TEXT PRIMARY KEY,"
+            " text BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_parsed_last_access ON parsed(last_access)"
+        )
+        self._conn.commit()
+        logger.info(f"Parse cache opened: {path}")
+
+
+    @staticmethod
+    def make_key(source: DocumentSource, max_chars: Optional[int] = None,
+                 file_id: Optional[str] = None, checksum: Optional[str] = None) -> str:
+        """
+        Build the cache key for a document.
+        Drive files with an md5Checksum are keyed without reading them; other
+        sources are keyed by a SHA-256 of their content.
+
+        Args:
+            source (DocumentSource): Local path or in-memory content of the document.
+            max_chars (int): Character budget the text was extracted with.
+            file_id (str): Google Drive file ID.
+            checksum (str): Drive md5Checksum of the file content.
+
+        Returns:
+            str: Hex SHA-256 digest.
+        """
+        if file_id and checksum:
+            identity = {"id": file_id, "md5": checksum}
+        else:
+            identity = {"sha256": _content_hash(source)}
+
+        payload = json.dumps(
+            {**identity, "max_chars": max_chars, "version": PARSE_CACHE_VERSION},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up extracted text and mark it as recently used.
+
+        Args:
+            key (str): Cache key from make_key.
+
+        Returns:
+            Optional[str]: Cached text, or None on a miss.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM parsed WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE parsed SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return zlib.decompress(row[0]).decode("utf-8")
+
+
+    def set(self, key: str, text: str):
+        """
+        Store extracted text, evicting least-recently-used entries if over budget.
+
+        Args:
+            key (str): Cache key from make_key.
+            text (str): Extracted text to store.
+        """
+        blob = zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parsed (key, text, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+
+    def stats(self) -> Dict:
+        """
+        Return hit/miss counters and current size.
+
+        Returns:
+            Dict: hits, misses, entries, bytes (compressed).
+        """
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM parsed"
+            ).fetchone()
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": total,
+        }
+
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+    def _evict(self):
+        """
+        Delete least-recently-used entries until the cache fits in max_bytes.
+        Caller must hold the lock.
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM parsed").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        rows = self._conn.execute(
+            "SELECT key, size FROM parsed ORDER BY last_access ASC"
+        ).fetchall()
+
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM parsed WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+
+        logger.info(f"Parse cache evicted {evicted} entries.")
+
+
+def _content_hash(source: DocumentSource) -> str:
+    """
+    SHA-256 of a document's bytes. Files are hashed in chunks; streams are
+    hashed from their current position and rewound afterwards.
+    """
+    digest = hashlib.sha256()
+    if is_path(source):
+        with open(source, "rb") as f:
+            for block in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+                digest.update(block)
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+    else:
+        start = source.tell()
+        for block in iter(lambda: source.read(HASH_CHUNK_BYTES), b""):
+            digest.update(block)
+        source.seek(start)
+    return digest.hexdigest()
+
+
+_default_cache: Optional[ParseCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> Optional[ParseCache]:
+    """
+    Return the process-wide ParseCache, opening it on first use.
+
+    Returns:
+        Optional[ParseCache]: Shared cache built from Config, or None if disabled.
+    """
+    global _default_cache
+    if not PARSE_CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ParseCache(PARSE_CACHE_PATH, PARSE_CACHE_MAX_BYTES)
+        return _default_cache
+
+
+def close_parse_cache():
+    """
+    Close the process-wide ParseCache if it was opened.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is not None:
+            _default_cache.close()
+            _default_cache = None
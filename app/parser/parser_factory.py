@@ -1,8 +1,12 @@
 import os
+import time
 import logging
-from .pdf_parser import extract_text_from_pdf
-from .docx_parser import extract_text_from_docx
-from .text_parser import extract_text_from_txt
+from typing import Iterable, Iterator, Optional
+from .pdf_parser import extract_text_from_pdf, iter_pdf_pages
+from .docx_parser import extract_text_from_docx, iter_docx_blocks
+from .text_parser import extract_text_from_txt, iter_txt_chunks
+from .source import DocumentSource, describe, is_path
+from app.metrics import PARSE_CHARACTERS, PARSE_ERRORS, PARSE_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -12,13 +16,28 @@ PARSER_MAP = {
     ".txt":  extract_text_from_txt,
 }
 
+# Generator parsers yielding pages / paragraphs / text blocks lazily
+CHUNK_PARSER_MAP = {
+    ".pdf":  iter_pdf_pages,
+    ".docx": iter_docx_blocks,
+    ".txt":  iter_txt_chunks,
+}
+
 
-def parse_document(file_path: str) -> str:
+def parse_document(source: DocumentSource, max_chars: Optional[int] = None,
+                   pages: Optional[Iterable[int]] = None,
+                   file_type: Optional[str] = None) -> str:
     """
     detect file type and extract text using the correct parser.
 
     Args:
-        file_path (str): Path to the document file.
+        source (DocumentSource): Path to the document file, or its content as bytes /
+                                 a binary file object (e.g. a download buffer).
+        max_chars (int): Character budget. Parsers stop reading once it is met,
+                         so the result may exceed it by at most one page/block.
+        pages (Iterable[int]): Optional 1-based page numbers to read (PDF only).
+        file_type (str): Extension such as ".pdf". Required for in-memory sources;
+                         defaults to the extension of the path.
 
     Returns:
         str: Extracted text content from the document.
@@ -27,22 +46,67 @@ def parse_document(file_path: str) -> str:
         ValueError: If the file type is not supported.
         RuntimeError: If parsing fails.
     """
-    _, ext = os.path.splitext(file_path)
-    ext = ext.lower()
-
-    if ext not in PARSER_MAP:
-        supported = ", ".join(PARSER_MAP.keys())
-        logger.error(f"Unsupported file type: '{ext}' for file: {file_path}")
-        raise ValueError(
-            f"Unsupported file type: '{ext}'. Supported types are: {supported}"
-        )
-
+    file_path = describe(source)
+    ext = document_extension(source, file_type)
     parser_fn = PARSER_MAP[ext]
     logger.info(f"Parsing file: {file_path} using parser for '{ext}'")
 
-    text = parser_fn(file_path)
+    start = time.perf_counter()
+    try:
+        text = parser_fn(source, max_chars=max_chars, pages=pages)
+    except Exception:
+        PARSE_ERRORS.inc(extension=ext)
+        raise
+    finally:
+        PARSE_SECONDS.observe(time.perf_counter() - start, extension=ext)
+    PARSE_CHARACTERS.inc(len(text or ""), extension=ext)
 
     if not text:
         logger.warning(f"Empty content extracted from file: {file_path}")
 
-    return text
\ No newline at end of file
+    return text
+
+
+def iter_document(source: DocumentSource, pages: Optional[Iterable[int]] = None,
+                  file_type: Optional[str] = None) -> Iterator[str]:
+    """
+    Lazily yield a document's text in chunks (PDF pages, DOCX paragraphs and
+    table rows, TXT blocks), so large documents never need to be fully extracted.
+
+    Args:
+        source (DocumentSource): Path to the document file, or its bytes / a binary file object.
+        pages (Iterable[int]): Optional 1-based page numbers to read (PDF only).
+        file_type (str): Extension such as ".pdf". Required for in-memory sources.
+
+    Returns:
+        Iterator[str]: Text chunks in document order.
+
+    Raises:
+        ValueError: If the file type is not supported.
+    """
+    return CHUNK_PARSER_MAP[document_extension(source, file_type)](source, pages=pages)
+
+
+def document_extension(source: DocumentSource, file_type: Optional[str] = None) -> str:
+    """
+    Return the lower-cased extension of a supported file, taken from
+    file_type if given, else from the path.
+
+    Raises:
+        ValueError: If the file type is not supported or cannot be determined.
+    """
+    if file_type:
+        ext = file_type if file_type.startswith(".") else f".{file_type}"
+    elif is_path(source):
+        _, ext = os.path.splitext(source)
+    else:
+        raise ValueError("file_type is required to parse an in-memory document.")
+    ext = ext.lower()
+
+    if ext not in PARSER_MAP:
+        supported = ", ".join(PARSER_MAP.keys())
+        logger.error(f"Unsupported file type: '{ext}' for file: {describe(source)}")
+        raise ValueError(
+            f"Unsupported file type: '{ext}'. Supported types are: {supported}"
+        )
+    return ext
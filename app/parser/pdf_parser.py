@@ -1,40 +1,74 @@
 import pymupdf 
 import logging
+from typing import Iterable, Iterator, Optional
+
+from .source import DocumentSource, describe, is_path, read_bytes
+from .text_budget import collect_text
 
 logger = logging.getLogger(__name__)
 
 
-def extract_text_from_pdf(file_path: str) -> str:
+def iter_pdf_pages(source: DocumentSource,
+                   pages: Optional[Iterable[int]] = None) -> Iterator[str]:
     """
-    Extract text content from a PDF file .
+    Lazily yield the text of each PDF page, prefixed with a page marker.
+    Pages are only extracted as the caller asks for them.
 
     Args:
-        file_path (str): Path to the PDF file.
+        source (DocumentSource): Path to the PDF file, or its bytes / a binary file object.
+        pages (Iterable[int]): Optional 1-based page numbers to read (others are skipped).
 
-    Returns:
-        str: Extracted text from all pages.
+    Yields:
+        str: "\\n--- Page N ---\\n" followed by the page text, for pages with text.
     """
-    text = ""
+    file_path = describe(source)
+    try:
+        if is_path(source):
+            doc = pymupdf.open(source)
+        else:
+            doc = pymupdf.open(stream=read_bytes(source), filetype="pdf")
+    except Exception as e:
+        logger.error(f"Error extracting text from PDF '{file_path}': {e}")
+        raise RuntimeError(f"Failed to parse PDF: {file_path}") from e
 
     try:
-        doc = pymupdf.open(file_path)
         logger.info(f"Opened PDF: {file_path} | Pages: {len(doc)}")
+        numbers = range(1, len(doc) + 1) if pages is None else pages
 
-        for page_num, page in enumerate(doc, start=1):
-            page_text = page.get_text("text")
-            if page_text.strip():
-                text += f"\n--- Page {page_num} ---\n"
-                text += page_text
+        for page_num in numbers:
+            if not 1 <= page_num <= len(doc):
+                continue
+            try:
+                page_text = doc[page_num - 1].get_text("text")
+            except Exception as e:
+                logger.error(f"Error extracting text from PDF '{file_path}': {e}")
+                raise RuntimeError(f"Failed to parse PDF: {file_path}") from e
 
+            if page_text.strip():
+                yield f"\n--- Page {page_num} ---\n{page_text}"
+    finally:
         doc.close()
 
-        if not text.strip():
-            logger.warning(f"No text extracted from PDF: {file_path}")
-            return ""
 
-        logger.info(f"Successfully extracted text from PDF: {file_path}")
-        return text.strip()
+def extract_text_from_pdf(source: DocumentSource, max_chars: Optional[int] = None,
+                          pages: Optional[Iterable[int]] = None) -> str:
+    """
+    Extract text content from a PDF file .
+
+    Args:
+        source (DocumentSource): Path to the PDF file, or its bytes / a binary file object.
+        max_chars (int): Stop reading pages once this many characters are collected.
+        pages (Iterable[int]): Optional 1-based page numbers to read.
 
-    except Exception as e:
-        logger.error(f"Error extracting text from PDF '{file_path}': {e}")
-        raise RuntimeError(f"Failed to parse PDF: {file_path}") from e
\ No newline at end of file
+    Returns:
+        str: Extracted text from the pages read.
+    """
+    file_path = describe(source)
+    text = collect_text(iter_pdf_pages(source, pages), max_chars)
+
+    if not text.strip():
+        logger.warning(f"No text extracted from PDF: {file_path}")
+        return ""
+
+    logger.info(f"Successfully extracted text from PDF: {file_path}")
+    return text.strip()
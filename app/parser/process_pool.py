@@ -0,0 +1,249 @@
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from .parser_factory import parse_document, document_extension
+from .source import DocumentSource, describe
+from app.metrics import PARSE_CHARACTERS, PARSE_ERRORS, PARSE_SECONDS
+import app.config as config
+
+try:
+    import resource
+except ImportError:  # Windows: no per-process memory limits
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PARSE_WORKERS             = config.Config.PARSE_WORKERS
+PARSE_TIMEOUT             = config.Config.PARSE_TIMEOUT
+PARSE_MEMORY_LIMIT_MB     = config.Config.PARSE_MEMORY_LIMIT_MB
+PARSE_MAX_TASKS_PER_CHILD = config.Config.PARSE_MAX_TASKS_PER_CHILD
+
+
+def _limit_worker_memory(limit_mb: int):
+    """
+    Worker initializer: cap the address space of the parser process so a
+    malformed document raises MemoryError instead of exhausting the host.
+    """
+    if resource is None or not limit_mb:
+        return
+    limit = limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+class ParserPool:
+    """
+    Runs parse_document in a pool of worker processes.
+    Parsing then scales across cores, and a file that hangs or balloons
+    memory only takes down its own worker, never the API process.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = PARSE_WORKERS,
+        timeout: float = PARSE_TIMEOUT,
+        memory_limit_mb: int = PARSE_MEMORY_LIMIT_MB,
+        max_tasks_per_child: int = PARSE_MAX_TASKS_PER_CHILD,
+    ):
+        """
+        Args:
+            max_workers (int): Number of parser processes.
+            timeout (float): Hard time limit per file, in seconds.
+            memory_limit_mb (int): Address-space ceiling per worker (0 = unlimited).
+            max_tasks_per_child (int): Recycle a worker after this many files.
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_tasks_per_child = max_tasks_per_child
+
+        self._lock = threading.Lock()
+        # Submissions are capped at the worker count, so a file's timeout
+        # starts when a worker is free rather than while it waits in the queue
+        self._slots = threading.BoundedSemaphore(max(1, max_workers))
+        self._generation = 0
+        self._executor = self._create_executor()
+        logger.info(
+            f"ParserPool started: {max_workers} workers, {timeout}s timeout, "
+            f"{memory_limit_mb} MB limit, recycle after {max_tasks_per_child} tasks."
+        )
+
+
+    def parse(self, source: DocumentSource, **kwargs) -> str:
+        """
+        Parse a document in a worker process.
+        Parse metrics are recorded here, since the worker's own are not
+        visible to this process.
+
+        Args:
+            source (DocumentSource): Path to the document file, or its bytes
+                                     (pickled to the worker; pass file_type too).
+            **kwargs: Extra arguments forwarded to parse_document.
+
+        Returns:
+            str: Extracted text content.
+
+        Raises:
+            ValueError: If the file type is not supported.
+            RuntimeError: If parsing fails, times out or crashes its worker.
+        """
+        ext = document_extension(source, kwargs.get("file_type"))
+        start = time.perf_counter()
+        try:
+            text = self._parse(source, **kwargs)
+        except Exception:
+            PARSE_ERRORS.inc(extension=ext)
+            raise
+        finally:
+            PARSE_SECONDS.observe(time.perf_counter() - start, extension=ext)
+        PARSE_CHARACTERS.inc(len(text or ""), extension=ext)
+        return text
+
+
+    def _parse(self, source: DocumentSource, **kwargs) -> str:
+        """
+        Run parse_document on the pool, restarting it after a timeout or crash.
+        Waits for a free worker slot first (see _slots).
+        """
+        with self._slots:
+            return self._run(source, **kwargs)
+
+
+    def _run(self, source: DocumentSource, **kwargs) -> str:
+        """
+        Submit one parse while holding a worker slot.
+        """
+        file_path = describe(source)
+        with self._lock:
+            executor, generation = self._executor, self._generation
+
+        try:
+            return self._result(executor.submit(parse_document, source, **kwargs), file_path)
+
+        except FutureTimeoutError:
+            logger.error(f"Parsing timed out after {self.timeout}s: {file_path}")
+            self._restart(generation)
+            raise RuntimeError(f"Parsing timed out after {self.timeout}s: {file_path}")
+
+        except BrokenProcessPool:
+            # This file or another one on the pool crashed its worker
+            self._restart(generation)
+
+        logger.warning(f"Parser pool crashed; retrying in an isolated worker: {file_path}")
+        return self._run_isolated(source, **kwargs)
+
+
+    def _run_isolated(self, source: DocumentSource, **kwargs) -> str:
+        """
+        Retry a parse in a single-worker pool of its own, so a document that
+        crashes its worker again fails alone instead of breaking the shared
+        pool under every other parse being retried.
+        """
+        file_path = describe(source)
+        executor = self._create_executor(max_workers=1)
+        try:
+            return self._result(executor.submit(parse_document, source, **kwargs), file_path)
+
+        except FutureTimeoutError:
+            logger.error(f"Parsing timed out after {self.timeout}s: {file_path}")
+            raise RuntimeError(f"Parsing timed out after {self.timeout}s: {file_path}")
+
+        except BrokenProcessPool:
+            raise RuntimeError(f"Parser process crashed while parsing: {file_path}")
+
+        finally:
+            self._terminate(executor)
+
+
+    def _result(self, future, file_path: str) -> str:
+        """
+        Wait for a submitted parse, reporting a worker MemoryError as a RuntimeError.
+        """
+        try:
+            return future.result(timeout=self.timeout)
+        except MemoryError as e:
+            raise RuntimeError(
+                f"Parsing exceeded {self.memory_limit_mb} MB memory limit: {file_path}"
+            ) from e
+
+
+    def shutdown(self):
+        """
+        Stop all worker processes.
+        """
+        with self._lock:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("ParserPool shut down.")
+
+
+    def _create_executor(self, max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """
+        Build a fresh process pool. 'spawn' is required for worker recycling.
+        """
+        return ProcessPoolExecutor(
+            max_workers=max_workers or self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_limit_worker_memory,
+            initargs=(self.memory_limit_mb,),
+            max_tasks_per_child=self.max_tasks_per_child,
+        )
+
+
+    def _restart(self, generation: int):
+        """
+        Kill the current workers (a hung parse cannot be cancelled) and start a new pool.
+        Only the first caller for a given generation restarts it.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+
+            self._terminate(self._executor)
+            self._executor = self._create_executor()
+            self._generation += 1
+            logger.warning("Parser pool restarted.")
+
+
+    @staticmethod
+    def _terminate(executor: ProcessPoolExecutor):
+        """
+        Kill an executor's workers and shut it down without waiting.
+        """
+        # ProcessPoolExecutor has no public way to kill its workers; _processes
+        # is a CPython implementation detail and may change between versions.
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+_default_pool: Optional[ParserPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_parser_pool() -> ParserPool:
+    """
+    Return the process-wide ParserPool, starting it on first use.
+
+    Returns:
+        ParserPool: Shared pool built from Config.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ParserPool()
+        return _default_pool
+
+
+def shutdown_parser_pool():
+    """
+    Stop the process-wide ParserPool if it was started.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is not None:
+            _default_pool.shutdown()
+            _default_pool = None
@@ -0,0 +1,40 @@
+import os
+from typing import BinaryIO, Union
+
+# What a parser can read from: a path, raw bytes, or a binary file-like object
+DocumentSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO]
+
+
+def is_path(source: DocumentSource) -> bool:
+    """
+    Whether the source is a filesystem path.
+    """
+    return isinstance(source, (str, os.PathLike))
+
+
+def read_bytes(source: DocumentSource) -> bytes:
+    """
+    Return the content of an in-memory source (bytes or file-like object).
+
+    Args:
+        source (DocumentSource): Bytes-like object or binary file-like object.
+
+    Returns:
+        bytes: The content.
+    """
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    return source.read()
+
+
+def describe(source: DocumentSource) -> str:
+    """
+    Short label for a source, used in logs and error messages.
+    """
+    if is_path(source):
+        return os.fspath(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return f"<buffer: {len(source)} bytes>"
+    return f"<stream: {getattr(source, 'name', type(source).__name__)}>"
@@ -0,0 +1,32 @@
+from typing import Iterable, Iterator, Optional
+
+
+def collect_text(chunks: Iterable[str], max_chars: Optional[int] = None,
+                 separator: str = "") -> str:
+    """
+    Join text chunks, stopping as soon as max_chars characters are collected.
+    Chunks are gathered in a list and joined once, so building the result is
+    linear in its size. The last chunk is kept whole, so the result can exceed
+    max_chars by up to one chunk; callers truncate to their exact limit.
+
+    Args:
+        chunks (Iterable[str]): Text chunks, typically from a parser generator.
+        max_chars (int): Character budget (None = collect everything).
+        separator (str): Inserted between chunks.
+
+    Returns:
+        str: The collected text.
+    """
+    parts = []
+    size = 0
+    try:
+        for chunk in chunks:
+            parts.append(chunk)
+            size += len(chunk) + len(separator)
+            if max_chars is not None and size >= max_chars:
+                break
+    finally:
+        # Stop the generator now so it releases its file handle
+        if isinstance(chunks, Iterator) and hasattr(chunks, "close"):
+            chunks.close()
+    return separator.join(parts)
@@ -1,37 +1,119 @@
+import io
+import mmap
+import codecs
 import logging
+from contextlib import nullcontext
+from typing import Iterator, Optional, Union
+
+from .source import DocumentSource, describe, is_path, read_bytes
 
 logger = logging.getLogger(__name__)
 
-SUPPORTED_ENCODINGS = ["utf-8", "utf-16", "latin-1", "cp1252"]
+# Encodings tried if the detected one fails further into the file.
+# latin-1 decodes any byte sequence, so it is the last resort.
+FALLBACK_ENCODINGS = ["cp1252", "latin-1"]
+
+# Byte order marks, longest first (the UTF-32 LE BOM starts with the UTF-16 LE one)
+BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# Bytes inspected to choose an encoding
+SAMPLE_BYTES = 64 * 1024
+
+# Files at least this large are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 1024 * 1024
 
+# Bytes decoded per chunk when streaming a TXT file
+READ_CHUNK_BYTES = 1024 * 1024
 
-def extract_text_from_txt(file_path: str) -> str:
+# Upper bound of bytes per decoded character, used to read only a prefix under a budget
+MAX_BYTES_PER_CHAR = 4
+
+
+def detect_encoding(sample: bytes) -> str:
     """
-    Extract text content from a plain TXT file.
-    Tries multiple encodings to handle different file formats.
+    Choose an encoding from the first bytes of a file, without decoding the file.
+    - A byte order mark decides outright.
+    - NUL bytes concentrated on odd or even offsets mean BOM-less UTF-16.
+    - Otherwise UTF-8 if the sample is valid UTF-8, then cp1252 if the sample
+      uses its printable 0x80-0x9F range and decodes, and latin-1 as a last resort.
 
     Args:
-        file_path (str): Path to the TXT file.
+        sample (bytes): Leading bytes of the file (SAMPLE_BYTES is plenty).
 
     Returns:
-        str: Extracted text content.
+        str: Codec name.
     """
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    if sample:
+        even_nuls = sample[0::2].count(0)
+        odd_nuls = sample[1::2].count(0)
+        half = len(sample) / 2
+        if odd_nuls > 0.3 * half and even_nuls < 0.05 * half:
+            return "utf-16-le"
+        if even_nuls > 0.3 * half and odd_nuls < 0.05 * half:
+            return "utf-16-be"
+
     try:
-        for encoding in SUPPORTED_ENCODINGS:
-            try:
-                with open(file_path, "r", encoding=encoding) as f:
-                    text = f.read()
+        # final=False: a multi-byte character cut off by the sample end is fine
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
 
-                if text.strip():
-                    logger.info(f"Successfully read TXT file '{file_path}' with encoding: {encoding}")
-                    return text.strip()
+    if any(0x80 <= byte <= 0x9F for byte in sample):
+        try:
+            sample.decode("cp1252")
+            return "cp1252"
+        except UnicodeDecodeError:
+            pass
 
-            except (UnicodeDecodeError, UnicodeError):
-                logger.debug(f"Encoding '{encoding}' failed for file: {file_path}, trying next...")
-                continue
+    return "latin-1"
 
-        logger.warning(f"No text extracted or unsupported encoding for TXT: {file_path}")
-        return ""
+
+def iter_txt_chunks(source: DocumentSource, pages=None,
+                    chunk_bytes: int = READ_CHUNK_BYTES) -> Iterator[str]:
+    """
+    Streaming mode: lazily yield a TXT file's text in decoded chunks, reading
+    chunk_bytes at a time, so multi-gigabyte log files use constant memory.
+    The encoding is chosen once from the first SAMPLE_BYTES; bytes that turn
+    out to be invalid later on are replaced (U+FFFD) rather than aborting.
+
+    Args:
+        source (DocumentSource): Path to the TXT file, or its bytes / a binary file object.
+        pages: Ignored; plain text has no pages.
+        chunk_bytes (int): Bytes read and decoded per chunk.
+
+    Yields:
+        str: Consecutive pieces of the file's text.
+    """
+    file_path = describe(source)
+    try:
+        with _open_binary(source) as f:
+            sample = f.read(SAMPLE_BYTES)
+            encoding = detect_encoding(sample)
+            logger.info(f"Streaming TXT file '{file_path}' with encoding: {encoding}")
+
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            # The sample is decoded first, so non-seekable streams work too
+            block = sample
+            while block:
+                text = decoder.decode(block)
+                if text:
+                    yield text
+                block = f.read(chunk_bytes)
+
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
 
     except FileNotFoundError:
         logger.error(f"TXT file not found: {file_path}")
@@ -39,4 +121,104 @@ def extract_text_from_txt(file_path: str) -> str:
 
     except Exception as e:
         logger.error(f"Error reading TXT file '{file_path}': {e}")
-        raise RuntimeError(f"Failed to parse TXT: {file_path}") from e
\ No newline at end of file
+        raise RuntimeError(f"Failed to parse TXT: {file_path}") from e
+
+
+def extract_text_from_txt(source: DocumentSource, max_chars: Optional[int] = None,
+                          pages=None) -> str:
+    """
+    Extract text content from a plain TXT file.
+    The raw bytes are read once (memory-mapped for large files), the encoding
+    is picked from a sample, and the text is decoded in a single pass.
+    In-memory sources are decoded directly.
+
+    Args:
+        source (DocumentSource): Path to the TXT file, or its bytes / a binary file object.
+        max_chars (int): Decode only enough bytes for this many characters.
+        pages: Ignored; plain text has no pages.
+
+    Returns:
+        str: Extracted text content.
+    """
+    file_path = describe(source)
+    try:
+        if is_path(source):
+            text = _decode_file(source, max_chars)
+        else:
+            text = _decode(read_bytes(source), max_chars)
+
+    except FileNotFoundError:
+        logger.error(f"TXT file not found: {file_path}")
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    except Exception as e:
+        logger.error(f"Error reading TXT file '{file_path}': {e}")
+        raise RuntimeError(f"Failed to parse TXT: {file_path}") from e
+
+    if not text.strip():
+        logger.warning(f"No text extracted or unsupported encoding for TXT: {file_path}")
+        return ""
+
+    logger.info(f"Successfully read TXT file '{file_path}'")
+    return text.strip()
+
+
+def _open_binary(source: DocumentSource):
+    """
+    Context manager giving a binary file object for any source. File objects
+    passed in are left open for their owner to close.
+    """
+    if is_path(source):
+        return open(source, "rb")
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return nullcontext(source)
+
+
+def _decode_file(file_path: str, max_chars: Optional[int] = None) -> str:
+    """
+    Read a file once (memory-mapped if large) and decode it.
+    """
+    with open(file_path, "rb") as f:
+        size = f.seek(0, 2)
+        f.seek(0)
+        if size == 0:
+            raw = b""
+        elif size >= MMAP_THRESHOLD:
+            raw = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            raw = f.read()
+
+        try:
+            return _decode(raw, max_chars)
+        finally:
+            if isinstance(raw, mmap.mmap):
+                raw.close()
+
+
+def _decode(raw: Union[bytes, bytearray, mmap.mmap], max_chars: Optional[int] = None) -> str:
+    """
+    Decode raw file bytes with the detected encoding in one pass.
+    If the sample misled detection (invalid bytes further in), the text is
+    decoded with the next candidate that accepts it.
+    """
+    full = memoryview(raw)
+    view = full if max_chars is None else full[:max_chars * MAX_BYTES_PER_CHAR]
+    try:
+        # A budget may cut a character in half, so the prefix is decoded incrementally
+        final = len(view) == len(full)
+
+        encoding = detect_encoding(bytes(view[:SAMPLE_BYTES]))
+        candidates = [encoding] + [e for e in FALLBACK_ENCODINGS if e != encoding]
+        for candidate in candidates:
+            try:
+                text = codecs.getincrementaldecoder(candidate)().decode(view, final=final)
+            except UnicodeDecodeError:
+                logger.debug(f"Encoding '{candidate}' failed, trying next...")
+                continue
+            logger.info(f"Decoded TXT with encoding: {candidate}")
+            return text if max_chars is None else text[:max_chars]
+        return ""
+    finally:
+        view.release()
+        full.release()
@@ -0,0 +1,112 @@
+import os
+import logging
+import threading
+from typing import Optional
+
+from app.clients.drive_client import DriveClient
+from app.summarizer.ai_summarizer import AISummarizer
+from app.services.pipeline import Pipeline
+from app.services.profiler import RunProfiler
+from app.services.job_manager import JobManager
+from app.parser.process_pool import shutdown_parser_pool
+from app.parser.parse_cache import close_parse_cache
+from app.auth.google_auth import stop_credential_refresh
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class AppServices:
+    """
+    Long-lived clients shared by every request.
+    Created once per application (see the lifespan handler in main.py), so
+    credential loading, Drive discovery and OpenAI connection pools are set up
+    once instead of on every call. Clients are built lazily on first use, so a
+    missing credentials file or API key only fails the requests that need it.
+    """
+
+    def __init__(self):
+        self._drive_client: Optional[DriveClient] = None
+        self._summarizer: Optional[AISummarizer] = None
+        self._drive_lock = threading.Lock()
+        self._summarizer_lock = threading.Lock()
+        self.job_manager = JobManager(pipeline_factory=self.create_pipeline)
+
+
+    @property
+    def drive_client(self) -> DriveClient:
+        """
+        Shared DriveClient, created on first access.
+        """
+        with self._drive_lock:
+            if self._drive_client is None:
+                self._drive_client = DriveClient()
+            return self._drive_client
+
+
+    @property
+    def summarizer(self) -> AISummarizer:
+        """
+        Shared AISummarizer (and its LLMClient), created on first access.
+        """
+        with self._summarizer_lock:
+            if self._summarizer is None:
+                self._summarizer = AISummarizer()
+            return self._summarizer
+
+
+    def create_pipeline(self, folder_id: str, download_dir: str = "downloads",
+                        backfill: bool = False,
+                        profiler: Optional[RunProfiler] = None) -> Pipeline:
+        """
+        Build a Pipeline that reuses the shared clients.
+
+        Args:
+            folder_id (str): Google Drive folder ID.
+            download_dir (str): Local directory to store downloaded files.
+            backfill (bool): Summarize through the OpenAI Batch API.
+            profiler (RunProfiler): Optional profiler recording the run.
+
+        Returns:
+            Pipeline: Pipeline for one run.
+        """
+        return Pipeline(
+            folder_id=folder_id,
+            download_dir=download_dir,
+            drive_client=self.drive_client,
+            summarizer=self.summarizer,
+            backfill=backfill,
+            profiler=profiler
+        )
+
+
+    def warm_up(self):
+        """
+        Create the shared clients ahead of the first request.
+        Failures are logged, not raised, so the API still starts without credentials.
+        The Drive client is skipped until a saved token exists, since creating it
+        would otherwise start the interactive OAuth login.
+        """
+        names = ["summarizer"]
+        if os.path.exists(Config.GOOGLE_TOKEN_PATH):
+            names.insert(0, "drive_client")
+
+        for name in names:
+            try:
+                getattr(self, name)
+            except Exception as e:
+                logger.warning(f"Could not initialize {name} at startup: {e}")
+
+
+    def shutdown(self):
+        """
+        Stop background jobs, worker processes and the token refresher,
+        and close the summary and parse caches.
+        """
+        self.job_manager.shutdown()
+        shutdown_parser_pool()
+        close_parse_cache()
+        stop_credential_refresh()
+        with self._summarizer_lock:
+            if self._summarizer is not None and self._summarizer.cache is not None:
+                self._summarizer.cache.close()
@@ -0,0 +1,146 @@
+import os
+import json
+import logging
+import tempfile
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_STATE_VERSION = 1
+
+
+class BackfillState:
+    """
+    Persistent record of the Batch API jobs submitted for a Drive folder.
+    Saved after every submission, so a restarted process resumes polling
+    the batches already running instead of paying for them twice.
+    """
+
+    def __init__(self, path: str):
+        """
+        Load the state from disk if it exists.
+
+        Args:
+            path (str): Location of the state JSON file.
+        """
+        self.path = path
+        self.batches: List[Dict] = []
+        self._load()
+
+
+    @classmethod
+    def for_folder(cls, state_dir: str, folder_id: str) -> "BackfillState":
+        """
+        Open the backfill state belonging to a Drive folder.
+
+        Args:
+            state_dir (str): Directory holding backfill state (and JSONL input files).
+            folder_id (str): Google Drive folder ID.
+
+        Returns:
+            BackfillState: State for the folder.
+        """
+        return cls(os.path.join(state_dir, f"{folder_id}.json"))
+
+
+    @property
+    def pending_file_ids(self) -> set:
+        """
+        Drive file IDs covered by a batch whose results are not collected yet.
+        """
+        return {file_id for batch in self.pending() for file_id in batch["files"]}
+
+
+    def pending(self) -> List[Dict]:
+        """
+        Batches whose results have not been collected yet.
+        """
+        return [batch for batch in self.batches if not batch.get("collected")]
+
+
+    def add_batch(self, batch_id: str, input_path: str, files: Dict[str, Dict]):
+        """
+        Record a submitted batch.
+
+        Args:
+            batch_id (str): Batch ID returned by the Batch API.
+            input_path (str): Local JSONL input file.
+            files (Dict[str, Dict]): By custom_id (the Drive file ID): {"file": Drive file
+                                     metadata, "cache_key": summary cache key or None}.
+        """
+        self.batches.append({
+            "batch_id": batch_id,
+            "input_path": input_path,
+            "files": files,
+            "collected": False,
+        })
+
+
+    def mark_collected(self, batch_id: str):
+        """
+        Flag a batch whose results have been handed out.
+
+        Args:
+            batch_id (str): Batch ID.
+        """
+        for batch in self.batches:
+            if batch["batch_id"] == batch_id:
+                batch["collected"] = True
+
+
+    def save(self):
+        """
+        Write the state atomically (temp file + rename).
+        """
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+
+        payload = {"version": BACKFILL_STATE_VERSION, "batches": self.batches}
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+    def clear(self):
+        """
+        Delete the state file and the JSONL inputs once every batch is collected.
+        """
+        for batch in self.batches:
+            input_path: Optional[str] = batch.get("input_path")
+            if input_path and os.path.exists(input_path):
+                os.remove(input_path)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.batches = []
+        logger.info(f"Backfill state cleared: {self.path}")
+
+
+    def _load(self):
+        """
+        Read the state file, ignoring it if it is missing or unreadable.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable backfill state '{self.path}': {e}")
+            return
+
+        if payload.get("version") != BACKFILL_STATE_VERSION:
+            logger.info(f"Backfill state version changed, starting fresh: {self.path}")
+            return
+
+        self.batches = payload.get("batches", [])
+        logger.info(
+            f"Loaded backfill state: {self.path} ({len(self.pending())} batches pending)"
+        )
@@ -0,0 +1,224 @@
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.pipeline import Pipeline
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED    = "queued"
+JOB_RUNNING   = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED    = "failed"
+
+
+class Job:
+    """
+    A background summarization run for one Drive folder.
+    Results are appended as each file finishes, so callers can poll for progress.
+    """
+
+    def __init__(self, folder_id: str, download_dir: str, backfill: bool = False):
+        self.id = uuid.uuid4().hex
+        self.folder_id = folder_id
+        self.download_dir = download_dir
+        self.backfill = backfill
+        self.status = JOB_QUEUED
+        self.total: Optional[int] = None
+        self.results: List[Dict] = []
+        # Files dropped because their download failed (they have no result)
+        self.skipped = 0
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.status in (JOB_QUEUED, JOB_RUNNING)
+
+    @property
+    def key(self) -> Tuple[str, bool]:
+        """
+        Settings that make two requests the same run (see JobManager.submit).
+        download_dir is only scratch space and does not change the results.
+        """
+        return self.folder_id, self.backfill
+
+    def add_result(self, result: Dict):
+        with self._lock:
+            self.results.append(result)
+
+    def add_skipped(self, file: Dict):
+        with self._lock:
+            self.skipped += 1
+
+    def to_dict(self, include_results: bool = True) -> Dict:
+        """
+        Snapshot of the job for the API.
+
+        Args:
+            include_results (bool): Include the (partial) result dicts.
+
+        Returns:
+            Dict: Job status, progress and results.
+        """
+        with self._lock:
+            results = list(self.results)
+            skipped = self.skipped
+
+        data = {
+            "job_id": self.id,
+            "folder_id": self.folder_id,
+            "backfill": self.backfill,
+            "status": self.status,
+            "progress": {
+                "done": len(results) + skipped,
+                "total": self.total,
+                "skipped": skipped,
+            },
+            "success_count": sum(1 for r in results if r["status"] == "success"),
+            "failed_count": sum(1 for r in results if r["status"] == "error"),
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if include_results:
+            data["results"] = results
+        return data
+
+
+class JobManager:
+    """
+    Runs Pipeline jobs on a small thread pool and tracks their state.
+    A request matching an active job (same folder and backfill mode) attaches
+    to it instead of starting a duplicate run, whatever its download_dir.
+    """
+
+    def __init__(self, max_workers: int = Config.JOB_WORKERS,
+                 history_limit: int = Config.JOB_HISTORY_LIMIT,
+                 pipeline_factory: Optional[Callable[[str, str, bool], Pipeline]] = None):
+        """
+        Args:
+            max_workers (int): Jobs allowed to run at the same time.
+            history_limit (int): Finished jobs kept for polling before being dropped.
+            pipeline_factory (Callable): Called as pipeline_factory(folder_id, download_dir, backfill)
+                                         to build each job's Pipeline. Defaults to Pipeline.
+        """
+        self.pipeline_factory = pipeline_factory or (
+            lambda folder_id, download_dir, backfill: Pipeline(
+                folder_id=folder_id, download_dir=download_dir, backfill=backfill
+            )
+        )
+        self.history_limit = history_limit
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._active_by_key: Dict[Tuple[str, bool], str] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+
+
+    def submit(self, folder_id: str, download_dir: str = "downloads",
+               backfill: bool = False) -> Tuple[Job, bool]:
+        """
+        Start a job for a folder, or return the one already running for it
+        in the same backfill mode. Two backfill runs of a folder would share
+        (and clear) its BackfillState, so they are never started side by side.
+
+        Args:
+            folder_id (str): Google Drive folder ID.
+            download_dir (str): Local directory to store downloaded files.
+            backfill (bool): Summarize through the OpenAI Batch API.
+
+        Returns:
+            Tuple[Job, bool]: The job, and True if it was newly created.
+        """
+        job = Job(folder_id, download_dir, backfill)
+        with self._lock:
+            existing_id = self._active_by_key.get(job.key)
+            if existing_id:
+                existing = self._jobs[existing_id]
+                if existing.download_dir != download_dir:
+                    logger.info(
+                        f"Job {existing_id} downloads to '{existing.download_dir}'; "
+                        f"ignoring requested download_dir '{download_dir}'."
+                    )
+                logger.info(f"Attaching to running job {existing_id} for folder: {folder_id}")
+                return existing, False
+
+            self._jobs[job.id] = job
+            self._active_by_key[job.key] = job.id
+            self._trim_history()
+
+        self._executor.submit(self._run, job)
+        logger.info(f"Job {job.id} queued for folder: {folder_id}")
+        return job, True
+
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Look up a job by ID.
+
+        Args:
+            job_id (str): Job ID returned by submit.
+
+        Returns:
+            Optional[Job]: The job, or None if unknown or expired.
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+    def shutdown(self):
+        """
+        Stop accepting jobs and drop the queued ones.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+    def _run(self, job: Job):
+        """
+        Execute the pipeline for a job, recording progress as files finish.
+        """
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+
+        try:
+            pipeline = self.pipeline_factory(job.folder_id, job.download_dir, job.backfill)
+            results = pipeline.run(
+                on_listed=lambda total: setattr(job, "total", total),
+                on_result=job.add_result,
+                on_skipped=job.add_skipped
+            )
+            # Replace the completion-ordered partials with the listing-ordered results
+            with job._lock:
+                job.results = results
+            job.status = JOB_COMPLETED
+            logger.info(f"Job {job.id} completed: {len(results)} results.")
+
+        except Exception as e:
+            job.error = str(e)
+            job.status = JOB_FAILED
+            logger.error(f"Job {job.id} failed: {e}")
+
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._active_by_key.get(job.key) == job.id:
+                    del self._active_by_key[job.key]
+
+
+    def _trim_history(self):
+        """
+        Drop the oldest finished jobs beyond history_limit. Caller must hold the lock.
+        """
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(finished) - self.history_limit)]:
+            del self._jobs[job_id]
+
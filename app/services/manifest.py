@@ -0,0 +1,166 @@
+import os
+import json
+import logging
+import tempfile
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 2
+
+
+class SyncManifest:
+    """
+    Persistent record of the files already summarized for a Drive folder.
+    Each entry stores the Drive fingerprint (md5Checksum, modifiedTime, size)
+    together with the result dict, so unchanged files can reuse their summary.
+    """
+
+    def __init__(self, path: str, settings: Optional[str] = None):
+        """
+        Load the manifest from disk if it exists.
+
+        Args:
+            path (str): Location of the manifest JSON file.
+            settings (str): Fingerprint of the summary settings (model, prompts,
+                            mode, chunking) that produced the stored summaries.
+                            Entries written under other settings are discarded.
+        """
+        self.path = path
+        self.settings = settings
+        self.entries: Dict[str, Dict] = {}
+        self._load()
+
+
+    @classmethod
+    def for_folder(cls, manifest_dir: str, folder_id: str,
+                   settings: Optional[str] = None) -> "SyncManifest":
+        """
+        Open the manifest belonging to a Drive folder.
+
+        Args:
+            manifest_dir (str): Directory holding manifest files.
+            folder_id (str): Google Drive folder ID.
+            settings (str): Fingerprint of the summary settings.
+
+        Returns:
+            SyncManifest: Manifest for the folder.
+        """
+        return cls(os.path.join(manifest_dir, f"{folder_id}.json"), settings=settings)
+
+
+    def lookup(self, file: Dict) -> Optional[Dict]:
+        """
+        Return the stored result for a file if it has not changed.
+
+        Args:
+            file (Dict): File metadata from DriveClient.list_files.
+
+        Returns:
+            Optional[Dict]: Copy of the stored result dict, or None if the file
+                            is new or has changed.
+        """
+        entry = self.entries.get(file["id"])
+        if not entry or entry.get("fingerprint") != self.fingerprint(file):
+            return None
+        return dict(entry["result"])
+
+
+    def record(self, file: Dict, result: Dict):
+        """
+        Store the result for a file along with its current fingerprint.
+
+        Args:
+            file (Dict): File metadata from DriveClient.list_files.
+            result (Dict): Result dict produced by the pipeline.
+        """
+        self.entries[file["id"]] = {
+            "name": file.get("name"),
+            "fingerprint": self.fingerprint(file),
+            "result": result,
+        }
+
+
+    def prune(self, keep_ids: Iterable[str]):
+        """
+        Drop entries for files that are no longer in the folder.
+
+        Args:
+            keep_ids (Iterable[str]): Drive file IDs still present.
+        """
+        keep = set(keep_ids)
+        for file_id in list(self.entries):
+            if file_id not in keep:
+                del self.entries[file_id]
+
+
+    def save(self):
+        """
+        Write the manifest atomically (temp file + rename).
+        """
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+
+        payload = {
+            "version": MANIFEST_VERSION,
+            "settings": self.settings,
+            "files": self.entries,
+        }
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        logger.info(f"Sync manifest saved: {self.path} ({len(self.entries)} entries)")
+
+
+    @staticmethod
+    def fingerprint(file: Dict) -> Dict:
+        """
+        Build the change-detection fingerprint for a Drive file.
+        md5Checksum is preferred; modifiedTime and size cover files without one.
+
+        Args:
+            file (Dict): File metadata from DriveClient.list_files.
+
+        Returns:
+            Dict: Fingerprint values.
+        """
+        if file.get("md5Checksum"):
+            return {"md5Checksum": file["md5Checksum"]}
+        return {
+            "modifiedTime": file.get("modifiedTime"),
+            "size": file.get("size"),
+        }
+
+
+    def _load(self):
+        """
+        Read the manifest file, ignoring it if it is missing or unreadable.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sync manifest '{self.path}': {e}")
+            return
+
+        if payload.get("version") != MANIFEST_VERSION:
+            logger.info(f"Sync manifest version changed, starting fresh: {self.path}")
+            return
+
+        if self.settings and payload.get("settings") != self.settings:
+            logger.info(f"Summary settings changed since last sync, starting fresh: {self.path}")
+            return
+
+        self.entries = payload.get("files", {})
+        logger.info(f"Loaded sync manifest: {self.path} ({len(self.entries)} entries)")
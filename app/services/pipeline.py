@@ -1,9 +1,27 @@
+import os
+import json
+import time
 import logging
-from typing import List, Dict
+from contextlib import nullcontext
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from app.clients.drive_client import DriveClient
+from app.clients.batch_client import BatchClient
 from app.parser.parser_factory import parse_document
+from app.parser.source import DocumentSource
+from app.parser.process_pool import get_parser_pool
+from app.parser.parse_cache import get_parse_cache
 from app.summarizer.ai_summarizer import AISummarizer
+from app.summarizer.packer import DocumentPacker
+from app.summarizer.near_duplicates import FingerprintEntry, get_near_duplicate_index
+from app.services.manifest import SyncManifest
+from app.services.backfill_state import BackfillState
+from app.services.profiler import RunProfiler
+from app.clients.retry import RetryBudget
+from app.services.staged_executor import StagedExecutor, Stage, Done
+from app.metrics import NEAR_DUPLICATE_REUSES
+from app.config import Config
 
 logger = logging.getLogger(__name__)
 
@@ -15,20 +33,50 @@ class Pipeline:
         Google Drive → Parser → AI Summarizer → Results
     """
 
-    def __init__(self, folder_id: str, download_dir: str = "downloads"):
+    def __init__(self, folder_id: str, download_dir: str = "downloads",
+                 incremental: bool = Config.INCREMENTAL_SYNC,
+                 staged: bool = Config.PIPELINE_STAGED,
+                 drive_client: Optional[DriveClient] = None,
+                 summarizer: Optional[AISummarizer] = None,
+                 backfill: bool = False,
+                 profiler: Optional[RunProfiler] = None):
         """
         Initialize Pipeline with required services.
 
         Args:
             folder_id (str): Google Drive folder ID to fetch documents from.
             download_dir (str): Local directory to store downloaded files.
+            incremental (bool): Skip files unchanged since the last run and
+                                reuse their stored summaries.
+            staged (bool): Overlap download, parse and summarize in separate
+                           worker pools instead of running them one after another.
+            drive_client (DriveClient): Shared Drive client. Created if not given.
+            summarizer (AISummarizer): Shared summarizer. Created if not given.
+            backfill (bool): Summarize through the OpenAI Batch API instead of one
+                             chat call per file. Cheaper for large folders but
+                             can take hours; resumes submitted batches after a restart.
+            profiler (RunProfiler): Records timing spans (and parse profiles) of this run.
         """
         self.folder_id = folder_id
         self.download_dir = download_dir
-
-        # Initialize all services
-        self.drive_client = DriveClient()
-        self.summarizer = AISummarizer()
+        self.staged = staged
+        self.backfill = backfill
+        self.retry_budget = RetryBudget(Config.LLM_RUN_RETRY_BUDGET)
+        self.packer: Optional[DocumentPacker] = None
+        self.profiler = profiler
+        self.near_duplicates = get_near_duplicate_index()
+        self._on_skipped: Optional[Callable[[Dict], None]] = None
+
+        # Initialize all services (reuse the app-wide ones when provided)
+        self.drive_client = drive_client or DriveClient()
+        self.summarizer = summarizer or AISummarizer()
+        self.manifest = (
+            SyncManifest.for_folder(
+                Config.SYNC_MANIFEST_DIR, folder_id,
+                settings=self.summarizer.settings_fingerprint(),
+            )
+            if incremental else None
+        )
 
         logger.info(f"Pipeline initialized for folder: {folder_id}")
 
@@ -36,7 +84,9 @@ class Pipeline:
     # Main Run
     # ------------------------------------------------------------------
 
-    def run(self) -> List[Dict]:
+    def run(self, on_listed: Optional[Callable[[int], None]] = None,
+            on_result: Optional[Callable[[Dict], None]] = None,
+            on_skipped: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
         """
         Execute the full pipeline:
             1. Fetch files from Google Drive
@@ -44,6 +94,13 @@ class Pipeline:
             3. Summarize each document using AI
             4. Return structured results
 
+        Args:
+            on_listed (Callable): Optional callback receiving the number of files found.
+            on_result (Callable): Optional callback receiving each result dict as soon
+                                  as it is ready (completion order).
+            on_skipped (Callable): Optional callback receiving the metadata of each
+                                   file skipped because its download failed.
+
         Returns:
             List[Dict]: Each dict contains:
                 - file_name  (str): Name of the document
@@ -51,66 +108,501 @@ class Pipeline:
                 - status     (str): 'success' or 'error'
                 - error      (str): Error message if status is 'error'
         """
+        order = {}
+        self._on_skipped = on_skipped
+
+        def record_listing(files: List[Dict]):
+            order.update((f["id"], i) for i, f in enumerate(files))
+            if on_listed:
+                on_listed(len(files))
+
+        collected = []
+        for file, result in self.iter_results(record_listing):
+            collected.append((order[file["id"]], result))
+            if on_result:
+                on_result(result)
+
+        results = [result for _, result in sorted(collected, key=lambda item: item[0])]
+
+        # ---- Summary Log ----
+        success = sum(1 for r in results if r["status"] == "success")
+        failed  = sum(1 for r in results if r["status"] == "error")
+        logger.info(f"Pipeline complete. Success: {success} | Failed: {failed}")
+        if self.retry_budget.used:
+            logger.info(
+                f"LLM retries this run: {self.retry_budget.used} "
+                f"({self.retry_budget.total_delay:.1f}s spent in backoff)"
+            )
+
+        return results
+
+
+    def iter_results(self, on_listed: Optional[Callable[[List[Dict]], None]] = None
+                     ) -> Iterator[Tuple[Dict, Dict]]:
+        """
+        Yield (file metadata, result dict) pairs as files finish, without
+        holding the full results list. Unchanged files come first with their
+        stored results; the rest follow in completion order. The sync manifest
+        is saved once all are done.
+
+        Args:
+            on_listed (Callable): Optional callback receiving the listed files
+                                  before processing starts.
+
+        Yields:
+            Tuple[Dict, Dict]: File metadata and its result dict.
+        """
         logger.info("Pipeline started.")
-        results = []
+        self.retry_budget = RetryBudget(Config.LLM_RUN_RETRY_BUDGET)
 
         # ---- Step 1: Fetch files from Google Drive ----
         logger.info(f"Step 1: Fetching files from Drive folder: {self.folder_id}")
-        files = self._fetch_files()
+        with self._span("list"):
+            listed = self._list_files()
+        if on_listed:
+            on_listed(listed)
 
-        if not files:
+        if not listed:
             logger.warning("No files found in the Drive folder. Pipeline stopped.")
-            return []
+            return
+
+        # Unchanged files reuse the result stored by the previous run
+        pending = []
+        reused = 0
+        for file in listed:
+            previous = self.manifest.lookup(file) if self.manifest else None
+            if previous:
+                reused += 1
+                yield file, previous
+            else:
+                pending.append(file)
+
+        if self.manifest:
+            logger.info(
+                f"Incremental sync: {reused} unchanged, {len(pending)} new or changed."
+            )
 
-        logger.info(f"Fetched {len(files)} files from Drive.")
+        for file, result in self._process_pending(pending):
+            if self.manifest and result["status"] == "success":
+                self.manifest.record(file, result)
+            yield file, result
 
-   
-        for file in files:
+        if self.manifest:
+            self.manifest.prune(f["id"] for f in listed)
+            self.manifest.save()
+
+
+    def _process_pending(self, files: List[Dict]) -> Iterator[Tuple[Dict, Dict]]:
+        """
+        Download, parse and summarize the files that need processing.
+        Files that fail to download are skipped.
+
+        Args:
+            files (List[Dict]): File metadata from _list_files.
+
+        Yields:
+            Tuple[Dict, Dict]: (file metadata, result dict) pairs as they finish.
+        """
+        if not files:
+            return
+
+        if self.backfill:
+            yield from self._run_backfill(files)
+            return
+
+        if self.staged:
+            yield from self._run_staged(files)
+            return
+
+        # Files are downloaded together here, so the run gets one download span
+        with self._span("download", files=len(files)):
+            downloaded = self._fetch_files(files)
+        logger.info(f"Fetched {len(downloaded)} files from Drive.")
+
+        for file in downloaded:
             file_name = file.get("name", "unknown")
-            local_path = file.get("local_path", "")
-            result = self._process_file(file_name, local_path)
-            results.append(result)
+            source, file_type = self._take_source(file)
+            yield file, self._process_file(
+                file_name, source, file_type, file.get("id"), file.get("md5Checksum")
+            )
 
-        # ---- Summary Log ----
-        success = sum(1 for r in results if r["status"] == "success")
-        failed  = sum(1 for r in results if r["status"] == "error")
-        logger.info(f"Pipeline complete. Success: {success} | Failed: {failed}")
 
-        return results
+    # ------------------------------------------------------------------
+    # Staged Run (download / parse / summarize overlapped)
+    # ------------------------------------------------------------------
+
+    def _run_staged(self, files: List[Dict]) -> Iterator[Tuple[Dict, Dict]]:
+        """
+        Run download, parse and summarize concurrently, each stage with its
+        own worker pool, joined by bounded queues for backpressure.
+
+        Args:
+            files (List[Dict]): File metadata from _list_files.
+
+        Yields:
+            Tuple[Dict, Dict]: (file metadata, result dict) pairs in completion order.
+        """
+        if Config.SUMMARY_PACK_ENABLED:
+            self.packer = DocumentPacker(self.summarizer, retry_budget=self.retry_budget)
+
+        executor = StagedExecutor(
+            stages=[
+                Stage("download", self._download_stage, workers=Config.PIPELINE_DOWNLOAD_WORKERS),
+                Stage("parse", self._parse_stage, workers=Config.PIPELINE_PARSE_WORKERS),
+                Stage("summarize", self._summarize_stage, workers=Config.PIPELINE_SUMMARIZE_WORKERS),
+            ],
+            queue_size=Config.PIPELINE_QUEUE_SIZE,
+            on_error=self._stage_error
+        )
+
+        logger.info(f"Staged run over {len(files)} files.")
+        for index, result in executor.run(files):
+            if result is not None:
+                yield files[index], result
+
+
+    def _download_stage(self, file: Dict) -> Union[Dict, Done]:
+        """
+        Stage 1: download one file. Failed downloads are skipped.
+        """
+        with self._span("download", file.get("id"), file.get("name")):
+            downloaded = self.drive_client.download_entry(
+                file, self.download_dir, Config.DRIVE_DOWNLOAD_TIMEOUT,
+                in_memory=Config.DOWNLOAD_IN_MEMORY
+            )
+        if not downloaded:
+            self._record_skipped(file)
+            return Done(None)
+        return file
+
+
+    def _parse_stage(self, file: Dict) -> Union[Tuple[Dict, str, object], Done]:
+        """
+        Stage 2: extract and fingerprint text, finishing early when nothing was extracted.
+        """
+        file_name = file.get("name", "unknown")
+        source, file_type = self._take_source(file)
+        with self._span("parse", file.get("id"), file_name):
+            text = self._parse_file(
+                file_name, source, file_type, file.get("id"), file.get("md5Checksum")
+            )
+        if not text:
+            return Done(self._empty_result(file_name))
+        return file, text, self._fingerprint(file.get("id"), file_name, text)
+
+
+    def _summarize_stage(self, item: Tuple[Dict, str, object]) -> Union[Dict, Future]:
+        """
+        Stage 3: summarize the extracted text, or reuse a near-duplicate's
+        summary. Small documents are handed to the packer when packing is
+        enabled and finish once their pack is answered.
+        """
+        file, text, signature = item
+        file_name = file.get("name", "unknown")
+
+        claim, reused = self._claim_summary(file.get("id"), file_name, signature)
+        if reused:
+            return reused
+
+        if self.packer and self.summarizer.is_packable(text):
+            span = self.profiler.start_span(
+                "summarize", file.get("id"), file_name, packed=True
+            ) if self.profiler else None
+            packed = self.packer.submit(file_name, text)
+            result = Future()
+
+            def finish(future: Future):
+                if span:
+                    span.finish(future.exception())
+                self._settle_claim(claim, None if future.exception() else future.result())
+                try:
+                    result.set_result(self._success_result(file_name, future.result()))
+                except Exception as e:
+                    result.set_exception(e)
+
+            packed.add_done_callback(finish)
+            return result
+
+        summary = None
+        try:
+            with self._span("summarize", file.get("id"), file_name):
+                summary = self._summarize_file(file_name, text)
+        finally:
+            self._settle_claim(claim, summary)
+        return self._success_result(file_name, summary)
+
+
+    def _stage_error(self, stage: str, payload, error: Exception) -> Dict:
+        """
+        Turn an exception raised inside a stage into an error result.
+        """
+        file = payload[0] if isinstance(payload, tuple) else payload
+        file_name = file.get("name", "unknown")
+        logger.error(f"Error processing '{file_name}' ({stage}): {error}")
+        return self._error_result(file_name, error)
+
+
+    # ------------------------------------------------------------------
+    # Backfill Run (OpenAI Batch API)
+    # ------------------------------------------------------------------
+
+    def _run_backfill(self, files: List[Dict]) -> Iterator[Tuple[Dict, Dict]]:
+        """
+        Summarize files through the Batch API: files not already part of a
+        running batch are downloaded, parsed and written to JSONL batches;
+        then every uncollected batch (including ones submitted before a
+        restart) is polled and its outputs mapped back to result dicts.
+
+        Args:
+            files (List[Dict]): File metadata from _list_files.
+
+        Yields:
+            Tuple[Dict, Dict]: (file metadata, result dict) pairs.
+        """
+        state = BackfillState.for_folder(Config.BACKFILL_STATE_DIR, self.folder_id)
+        batch_client = BatchClient(self.summarizer.llm)
+
+        in_flight = state.pending_file_ids
+        if in_flight:
+            logger.info(
+                f"Resuming backfill: {len(state.pending())} batches, {len(in_flight)} files in flight."
+            )
+
+        new_files = [f for f in files if f["id"] not in in_flight]
+        if new_files:
+            yield from self._submit_backfill(new_files, state, batch_client)
+
+        listed = {f["id"] for f in files}
+        for batch in state.pending():
+            yield from self._collect_backfill(batch, batch_client, listed)
+            state.mark_collected(batch["batch_id"])
+            state.save()
+
+        state.clear()
+
+
+    def _submit_backfill(self, files: List[Dict], state: BackfillState,
+                         batch_client: BatchClient) -> Iterator[Tuple[Dict, Dict]]:
+        """
+        Download and parse files, then submit the ones needing a summary as batches.
+        Parse failures, empty documents and cached summaries are yielded directly.
+        """
+        with self._span("download", files=len(files)):
+            downloaded = self._fetch_files(files)
+        logger.info(f"Fetched {len(downloaded)} files from Drive.")
+
+        requests = []
+        for file in downloaded:
+            file_name = file.get("name", "unknown")
+            source, file_type = self._take_source(file)
+            try:
+                with self._span("parse", file.get("id"), file_name):
+                    text = self._parse_file(
+                        file_name, source, file_type, file.get("id"), file.get("md5Checksum")
+                    )
+            except Exception as e:
+                logger.error(f"Error processing '{file_name}': {e}")
+                yield file, self._error_result(file_name, e)
+                continue
+
+            if not text:
+                yield file, self._empty_result(file_name)
+                continue
+
+            cache_key = self.summarizer.cache_key(text, single_request=True)
+            cached = self.summarizer.cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                logger.info(f"Summary cache hit for: '{file_name}'")
+                yield file, self._success_result(file_name, cached)
+                continue
+
+            system_prompt, user_prompt = self.summarizer.single_request_prompts(text, file_name)
+            line = batch_client.request_line(file["id"], system_prompt, user_prompt)
+            requests.append((file, cache_key, json.dumps(line, ensure_ascii=False) + "\n"))
+
+        for index, chunk in enumerate(self._chunk_requests(requests)):
+            input_path = os.path.join(
+                Config.BACKFILL_STATE_DIR,
+                f"{self.folder_id}-{int(time.time())}-{index}.jsonl"
+            )
+            os.makedirs(Config.BACKFILL_STATE_DIR, exist_ok=True)
+            with open(input_path, "w", encoding="utf-8") as f:
+                for _, _, line in chunk:
+                    f.write(line)
+
+            batch_id = batch_client.submit(input_path, metadata={"folder_id": self.folder_id})
+            state.add_batch(batch_id, input_path, {
+                file["id"]: {"file": file, "cache_key": cache_key}
+                for file, cache_key, _ in chunk
+            })
+            state.save()
+            logger.info(f"Backfill batch {batch_id} submitted with {len(chunk)} documents.")
+
+
+    @staticmethod
+    def _chunk_requests(requests: List[Tuple[Dict, Optional[str], str]]
+                        ) -> Iterator[List[Tuple[Dict, Optional[str], str]]]:
+        """
+        Split serialized batch requests into batches of at most
+        BACKFILL_MAX_REQUESTS lines and BACKFILL_MAX_FILE_BYTES of JSONL
+        (the Batch API rejects larger input files).
+
+        Args:
+            requests (List[Tuple]): (file, cache_key, JSONL line) per document.
+
+        Yields:
+            List[Tuple]: One batch worth of requests.
+        """
+        max_requests = max(1, Config.BACKFILL_MAX_REQUESTS)
+        chunk, size = [], 0
+        for request in requests:
+            line_size = len(request[2].encode("utf-8"))
+            if chunk and (len(chunk) >= max_requests
+                          or size + line_size > Config.BACKFILL_MAX_FILE_BYTES):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(request)
+            size += line_size
+        if chunk:
+            yield chunk
+
+
+    def _collect_backfill(self, batch: Dict, batch_client: BatchClient,
+                          listed: set) -> Iterator[Tuple[Dict, Dict]]:
+        """
+        Wait for one batch and turn its outputs into result dicts,
+        storing successful summaries in the summary cache.
+        """
+        finished = batch_client.wait(batch["batch_id"], poll_interval=Config.BACKFILL_POLL_INTERVAL)
+        outputs = batch_client.results(finished)
+
+        for custom_id, entry in batch["files"].items():
+            if custom_id not in listed:
+                # Removed from the folder (or already handled) since the batch was submitted
+                continue
+
+            file = entry["file"]
+            file_name = file.get("name", "unknown")
+            output = outputs.get(custom_id)
+
+            if output is None:
+                error = RuntimeError(f"Batch {finished.status}: request was not processed.")
+                yield file, self._error_result(file_name, error)
+            elif "error" in output:
+                yield file, self._error_result(file_name, RuntimeError(output["error"]))
+            else:
+                if entry.get("cache_key") and self.summarizer.cache:
+                    self.summarizer.cache.set(entry["cache_key"], output["content"])
+                yield file, self._success_result(file_name, output["content"])
 
 
-    def _fetch_files(self) -> List[Dict]:
+    def _list_files(self) -> List[Dict]:
         """
-        Download all supported files from the configured Drive folder.
+        List all supported files in the configured Drive folder.
+
+        Returns:
+            List[Dict]: File metadata including md5Checksum/modifiedTime/size.
+        """
+        try:
+            return self.drive_client.list_files(self.folder_id)
+        except Exception as e:
+            logger.error(f"Failed to list files from Drive: {e}")
+            raise RuntimeError(f"Drive fetch error: {e}") from e
+
+
+    def _fetch_files(self, files: List[Dict]) -> List[Dict]:
+        """
+        Download the given files from Google Drive to disk.
+        Every file is downloaded before any is parsed, so DOWNLOAD_IN_MEMORY
+        is not applied here (buffers would pile up with the folder size); only
+        the staged path, bounded by its queues, downloads into memory.
+
+        Args:
+            files (List[Dict]): File metadata from _list_files.
 
         Returns:
             List[Dict]: File metadata with 'local_path' included.
         """
         try:
-            files = self.drive_client.download_all_files(
-                folder_id=self.folder_id,
-                download_dir=self.download_dir
+            downloaded = self.drive_client.download_files(
+                files,
+                download_dir=self.download_dir,
+                in_memory=False
             )
-            return files
         except Exception as e:
             logger.error(f"Failed to fetch files from Drive: {e}")
             raise RuntimeError(f"Drive fetch error: {e}") from e
 
+        fetched = {f.get("id") for f in downloaded}
+        for file in files:
+            if file.get("id") not in fetched:
+                self._record_skipped(file)
+        return downloaded
+
+    def _record_skipped(self, file: Dict):
+        """
+        Report a file dropped because its download failed.
+        """
+        if self._on_skipped:
+            self._on_skipped(file)
+
 
 
-    def _parse_file(self, file_name: str, local_path: str) -> str:
+    @staticmethod
+    def _take_source(file: Dict) -> Tuple[DocumentSource, Optional[str]]:
         """
-        Extract text from a downloaded document.
+        Return what to parse for a downloaded file and its file type.
+        In-memory content is removed from the metadata, so the buffer is
+        freed once parsed and never ends up in results or saved state.
+
+        Args:
+            file (Dict): File metadata from _fetch_files / download_entry.
+
+        Returns:
+            Tuple[DocumentSource, Optional[str]]: (content bytes, extension), or
+                                                  (local path, None) for files on disk.
+        """
+        content = file.pop("content", None)
+        if content is not None:
+            return content, file.get("extension")
+        return file.get("local_path", ""), None
+
+
+    def _parse_file(self, file_name: str, source: DocumentSource,
+                    file_type: Optional[str] = None, file_id: Optional[str] = None,
+                    checksum: Optional[str] = None) -> str:
+        """
+        Extract text from a downloaded document, reusing the parse cache
+        when the same file content was parsed before.
 
         Args:
             file_name (str): Name of the file.
-            local_path (str): Local path to the file.
+            source (DocumentSource): Local path to the file, or its downloaded bytes.
+            file_type (str): Extension of an in-memory file (e.g. ".pdf").
+            file_id (str): Google Drive file ID (parse cache key).
+            checksum (str): Drive md5Checksum (parse cache key).
 
         Returns:
             str: Extracted text content.
         """
         logger.info(f"Step 2: Parsing '{file_name}'")
-        text = parse_document(local_path)
+        # Stop extracting once the summarizer has all the text it will use
+        budget = self.summarizer.text_budget
+
+        cache = get_parse_cache()
+        cache_key = cache.make_key(source, budget, file_id, checksum) if cache else None
+        text = cache.get(cache_key) if cache_key else None
+
+        if text is not None:
+            logger.info(f"Parse cache hit for: '{file_name}'")
+        else:
+            with self.profiler.profile_parse() if self.profiler else nullcontext():
+                if Config.PARSE_MODE == "process":
+                    text = get_parser_pool().parse(source, max_chars=budget, file_type=file_type)
+                else:
+                    text = parse_document(source, max_chars=budget, file_type=file_type)
+            if cache_key:
+                cache.set(cache_key, text or "")
 
         if not text or not text.strip():
             logger.warning(f"No text extracted from '{file_name}'.")
@@ -133,7 +625,9 @@ class Pipeline:
             str: AI-generated summary.
         """
         logger.info(f"Step 3: Summarizing '{file_name}'")
-        summary = self.summarizer.summarize(text=text, file_name=file_name)
+        summary = self.summarizer.summarize(
+            text=text, file_name=file_name, retry_budget=self.retry_budget
+        )
         logger.info(f"Summarized '{file_name}' successfully.")
         return summary
 
@@ -141,44 +635,167 @@ class Pipeline:
     # Process Single File (Step 2 + 3 combined)
     # ------------------------------------------------------------------
 
-    def _process_file(self, file_name: str, local_path: str) -> Dict:
+    def _process_file(self, file_name: str, source: DocumentSource,
+                      file_type: Optional[str] = None, file_id: Optional[str] = None,
+                      checksum: Optional[str] = None) -> Dict:
         """
         Parse and summarize a single file, handling errors gracefully.
 
         Args:
             file_name (str): Name of the file.
-            local_path (str): Local path to the downloaded file.
+            source (DocumentSource): Local path to the downloaded file, or its bytes.
+            file_type (str): Extension of an in-memory file.
+            file_id (str): Google Drive file ID (parse cache key).
+            checksum (str): Drive md5Checksum (parse cache key).
 
         Returns:
             Dict: Result with keys: file_name, summary, status, error (if any).
         """
         try:
             # Step 2: Parse
-            text = self._parse_file(file_name, local_path)
+            with self._span("parse", file_id, file_name):
+                text = self._parse_file(file_name, source, file_type, file_id, checksum)
 
             if not text:
-                return {
-                    "file_name": file_name,
-                    "summary": "Could not extract any text from this document.",
-                    "status": "error",
-                    "error": "Empty content after parsing."
-                }
+                return self._empty_result(file_name)
+
+            signature = self._fingerprint(file_id, file_name, text)
+            claim, reused = self._claim_summary(file_id, file_name, signature)
+            if reused:
+                return reused
 
             # Step 3: Summarize
-            summary = self._summarize_file(file_name, text)
+            summary = None
+            try:
+                with self._span("summarize", file_id, file_name):
+                    summary = self._summarize_file(file_name, text)
+            finally:
+                self._settle_claim(claim, summary)
 
-            return {
-                "file_name": file_name,
-                "summary": summary,
-                "status": "success",
-                "error": None
-            }
+            return self._success_result(file_name, summary)
 
         except Exception as e:
             logger.error(f"Error processing '{file_name}': {e}")
-            return {
-                "file_name": file_name,
-                "summary": f"Processing failed: {str(e)}",
-                "status": "error",
-                "error": str(e)
-            }
\ No newline at end of file
+            return self._error_result(file_name, e)
+
+    # ------------------------------------------------------------------
+    # Near-Duplicate Reuse
+    # ------------------------------------------------------------------
+
+    def _fingerprint(self, file_id: Optional[str], file_name: str, text: str):
+        """
+        MinHash signature of the extracted text, or None when near-duplicate
+        reuse is disabled.
+        """
+        if self.near_duplicates is None:
+            return None
+        with self._span("fingerprint", file_id, file_name):
+            return self.near_duplicates.signature(text)
+
+    def _claim_summary(self, file_id: Optional[str], file_name: str, signature
+                       ) -> Tuple[Optional[FingerprintEntry], Optional[Dict]]:
+        """
+        Reuse the summary of an indexed near-duplicate (from the same folder
+        unless NEAR_DUPLICATE_CROSS_FOLDER), or claim the document as a new
+        index entry. A neighbour still being summarized is waited for up to
+        NEAR_DUPLICATE_WAIT_TIMEOUT seconds, after which the document is
+        summarized normally; if the neighbour's summary fails, the lookup is repeated.
+
+        Args:
+            file_id (str): Google Drive file ID.
+            file_name (str): Name of the document.
+            signature: Signature from _fingerprint (None skips the lookup).
+
+        Returns:
+            Tuple[Optional[FingerprintEntry], Optional[Dict]]: (None, result) when
+            a summary was reused; otherwise the entry to pass to _settle_claim
+            once summarized (None when there is nothing to settle) and None.
+        """
+        if signature is None:
+            return None, None
+
+        while True:
+            entry, similarity = self.near_duplicates.find_or_add(
+                signature, file_name, file_id, self.folder_id
+            )
+            if similarity is None:
+                return entry, None
+
+            try:
+                summary = entry.summary.result(timeout=Config.NEAR_DUPLICATE_WAIT_TIMEOUT)
+            except FutureTimeoutError:
+                logger.info(
+                    f"Near-duplicate '{entry.file_name}' of '{file_name}' is still being "
+                    f"summarized; summarizing '{file_name}' on its own."
+                )
+                return None, None
+            if summary is not None:
+                logger.info(
+                    f"'{file_name}' is a near-duplicate of '{entry.file_name}' "
+                    f"(similarity {similarity:.2f}); reusing its summary."
+                )
+                NEAR_DUPLICATE_REUSES.inc()
+                return None, self._duplicate_result(file_name, summary, entry, similarity)
+
+    def _settle_claim(self, claim: Optional[FingerprintEntry], summary: Optional[str]):
+        """
+        Publish a claimed document's summary to documents waiting on it.
+        A failed summary (None) removes the entry so it is not matched again.
+        """
+        if claim is None:
+            return
+        if summary is None:
+            self.near_duplicates.discard(claim)
+        claim.summary.set_result(summary)
+
+    def _span(self, name: str, file_id: Optional[str] = None,
+              file_name: Optional[str] = None, **attrs):
+        """
+        Profiling span for a step, or a no-op when the run is not profiled.
+        """
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.span(name, file_id, file_name, **attrs)
+
+    # ------------------------------------------------------------------
+    # Result Dicts
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _success_result(file_name: str, summary: str) -> Dict:
+        return {
+            "file_name": file_name,
+            "summary": summary,
+            "status": "success",
+            "error": None
+        }
+
+    @staticmethod
+    def _duplicate_result(file_name: str, summary: str, neighbour: FingerprintEntry,
+                          similarity: float) -> Dict:
+        result = Pipeline._success_result(file_name, summary)
+        result["duplicate_of"] = {
+            "file_id": neighbour.file_id,
+            "file_name": neighbour.file_name,
+            "folder_id": neighbour.folder_id,
+        }
+        result["similarity"] = round(similarity, 3)
+        return result
+
+    @staticmethod
+    def _empty_result(file_name: str) -> Dict:
+        return {
+            "file_name": file_name,
+            "summary": "Could not extract any text from this document.",
+            "status": "error",
+            "error": "Empty content after parsing."
+        }
+
+    @staticmethod
+    def _error_result(file_name: str, error: Exception) -> Dict:
+        return {
+            "file_name": file_name,
+            "summary": f"Processing failed: {str(error)}",
+            "status": "error",
+            "error": str(error)
+        }
\ No newline at end of file
@@ -0,0 +1,330 @@
+import os
+import io
+import json
+import time
+import uuid
+import pstats
+import cProfile
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Config.PROFILE_DIR
+
+# Functions listed in the parse profile summary, by cumulative time
+TOP_FUNCTIONS = 25
+
+# Slowest files listed at the top of a trace
+SLOWEST_FILES = 5
+
+PROFILE_MODES = ("spans", "cprofile")
+
+# Only one cProfile can be active per process on Python 3.12+ (sys.monitoring),
+# so profiled parses (across threads and runs) take turns
+_CPROFILE_LOCK = threading.Lock()
+
+
+class Span:
+    """
+    One timed step of a run (the run itself, a file, or a stage of a file).
+    """
+
+    def __init__(self, name: str, attrs: Optional[Dict] = None):
+        self.name = name
+        self.attrs = dict(attrs or {})
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List["Span"] = []
+        self._lock = threading.Lock()
+
+    def add_child(self, span: "Span"):
+        with self._lock:
+            self.children.append(span)
+
+    def finish(self, error: Optional[BaseException] = None):
+        """
+        Close the span, recording the error that ended it, if any.
+        """
+        self.end = time.perf_counter()
+        if error is not None:
+            self.attrs["error"] = f"{type(error).__name__}: {error}"
+
+    @property
+    def bounds(self):
+        """
+        (start, end) of the span. A span without its own timing (a file span)
+        covers its children.
+        """
+        with self._lock:
+            children = list(self.children)
+        if self.end is not None or not children:
+            return self.start, self.end
+        ends = [child.bounds[1] for child in children]
+        return (
+            min(child.bounds[0] for child in children),
+            None if None in ends else max(ends),
+        )
+
+    def to_dict(self, origin: float) -> Dict:
+        """
+        Serialize the span tree, with times in milliseconds since origin.
+        """
+        start, end = self.bounds
+        with self._lock:
+            children = list(self.children)
+        return {
+            "name": self.name,
+            **self.attrs,
+            "start_ms": round((start - origin) * 1000, 3),
+            "duration_ms": None if end is None else round((end - start) * 1000, 3),
+            "children": [child.to_dict(origin) for child in children],
+        }
+
+
+class RunProfiler:
+    """
+    Opt-in tracing of one pipeline run.
+    Records nested timing spans (run → file → download/parse/summarize) and,
+    in "cprofile" mode, a cProfile of every parse call merged into one
+    profile. Spans are linked to their file explicitly rather than through
+    thread-locals, since the staged pipeline runs a file's stages on
+    different threads.
+    """
+
+    def __init__(self, mode: str = "spans", run_id: Optional[str] = None, **attrs):
+        """
+        Args:
+            mode (str): "spans" for timings only, "cprofile" to also profile parsing.
+            run_id (str): Identifier the trace is saved under. Generated if not given.
+            **attrs: Extra attributes stored on the run span (folder_id...).
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: '{mode}'. Use one of {PROFILE_MODES}.")
+
+        self.mode = mode
+        self.run_id = run_id or uuid.uuid4().hex
+        self.root = Span("run", {"run_id": self.run_id, **attrs})
+        self._files: Dict[str, Span] = {}
+        self._parse_stats: Optional[pstats.Stats] = None
+        self._lock = threading.Lock()
+
+
+    def file_span(self, file_id: Optional[str], file_name: str) -> Span:
+        """
+        Return the span of a file, creating it under the run on first use.
+
+        Args:
+            file_id (str): Drive file ID (the file name is used if missing).
+            file_name (str): Name of the file.
+
+        Returns:
+            Span: The file's span.
+        """
+        key = file_id or file_name
+        with self._lock:
+            span = self._files.get(key)
+            if span is None:
+                span = Span("file", {"file_id": file_id, "file_name": file_name})
+                self._files[key] = span
+                self.root.add_child(span)
+            return span
+
+
+    def start_span(self, name: str, file_id: Optional[str] = None,
+                   file_name: Optional[str] = None, **attrs) -> Span:
+        """
+        Open a span under a file (or under the run when no file is given).
+        The caller must finish() it; use span() where a with-block fits.
+
+        Args:
+            name (str): Stage name (download, parse, summarize...).
+            file_id (str): Drive file ID of the file the stage belongs to.
+            file_name (str): Name of that file.
+            **attrs: Extra attributes stored on the span.
+
+        Returns:
+            Span: The open span.
+        """
+        span = Span(name, attrs)
+        if file_id or file_name:
+            self.file_span(file_id, file_name or "").add_child(span)
+        else:
+            self.root.add_child(span)
+        return span
+
+
+    @contextmanager
+    def span(self, name: str, file_id: Optional[str] = None,
+             file_name: Optional[str] = None, **attrs) -> Iterator[Span]:
+        """
+        Time the with-block as a span (see start_span). Errors are recorded and re-raised.
+        """
+        span = self.start_span(name, file_id, file_name, **attrs)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e)
+            raise
+        span.finish()
+
+
+    @contextmanager
+    def profile_parse(self) -> Iterator[None]:
+        """
+        Run the with-block under cProfile in "cprofile" mode (no-op otherwise).
+        Each call gets its own profiler, since cProfile only follows the thread
+        that enabled it; the results are merged into the run's parse profile.
+        Profiled parses are serialized by _CPROFILE_LOCK, and if another
+        profiling tool is already active the parse runs unprofiled (spans only).
+        In PARSE_MODE=process this profiles the wait for the worker only.
+        """
+        if self.mode != "cprofile":
+            yield
+            return
+
+        with _CPROFILE_LOCK:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:
+                logger.warning(f"Parse not profiled ({e}); recording spans only.")
+                yield
+                return
+
+            try:
+                yield
+            finally:
+                profile.disable()
+                with self._lock:
+                    if self._parse_stats is None:
+                        self._parse_stats = pstats.Stats(profile, stream=io.StringIO())
+                    else:
+                        self._parse_stats.add(profile)
+
+
+    def finish(self, error: Optional[BaseException] = None):
+        """
+        Close the run span.
+        """
+        self.root.finish(error)
+
+
+    def to_dict(self) -> Dict:
+        """
+        The trace: the span tree, the slowest files and, in "cprofile" mode,
+        the top parse functions by cumulative time.
+
+        Returns:
+            Dict: JSON-serializable trace.
+        """
+        origin = self.root.start
+        tree = self.root.to_dict(origin)
+
+        files = [child for child in tree["children"] if child["name"] == "file"]
+        slowest = sorted(
+            files, key=lambda f: f["duration_ms"] or 0, reverse=True
+        )[:SLOWEST_FILES]
+
+        trace = {
+            "run_id": self.run_id,
+            "mode": self.mode,
+            "slowest_files": [
+                {"file_name": f["file_name"], "file_id": f["file_id"], "duration_ms": f["duration_ms"]}
+                for f in slowest
+            ],
+            "spans": tree,
+        }
+        if self.mode == "cprofile":
+            trace["parse_profile"] = self._top_functions()
+        return trace
+
+
+    def save(self, directory: str = PROFILE_DIR) -> Dict:
+        """
+        Write the trace as <run_id>.json (and the merged parse profile as
+        <run_id>-parse.prof, readable with pstats or snakeviz) atomically.
+
+        Args:
+            directory (str): Folder to save into.
+
+        Returns:
+            Dict: The saved trace (see to_dict).
+        """
+        os.makedirs(directory, exist_ok=True)
+        trace = self.to_dict()
+
+        with self._lock:
+            stats = self._parse_stats
+        if stats is not None:
+            prof_path = os.path.join(directory, f"{self.run_id}-parse.prof")
+            stats.dump_stats(prof_path)
+            trace["parse_profile_path"] = prof_path
+
+        path = os.path.join(directory, f"{self.run_id}.json")
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(trace, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        logger.info(f"Profile saved: {path}")
+        return trace
+
+
+    def _top_functions(self) -> List[Dict]:
+        """
+        The TOP_FUNCTIONS entries of the parse profile by cumulative time.
+        """
+        with self._lock:
+            stats = self._parse_stats
+            if stats is None:
+                return []
+            stats.sort_stats(pstats.SortKey.CUMULATIVE)
+            entries = [(func, stats.stats[func]) for func in stats.fcn_list[:TOP_FUNCTIONS]]
+
+        top = []
+        for (filename, line, name), (_, calls, total, cumulative, _) in entries:
+            top.append({
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "total_s": round(total, 6),
+                "cumulative_s": round(cumulative, 6),
+            })
+        return top
+
+
+def load_profile(run_id: str, directory: str = PROFILE_DIR) -> Optional[Dict]:
+    """
+    Read a saved trace.
+
+    Args:
+        run_id (str): Run ID the trace was saved under.
+        directory (str): Folder traces are saved in.
+
+    Returns:
+        Optional[Dict]: The trace, or None if there is none (or the ID is malformed).
+    """
+    try:
+        if uuid.UUID(hex=run_id).hex != run_id:
+            return None
+    except ValueError:
+        return None
+
+    path = os.path.join(directory, f"{run_id}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
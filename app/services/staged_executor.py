@@ -0,0 +1,242 @@
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SENTINEL = object()
+_POLL_SECONDS = 0.1
+
+
+class Done:
+    """
+    Returned by a stage to finish an item early, skipping the remaining stages.
+    """
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+class Stage:
+    """
+    One step of a StagedExecutor, served by its own pool of worker threads.
+    """
+
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int = 1):
+        """
+        Args:
+            name (str): Stage name, used in thread names and logs.
+            fn (Callable): Receives the previous stage's output and returns the input
+                           for the next stage (or a Done to finish the item). It may
+                           also return a Future, which frees the worker; the item moves
+                           on once the future resolves.
+            workers (int): Number of worker threads for this stage.
+        """
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+
+
+class _StageState:
+    """
+    Per-run bookkeeping for one stage: running workers and pending futures.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.pending = 0
+        self.closed = False
+        self.lock = threading.Lock()
+
+
+class StagedExecutor:
+    """
+    Runs items through a chain of stages concurrently.
+    Stages are joined by bounded queues, so a slow stage applies backpressure
+    to the ones before it, and total time approaches that of the slowest stage
+    instead of the sum of all of them.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 8,
+                 on_error: Optional[Callable[[str, Any, Exception], Any]] = None):
+        """
+        Args:
+            stages (List[Stage]): Stages in execution order.
+            queue_size (int): Capacity of each queue between stages.
+            on_error (Callable): Called as on_error(stage_name, payload, exc) when a stage
+                                 raises; its return value becomes the item's result.
+                                 Defaults to returning the exception.
+        """
+        if not stages:
+            raise ValueError("StagedExecutor needs at least one stage.")
+
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.on_error = on_error or (lambda stage, payload, exc: exc)
+
+
+    def run(self, items: Iterable[Any]) -> Iterator[Tuple[int, Any]]:
+        """
+        Feed items through every stage.
+
+        Args:
+            items (Iterable[Any]): Inputs for the first stage.
+
+        Yields:
+            Tuple[int, Any]: (input index, final result) in completion order.
+        """
+        stop = threading.Event()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        output = queue.Queue(maxsize=self.queue_size)
+        threads = []
+
+        feeder = threading.Thread(
+            target=self._feed, args=(items, queues[0], self.stages[0].workers, stop),
+            name="stage-feed", daemon=True
+        )
+        threads.append(feeder)
+
+        for position, stage in enumerate(self.stages):
+            is_last = position == len(self.stages) - 1
+            downstream = output if is_last else queues[position + 1]
+            downstream_workers = 1 if is_last else self.stages[position + 1].workers
+            state = _StageState(stage.workers)
+
+            for n in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, queues[position], downstream, output,
+                          downstream_workers, state, stop),
+                    name=f"stage-{stage.name}-{n}",
+                    daemon=True
+                ))
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = output.get()
+                if item is _SENTINEL:
+                    break
+                yield item
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join(timeout=5)
+
+
+    def _feed(self, items: Iterable[Any], first: queue.Queue, workers: int,
+              stop: threading.Event):
+        """
+        Push inputs into the first queue, then one sentinel per first-stage worker.
+        """
+        try:
+            for index, item in enumerate(items):
+                if not self._put(first, (index, item), stop):
+                    return
+        finally:
+            for _ in range(workers):
+                self._put(first, _SENTINEL, stop)
+
+
+    def _work(self, stage: Stage, inbox: queue.Queue, downstream: queue.Queue,
+              output: queue.Queue, downstream_workers: int,
+              state: "_StageState", stop: threading.Event):
+        """
+        Worker loop for one stage. The last worker of a stage to finish
+        forwards the shutdown sentinels downstream.
+        """
+        try:
+            while not stop.is_set():
+                try:
+                    item = inbox.get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+                if item is _SENTINEL:
+                    break
+
+                index, payload = item
+                try:
+                    result = stage.fn(payload)
+                except Exception as e:
+                    logger.debug(f"Stage '{stage.name}' failed for item {index}: {e}")
+                    result = Done(self.on_error(stage.name, payload, e))
+
+                if isinstance(result, Future):
+                    with state.lock:
+                        state.pending += 1
+                    result.add_done_callback(
+                        lambda future, index=index, payload=payload: self._resolve(
+                            stage, index, payload, future, downstream, output,
+                            downstream_workers, state, stop
+                        )
+                    )
+                    continue
+
+                if not self._forward(stage, index, payload, result, downstream, output, stop):
+                    return
+        finally:
+            with state.lock:
+                state.workers -= 1
+            self._finish(downstream, downstream_workers, state, stop)
+
+
+    def _resolve(self, stage: Stage, index: int, payload: Any, future: Future,
+                 downstream: queue.Queue, output: queue.Queue, downstream_workers: int,
+                 state: "_StageState", stop: threading.Event):
+        """
+        Done-callback for a Future returned by a stage: forward its value.
+        """
+        try:
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.debug(f"Stage '{stage.name}' failed for item {index}: {e}")
+                result = Done(self.on_error(stage.name, payload, e))
+            self._forward(stage, index, payload, result, downstream, output, stop)
+        finally:
+            with state.lock:
+                state.pending -= 1
+            self._finish(downstream, downstream_workers, state, stop)
+
+
+    @classmethod
+    def _forward(cls, stage: Stage, index: int, payload: Any, result: Any,
+                 downstream: queue.Queue, output: queue.Queue, stop: threading.Event) -> bool:
+        """
+        Send a stage result to the next stage, or straight to the output if it is Done.
+        """
+        if isinstance(result, Done):
+            return cls._put(output, (index, result.value), stop)
+        return cls._put(downstream, (index, result), stop)
+
+
+    def _finish(self, downstream: queue.Queue, downstream_workers: int,
+                state: "_StageState", stop: threading.Event):
+        """
+        Forward the shutdown sentinels once every worker of the stage has
+        exited and none of its futures is still pending.
+        """
+        with state.lock:
+            if state.workers or state.pending or state.closed:
+                return
+            state.closed = True
+        for _ in range(downstream_workers):
+            self._put(downstream, _SENTINEL, stop)
+
+
+    @staticmethod
+    def _put(target: queue.Queue, item: Any, stop: threading.Event) -> bool:
+        """
+        Blocking put that gives up once the run is being torn down.
+        """
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
@@ -1,10 +1,32 @@
+import re
+import json
+import hashlib
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
 from app.clients.llm_client import LLMClient
+from app.clients.retry import RetryBudget
+from app.summarizer.summary_cache import SummaryCache
+from app.config import Config
 
 logger = logging.getLogger(__name__)
 
 MAX_CHARS = 12000
 
+# Map-reduce settings for long documents
+SUMMARY_MODE    = Config.SUMMARY_MODE
+CHUNK_CHARS     = Config.SUMMARY_CHUNK_CHARS
+CHUNK_OVERLAP   = Config.SUMMARY_CHUNK_OVERLAP
+CHUNK_WORKERS   = Config.SUMMARY_CHUNK_WORKERS
+MAX_REDUCE_DEPTH = 5
+
+# Packing of small documents into one request
+PACK_DOC_MAX_CHARS = Config.SUMMARY_PACK_DOC_MAX_CHARS
+
+PAGE_BREAK = re.compile(r"(?=--- Page \d+ ---)")
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
 SYSTEM_PROMPT = (
     "You are a professional document summarizer. "
     "Your task is to read documents and produce clear, "
@@ -12,6 +34,45 @@ SYSTEM_PROMPT = (
     "Focus on the main topics, key points, and conclusions."
 )
 
+PROMPT_TEMPLATE = (
+    "Please summarize the following document titled '{file_name}'.\n"
+    "Provide a clear and concise summary in 5 to 10 sentences, "
+    "covering the main topics, key points, and conclusions.\n\n"
+    "Document Content:\n{text}"
+)
+
+CHUNK_PROMPT_TEMPLATE = (
+    "The following is part {index} of {total} of the document titled '{file_name}'.\n"
+    "Summarize this part in 3 to 6 sentences, keeping every key point, "
+    "figure and conclusion it contains.\n\n"
+    "Document Part:\n{text}"
+)
+
+REDUCE_PROMPT_TEMPLATE = (
+    "The following are summaries of consecutive parts of the document titled '{file_name}'.\n"
+    "Combine them into a single clear and concise summary in 5 to 10 sentences, "
+    "covering the main topics, key points, and conclusions of the whole document.\n\n"
+    "Part Summaries:\n{text}"
+)
+
+PACKED_PROMPT_TEMPLATE = (
+    "Summarize each of the following {count} documents separately.\n"
+    "For each document provide a clear and concise summary in 5 to 10 sentences, "
+    "covering its main topics, key points, and conclusions.\n"
+    "Respond with a JSON object only. Use each document's title exactly as given "
+    "as the key and its summary as the value.\n\n"
+    "{documents}"
+)
+
+PACKED_DOCUMENT_TEMPLATE = "=== Document: {file_name} ===\n{text}\n"
+
+GROUP_PROMPT_TEMPLATE = (
+    "The following are summaries of consecutive parts of the document titled '{file_name}'.\n"
+    "Merge them into one summary of 4 to 8 sentences that keeps every key point, "
+    "figure and conclusion.\n\n"
+    "Part Summaries:\n{text}"
+)
+
 
 class AISummarizer:
     """
@@ -20,25 +81,65 @@ class AISummarizer:
     all summarization business logic.
     """
 
-    def __init__(self, llm_client: LLMClient = None):
+    def __init__(self, llm_client: LLMClient = None,
+                 cache: Optional[SummaryCache] = None,
+                 use_cache: bool = Config.SUMMARY_CACHE_ENABLED,
+                 mode: str = SUMMARY_MODE,
+                 chunk_chars: int = CHUNK_CHARS,
+                 chunk_overlap: int = CHUNK_OVERLAP,
+                 chunk_workers: int = CHUNK_WORKERS):
         """
         Initialize AISummarizer with an LLMClient instance.
 
         Args:
             llm_client (LLMClient): Optional existing LLMClient instance.
                                     Creates a new one if not provided.
+            cache (SummaryCache): Optional existing summary cache.
+            use_cache (bool): Open the configured summary cache when none is given.
+            mode (str): 'truncate' to cut long documents at MAX_CHARS, or
+                        'chunked' to map-reduce over the whole document.
+            chunk_chars (int): Maximum characters per chunk in chunked mode.
+            chunk_overlap (int): Characters repeated from the previous chunk.
+            chunk_workers (int): Chunks summarized in parallel.
         """
+        if mode not in ("truncate", "chunked"):
+            raise ValueError(f"Unknown summary mode: '{mode}'. Use 'truncate' or 'chunked'.")
+
         self.llm = llm_client or LLMClient()
+        self.mode = mode
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = min(chunk_overlap, chunk_chars // 2)
+        self.chunk_workers = max(1, chunk_workers)
+        if cache is None and use_cache:
+            cache = SummaryCache(Config.SUMMARY_CACHE_PATH, Config.SUMMARY_CACHE_MAX_BYTES)
+        self.cache = cache
         logger.info("AISummarizer initialized.")
 
 
-    def summarize(self, text: str, file_name: str = "document") -> str:
+    @property
+    def text_budget(self) -> Optional[int]:
+        """
+        Characters of a document this summarizer actually uses (None = all of it).
+        Parsers can stop extracting once they have this much text. One extra
+        character is requested so truncation is still detected and noted.
+        """
+        return MAX_CHARS + 1 if self.mode == "truncate" else None
+
+
+    def summarize(self, text: str, file_name: str = "document",
+                  bypass_cache: bool = False,
+                  retry_budget: Optional[RetryBudget] = None) -> str:
         """
         Summarize a single document's text.
+        Identical content summarized with the same settings is served
+        from the summary cache without calling the LLM.
 
         Args:
             text (str): Extracted text content from the document.
             file_name (str): Name of the document file (used in prompt).
+            bypass_cache (bool): Skip the cache lookup and always call the LLM.
+                                 The fresh summary still replaces the cached one.
+            retry_budget (RetryBudget): Optional retry allowance shared across a run.
 
         Returns:
             str: A 5–10 sentence summary of the document.
@@ -47,19 +148,421 @@ class AISummarizer:
             logger.warning(f"Empty text provided for '{file_name}'. Skipping summarization.")
             return "No content available to summarize."
 
-        truncated_text = self._truncate(text)
-        user_prompt = self._build_prompt(truncated_text, file_name)
+        cache_key = self._cache_key(text) if self.cache else None
+        if cache_key and not bypass_cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Summary cache hit for: '{file_name}'")
+                return cached
 
         logger.info(f"Summarizing document: '{file_name}'")
-        summary = self.llm.chat(
-            system_prompt=SYSTEM_PROMPT,
-            user_prompt=user_prompt
-        )
+        if self.mode == "chunked" and len(text) > self.chunk_chars:
+            summary = self._summarize_chunked(text, file_name, retry_budget)
+        else:
+            truncated_text = self._truncate(text, self._max_chars)
+            user_prompt = self._build_prompt(truncated_text, file_name)
+            summary = self.llm.chat(
+                system_prompt=SYSTEM_PROMPT,
+                user_prompt=user_prompt,
+                retry_budget=retry_budget
+            )
+
+        if cache_key:
+            self.cache.set(cache_key, summary)
 
         logger.info(f"Summarization complete for: '{file_name}'")
         return summary
 
 
+    def is_packable(self, text: str) -> bool:
+        """
+        Whether a document is small enough to share a request with others.
+
+        Args:
+            text (str): Extracted text content.
+
+        Returns:
+            bool: True if the text is non-empty and at most PACK_DOC_MAX_CHARS long.
+        """
+        return bool(text and text.strip()) and len(text) <= PACK_DOC_MAX_CHARS
+
+
+    def summarize_packed(self, documents: List[Tuple[str, str]],
+                         bypass_cache: bool = False,
+                         retry_budget: Optional[RetryBudget] = None,
+                         return_exceptions: bool = False) -> List[Union[str, Exception]]:
+        """
+        Summarize several small documents with a single chat request.
+        The model answers with a JSON object keyed by file name, which is split
+        back into per-document summaries. Documents missing from the answer, or
+        all of them if the JSON is malformed, are summarized one at a time.
+
+        Args:
+            documents (List[Tuple[str, str]]): (file_name, text) pairs.
+            bypass_cache (bool): Skip the cache lookup and always call the LLM.
+            retry_budget (RetryBudget): Optional retry allowance shared across a run.
+            return_exceptions (bool): Put a document's exception in its slot
+                                      instead of raising it.
+
+        Returns:
+            List[Union[str, Exception]]: Summaries in the same order as documents.
+        """
+        summaries: List[Optional[Union[str, Exception]]] = [None] * len(documents)
+        keys: Dict[int, str] = {}
+        pending = []
+
+        for i, (file_name, text) in enumerate(documents):
+            if not text or not text.strip():
+                summaries[i] = "No content available to summarize."
+                continue
+            if self.cache:
+                keys[i] = self._cache_key(text, packed=True)
+                cached = None if bypass_cache else self.cache.get(keys[i])
+                if cached is not None:
+                    logger.info(f"Summary cache hit for: '{file_name}'")
+                    summaries[i] = cached
+                    continue
+            pending.append(i)
+
+        if len(pending) > 1:
+            labels = self._pack_labels([documents[i][0] for i in pending])
+            answers = self._request_pack(
+                [(label, documents[i][1]) for label, i in zip(labels, pending)], retry_budget
+            )
+            for label, i in zip(labels, pending):
+                summary = answers.get(label)
+                if isinstance(summary, str) and summary.strip():
+                    summaries[i] = summary.strip()
+                    if i in keys:
+                        self.cache.set(keys[i], summaries[i])
+
+        # Fall back to one request per document for anything not answered
+        for i in pending:
+            if summaries[i] is not None:
+                continue
+            file_name, text = documents[i]
+            try:
+                summaries[i] = self.summarize(text, file_name, bypass_cache, retry_budget)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                summaries[i] = e
+
+        return summaries
+
+
+    def _request_pack(self, documents: List[Tuple[str, str]],
+                      retry_budget: Optional[RetryBudget] = None) -> Dict[str, str]:
+        """
+        Send one packed request and parse its JSON answer.
+
+        Args:
+            documents (List[Tuple[str, str]]): (unique label, text) pairs.
+            retry_budget (RetryBudget): Optional retry allowance shared across a run.
+
+        Returns:
+            Dict[str, str]: Summaries by label; empty if the request or the JSON failed.
+        """
+        names = ", ".join(f"'{label}'" for label, _ in documents)
+        logger.info(f"Summarizing {len(documents)} documents in one request: {names}")
+        user_prompt = PACKED_PROMPT_TEMPLATE.format(
+            count=len(documents),
+            documents="\n".join(
+                PACKED_DOCUMENT_TEMPLATE.format(file_name=label, text=text)
+                for label, text in documents
+            ),
+        )
+
+        try:
+            response = self.llm.chat(
+                system_prompt=SYSTEM_PROMPT,
+                user_prompt=user_prompt,
+                retry_budget=retry_budget,
+                response_format={"type": "json_object"}
+            )
+        except RuntimeError as e:
+            logger.warning(f"Packed request failed, summarizing individually: {e}")
+            return {}
+
+        try:
+            answers = json.loads(response)
+        except ValueError:
+            answers = None
+        if not isinstance(answers, dict):
+            logger.warning("Packed response was not a JSON object, summarizing individually.")
+            return {}
+
+        missing = [label for label, _ in documents if label not in answers]
+        if missing:
+            logger.warning(f"Packed response is missing {len(missing)} documents: {missing}")
+        return answers
+
+
+    @staticmethod
+    def _pack_labels(file_names: List[str]) -> List[str]:
+        """
+        Make file names unique so they can serve as JSON keys ('a.txt', 'a.txt (2)').
+        """
+        seen: Dict[str, int] = {}
+        labels = []
+        for name in file_names:
+            seen[name] = seen.get(name, 0) + 1
+            labels.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+        return labels
+
+
+    def single_request_prompts(self, text: str, file_name: str) -> Tuple[str, str]:
+        """
+        System and user prompt summarizing a document in one request, as in
+        truncate mode. Used where chunking is not possible, e.g. the Batch API.
+
+        Args:
+            text (str): Extracted text content.
+            file_name (str): Name of the document file.
+
+        Returns:
+            Tuple[str, str]: (system prompt, user prompt).
+        """
+        return SYSTEM_PROMPT, self._build_prompt(self._truncate(text), file_name)
+
+
+    def cache_key(self, text: str, single_request: bool = False) -> Optional[str]:
+        """
+        Summary cache key for a document, for callers that produce summaries
+        outside summarize (e.g. a batch job) and store them in self.cache.
+
+        Args:
+            text (str): Extracted text content.
+            single_request (bool): Key for a summary made with single_request_prompts.
+
+        Returns:
+            Optional[str]: Cache key, or None if caching is disabled.
+        """
+        if not self.cache:
+            return None
+        return self._cache_key(text, mode="truncate" if single_request else None)
+
+
+    def _cache_key(self, text: str, packed: bool = False, mode: Optional[str] = None) -> str:
+        """
+        Build the summary cache key from the text and every setting
+        that changes the model's output.
+
+        Args:
+            text (str): Document text content.
+            packed (bool): Key for a summary produced by a packed request.
+            mode (str): Summary mode to key for; defaults to the summarizer's mode.
+
+        Returns:
+            str: Cache key.
+        """
+        return SummaryCache.make_key(text, **self._summary_settings(packed, mode))
+
+
+    def settings_fingerprint(self) -> str:
+        """
+        Hash of every setting that changes the summaries this summarizer
+        produces (the same ones the summary cache keys on), so stored
+        summaries can be invalidated when any of them changes.
+
+        Returns:
+            str: Hex SHA-256 digest.
+        """
+        settings = {
+            "summary": self._summary_settings(),
+            "packed": self._summary_settings(packed=True),
+        }
+        payload = json.dumps(settings, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+    def _summary_settings(self, packed: bool = False, mode: Optional[str] = None) -> Dict:
+        """
+        Settings that change the model's output for a summary.
+
+        Args:
+            packed (bool): Settings of a packed request.
+            mode (str): Summary mode; defaults to the summarizer's mode.
+
+        Returns:
+            Dict: Settings passed to SummaryCache.make_key.
+        """
+        mode = mode or self.mode
+        if packed:
+            return {
+                "model": self.llm.model,
+                "temperature": self.llm.temperature,
+                "system_prompt": SYSTEM_PROMPT,
+                "packed_prompt_template": PACKED_PROMPT_TEMPLATE,
+            }
+        return {
+            "model": self.llm.model,
+            "temperature": self.llm.temperature,
+            "system_prompt": SYSTEM_PROMPT,
+            "prompt_template": PROMPT_TEMPLATE,
+            "max_chars": MAX_CHARS,
+            "mode": mode,
+            "chunking": (
+                [CHUNK_PROMPT_TEMPLATE, GROUP_PROMPT_TEMPLATE, REDUCE_PROMPT_TEMPLATE,
+                 self.chunk_chars, self.chunk_overlap]
+                if mode == "chunked" else None
+            ),
+        }
+
+
+    # ------------------------------------------------------------------
+    # Chunked (map-reduce) summarization
+    # ------------------------------------------------------------------
+
+    def _summarize_chunked(self, text: str, file_name: str,
+                           retry_budget: Optional[RetryBudget] = None) -> str:
+        """
+        Summarize a long document by summarizing its chunks in parallel (map),
+        then combining the partial summaries (reduce). If the partial summaries
+        are still too long they are grouped and reduced again.
+
+        Args:
+            text (str): Full document text.
+            file_name (str): Name of the document file.
+            retry_budget (RetryBudget): Optional retry allowance shared across a run.
+
+        Returns:
+            str: Summary covering the whole document.
+        """
+        chunks = self._split_chunks(text)
+        logger.info(f"Chunked summarization of '{file_name}': {len(chunks)} chunks.")
+
+        prompts = [
+            CHUNK_PROMPT_TEMPLATE.format(
+                index=i, total=len(chunks), file_name=file_name, text=chunk
+            )
+            for i, chunk in enumerate(chunks, start=1)
+        ]
+        partials = self._chat_many(prompts, retry_budget)
+
+        for depth in range(1, MAX_REDUCE_DEPTH + 1):
+            combined = self._join_partials(partials)
+            if len(combined) <= self.chunk_chars:
+                break
+
+            groups = self._pack(partials)
+            if len(groups) >= len(partials):
+                # Partial summaries are individually too large to group; stop recursing.
+                break
+
+            logger.info(f"Reduce level {depth} for '{file_name}': {len(partials)} -> {len(groups)}")
+            prompts = [
+                GROUP_PROMPT_TEMPLATE.format(file_name=file_name, text=self._join_partials(group))
+                for group in groups
+            ]
+            partials = self._chat_many(prompts, retry_budget)
+
+        combined = self._truncate(self._join_partials(partials), self._max_chars)
+        return self.llm.chat(
+            system_prompt=SYSTEM_PROMPT,
+            user_prompt=REDUCE_PROMPT_TEMPLATE.format(file_name=file_name, text=combined),
+            retry_budget=retry_budget
+        )
+
+
+    def _chat_many(self, prompts: List[str],
+                   retry_budget: Optional[RetryBudget] = None) -> List[str]:
+        """
+        Send several prompts with bounded parallelism, keeping their order.
+
+        Args:
+            prompts (List[str]): User prompts.
+            retry_budget (RetryBudget): Optional retry allowance shared across a run.
+
+        Returns:
+            List[str]: Responses in the same order as prompts.
+        """
+        def ask(prompt: str) -> str:
+            return self.llm.chat(
+                system_prompt=SYSTEM_PROMPT, user_prompt=prompt, retry_budget=retry_budget
+            )
+
+        if self.chunk_workers == 1 or len(prompts) == 1:
+            return [ask(p) for p in prompts]
+
+        with ThreadPoolExecutor(max_workers=min(self.chunk_workers, len(prompts))) as executor:
+            return list(executor.map(ask, prompts))
+
+
+    def _split_chunks(self, text: str) -> List[str]:
+        """
+        Split text into chunks of at most chunk_chars, breaking on page
+        markers first, then paragraphs, and only mid-text as a last resort.
+        Each chunk after the first starts with the tail of the previous one.
+
+        Args:
+            text (str): Full document text.
+
+        Returns:
+            List[str]: Chunks in document order.
+        """
+        body = self.chunk_chars - self.chunk_overlap
+        units = []
+        for page in PAGE_BREAK.split(text):
+            if len(page) <= body:
+                units.append(page)
+                continue
+            for para in PARAGRAPH_BREAK.split(page):
+                if len(para) <= body:
+                    units.append(para + "\n\n")
+                else:
+                    units.extend(para[i:i + body] for i in range(0, len(para), body))
+
+        chunks = []
+        current = ""
+        for unit in units:
+            if current and len(current) + len(unit) > body:
+                chunks.append(current)
+                current = ""
+            current += unit
+        if current.strip():
+            chunks.append(current)
+
+        if self.chunk_overlap:
+            chunks = [chunks[0]] + [
+                chunks[i - 1][-self.chunk_overlap:] + chunks[i]
+                for i in range(1, len(chunks))
+            ]
+        return [c.strip() for c in chunks if c.strip()]
+
+
+    def _pack(self, partials: List[str]) -> List[List[str]]:
+        """
+        Group consecutive partial summaries so each group fits in chunk_chars.
+
+        Args:
+            partials (List[str]): Partial summaries in document order.
+
+        Returns:
+            List[List[str]]: Groups of partial summaries.
+        """
+        groups = []
+        current = []
+        size = 0
+        for partial in partials:
+            if current and size + len(partial) > self.chunk_chars:
+                groups.append(current)
+                current, size = [], 0
+            current.append(partial)
+            size += len(partial) + 2
+        if current:
+            groups.append(current)
+        return groups
+
+
+    @staticmethod
+    def _join_partials(partials: List[str]) -> str:
+        """
+        Join partial summaries into a single block of text.
+        """
+        return "\n\n".join(partials)
+
+
     def _build_prompt(self, text: str, file_name: str) -> str:
         """
         Build the user prompt for summarization.
@@ -71,27 +574,34 @@ class AISummarizer:
         Returns:
             str: Formatted prompt.
         """
-        return (
-            f"Please summarize the following document titled '{file_name}'.\n"
-            f"Provide a clear and concise summary in 5 to 10 sentences, "
-            f"covering the main topics, key points, and conclusions.\n\n"
-            f"Document Content:\n{text}"
-        )
+        return PROMPT_TEMPLATE.format(file_name=file_name, text=text)
+
+    @property
+    def _max_chars(self) -> int:
+        """
+        Characters sent in a single request. Chunked mode never cuts below
+        chunk_chars, since anything up to a chunk is meant to be sent whole.
+        """
+        if self.mode == "chunked":
+            return max(MAX_CHARS, self.chunk_chars)
+        return MAX_CHARS
+
 
-    def _truncate(self, text: str) -> str:
+    def _truncate(self, text: str, max_chars: int = MAX_CHARS) -> str:
         """
-        Truncate text to MAX_CHARS to avoid exceeding token limits.
+        Truncate text to max_chars to avoid exceeding token limits.
 
         Args:
             text (str): Original document text.
+            max_chars (int): Characters to keep.
 
         Returns:
             str: Truncated text with a note if truncation occurred.
         """
-        if len(text) <= MAX_CHARS:
+        if len(text) <= max_chars:
             return text
 
         logger.warning(
-            f"Text truncated from {len(text)} to {MAX_CHARS} characters."
+            f"Text truncated from {len(text)} to {max_chars} characters."
         )
-        return text[:MAX_CHARS] + "\n\n[Note: Document was truncated due to length.]"
\ No newline at end of file
+        return text[:max_chars] + "\n\n[Note: Document was truncated due to length.]"
\ No newline at end of file
@@ -0,0 +1,293 @@
+import re
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+NEAR_DUPLICATE_ENABLED     = Config.NEAR_DUPLICATE_ENABLED
+NEAR_DUPLICATE_THRESHOLD   = Config.NEAR_DUPLICATE_THRESHOLD
+NEAR_DUPLICATE_MAX_ENTRIES = Config.NEAR_DUPLICATE_MAX_ENTRIES
+NEAR_DUPLICATE_CROSS_FOLDER = Config.NEAR_DUPLICATE_CROSS_FOLDER
+
+# MinHash signature length and its LSH split: 16 bands of 8 rows make pairs
+# above ~0.7 similarity likely candidates (a 0.9 pair is missed ~0.002% of the time)
+NUM_PERM   = 128
+LSH_BANDS  = 16
+
+# Words per shingle
+SHINGLE_SIZE = 5
+
+# Shingles hashed per NumPy block, bounding memory to NUM_PERM x BLOCK values
+HASH_BLOCK = 4096
+
+# Fixed seed so signatures are comparable across processes
+HASH_SEED = 0x5EED
+
+_WORD = re.compile(r"\w+")
+_SHINGLE_BASE = np.uint64(1099511628211)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+
+class FingerprintEntry:
+    """
+    A fingerprinted document. Its `summary` future resolves to the summary
+    once the document is summarized, or to None if that failed.
+    """
+
+    def __init__(self, entry_id: int, file_name: str, file_id: Optional[str],
+                 folder_id: Optional[str], signature: np.ndarray):
+        self.entry_id = entry_id
+        self.file_name = file_name
+        self.file_id = file_id
+        self.folder_id = folder_id
+        self.signature = signature
+        self.summary: Future = Future()
+
+
+class NearDuplicateIndex:
+    """
+    In-memory MinHash/LSH index of summarized documents.
+    Documents are reduced to word-shingle MinHash signatures (hashed in
+    vectorized NumPy blocks); LSH banding finds candidate neighbours without
+    comparing against every entry, and candidates are confirmed by their
+    estimated Jaccard similarity. Oldest entries are evicted past max_entries.
+    Matches are limited to the same folder unless cross_folder is set, and a
+    file never matches an earlier version of itself; only its latest version
+    stays indexed.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUPLICATE_THRESHOLD,
+                 num_perm: int = NUM_PERM, bands: int = LSH_BANDS,
+                 shingle_size: int = SHINGLE_SIZE,
+                 max_entries: int = NEAR_DUPLICATE_MAX_ENTRIES,
+                 cross_folder: bool = NEAR_DUPLICATE_CROSS_FOLDER):
+        """
+        Args:
+            threshold (float): Minimum estimated similarity (0-1) to count as a duplicate.
+            num_perm (int): MinHash signature length.
+            bands (int): LSH bands; must divide num_perm.
+            shingle_size (int): Words per shingle.
+            max_entries (int): Entries kept before the oldest are evicted.
+            cross_folder (bool): Match documents from other folders too.
+
+        Raises:
+            ValueError: If bands does not divide num_perm.
+        """
+        if num_perm % bands:
+            raise ValueError(f"LSH bands ({bands}) must divide num_perm ({num_perm}).")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = max(1, shingle_size)
+        self.max_entries = max(1, max_entries)
+        self.cross_folder = cross_folder
+
+        # Multiply-shift hash family: h(x) = (a * x + b) >> 32 with odd a
+        rng = np.random.default_rng(HASH_SEED)
+        self._a = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64, endpoint=False) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64, endpoint=False)
+
+        self._entries: "OrderedDict[int, FingerprintEntry]" = OrderedDict()
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(bands)]
+        self._by_file_id: Dict[str, int] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Compute the MinHash signature of a text.
+
+        Args:
+            text (str): Document text.
+
+        Returns:
+            Optional[np.ndarray]: uint32 signature of length num_perm, or None
+            if the text has no words.
+        """
+        shingles = self._shingles(text)
+        if shingles is None:
+            return None
+
+        signature = np.full(self.num_perm, _MAX_HASH, dtype=np.uint64)
+        a = self._a[:, None]
+        b = self._b[:, None]
+        for start in range(0, len(shingles), HASH_BLOCK):
+            block = shingles[start:start + HASH_BLOCK][None, :]
+            # uint64 arithmetic wraps, i.e. is mod 2^64
+            hashes = (a * block + b) >> np.uint64(32)
+            np.minimum(signature, hashes.min(axis=1), out=signature)
+        return signature.astype(np.uint32)
+
+
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        """
+        Estimated Jaccard similarity of two signatures.
+        """
+        return float(np.count_nonzero(first == second)) / self.num_perm
+
+
+    def find_or_add(self, signature: np.ndarray, file_name: str,
+                    file_id: Optional[str] = None, folder_id: Optional[str] = None
+                    ) -> Tuple[FingerprintEntry, Optional[float]]:
+        """
+        Find the most similar indexed document, or index this one if there is
+        none above the threshold. Both happen under one lock, so of two
+        near-duplicates arriving together only one is summarized. Entries of
+        the same file_id (earlier versions of the file) are never matched and
+        are dropped from the index.
+
+        Args:
+            signature (np.ndarray): MinHash signature from signature().
+            file_name (str): Name of the document.
+            file_id (str): Google Drive file ID.
+            folder_id (str): Drive folder of the document (limits matches
+                             unless cross_folder is set).
+
+        Returns:
+            Tuple[FingerprintEntry, Optional[float]]: (neighbour, similarity)
+            on a match, otherwise (new entry, None). A new entry's summary must
+            be resolved by the caller (see FingerprintEntry).
+        """
+        keys = self._band_keys(signature)
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(keys):
+                candidates.update(self._buckets[band].get(key, ()))
+
+            best, best_similarity = None, 0.0
+            for entry_id in candidates:
+                entry = self._entries[entry_id]
+                if file_id is not None and entry.file_id == file_id:
+                    continue
+                if not self.cross_folder and entry.folder_id != folder_id:
+                    continue
+                similarity = self.similarity(signature, entry.signature)
+                if similarity > best_similarity:
+                    best, best_similarity = entry, similarity
+
+            self._forget_file(file_id)
+            if best is not None and best_similarity >= self.threshold:
+                self._entries.move_to_end(best.entry_id)
+                return best, best_similarity
+
+            entry = FingerprintEntry(self._next_id, file_name, file_id, folder_id, signature)
+            self._next_id += 1
+            self._entries[entry.entry_id] = entry
+            if file_id is not None:
+                self._by_file_id[file_id] = entry.entry_id
+            for band, key in enumerate(keys):
+                self._buckets[band].setdefault(key, []).append(entry.entry_id)
+
+            while len(self._entries) > self.max_entries:
+                _, oldest = self._entries.popitem(last=False)
+                self._unlink(oldest)
+            return entry, None
+
+
+    def discard(self, entry: FingerprintEntry):
+        """
+        Remove an entry (e.g. one whose summary failed) so it is no longer matched.
+        """
+        with self._lock:
+            if self._entries.pop(entry.entry_id, None) is not None:
+                self._unlink(entry)
+
+
+    def _shingles(self, text: str) -> Optional[np.ndarray]:
+        """
+        Distinct 64-bit hashes of the text's word shingles.
+        Each distinct word is hashed once; shingle hashes are then combined
+        from the word hashes with a polynomial over whole arrays.
+        """
+        words = _WORD.findall(text.lower())
+        if not words:
+            return None
+
+        word_hashes: Dict[str, int] = {}
+        for word in words:
+            if word not in word_hashes:
+                word_hashes[word] = int.from_bytes(
+                    hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little"
+                )
+        hashes = np.fromiter((word_hashes[w] for w in words), dtype=np.uint64, count=len(words))
+
+        size = min(self.shingle_size, len(hashes))
+        count = len(hashes) - size + 1
+        shingles = hashes[:count].copy()
+        for offset in range(1, size):
+            shingles = shingles * _SHINGLE_BASE + hashes[offset:offset + count]
+        return np.unique(shingles)
+
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+
+    def _forget_file(self, file_id: Optional[str]):
+        """
+        Remove the indexed version of a file; callers hold the lock.
+        """
+        entry_id = self._by_file_id.get(file_id) if file_id is not None else None
+        if entry_id is None:
+            return
+        entry = self._entries.pop(entry_id, None)
+        if entry is not None:
+            self._unlink(entry)
+
+
+    def _unlink(self, entry: FingerprintEntry):
+        """
+        Drop an entry from the LSH buckets and the file_id map; callers hold the lock.
+        """
+        if entry.file_id is not None and self._by_file_id.get(entry.file_id) == entry.entry_id:
+            del self._by_file_id[entry.file_id]
+        for band, key in enumerate(self._band_keys(entry.signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket is None:
+                continue
+            try:
+                bucket.remove(entry.entry_id)
+            except ValueError:
+                pass
+            if not bucket:
+                del self._buckets[band][key]
+
+
+_default_index: Optional[NearDuplicateIndex] = None
+_default_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    """
+    Return the process-wide NearDuplicateIndex, so summaries are reused
+    across runs and folders.
+
+    Returns:
+        Optional[NearDuplicateIndex]: Shared index built from Config, or None if disabled.
+    """
+    global _default_index
+    if not NEAR_DUPLICATE_ENABLED:
+        return None
+    with _default_index_lock:
+        if _default_index is None:
+            _default_index = NearDuplicateIndex()
+        return _default_index
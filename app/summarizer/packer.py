@@ -0,0 +1,121 @@
+import logging
+import threading
+from concurrent.futures import Future
+from typing import List, Optional, Tuple
+
+from app.clients.retry import RetryBudget
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+PACK_MAX_CHARS = Config.SUMMARY_PACK_MAX_CHARS
+PACK_MAX_DOCS  = Config.SUMMARY_PACK_MAX_DOCS
+PACK_LINGER    = Config.SUMMARY_PACK_LINGER
+
+
+class DocumentPacker:
+    """
+    Collects small documents and summarizes them in packed requests.
+    A pack is sent as soon as it reaches max_chars or max_docs, or once its
+    first document has waited linger seconds, so a trickle of documents is
+    never held back for long.
+    """
+
+    def __init__(self, summarizer, max_chars: int = PACK_MAX_CHARS,
+                 max_docs: int = PACK_MAX_DOCS, linger: float = PACK_LINGER,
+                 retry_budget: Optional[RetryBudget] = None):
+        """
+        Args:
+            summarizer (AISummarizer): Summarizer used for the packed requests.
+            max_chars (int): Character budget of one packed request.
+            max_docs (int): Maximum documents per packed request.
+            linger (float): Seconds to wait for more documents before sending a partial pack.
+            retry_budget (RetryBudget): Optional retry allowance shared across a run.
+        """
+        self.summarizer = summarizer
+        self.max_chars = max_chars
+        self.max_docs = max(1, max_docs)
+        self.linger = linger
+        self.retry_budget = retry_budget
+
+        self._pending: List[Tuple[str, str, Future]] = []
+        self._size = 0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+
+    def submit(self, file_name: str, text: str) -> Future:
+        """
+        Queue a document for the next pack.
+
+        Args:
+            file_name (str): Name of the document.
+            text (str): Extracted text content.
+
+        Returns:
+            Future: Resolves to the document's summary.
+        """
+        future = Future()
+        batches = []
+        with self._lock:
+            # Send what is queued first if this document would overflow the pack
+            if self._pending and self._size + len(text) > self.max_chars:
+                batches.append(self._take())
+
+            self._pending.append((file_name, text, future))
+            self._size += len(text)
+
+            if self._size >= self.max_chars or len(self._pending) >= self.max_docs:
+                batches.append(self._take())
+            elif self._timer is None:
+                self._timer = threading.Timer(self.linger, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        for batch in batches:
+            self._send(batch)
+        return future
+
+
+    def flush(self):
+        """
+        Send whatever is queued now.
+        """
+        with self._lock:
+            batch = self._take()
+        self._send(batch)
+
+
+    def _take(self) -> List[Tuple[str, str, Future]]:
+        """
+        Remove and return the queued documents. Caller must hold the lock.
+        """
+        batch, self._pending, self._size = self._pending, [], 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return batch
+
+
+    def _send(self, batch: List[Tuple[str, str, Future]]):
+        """
+        Summarize one pack and resolve its futures.
+        """
+        if not batch:
+            return
+
+        try:
+            summaries = self.summarizer.summarize_packed(
+                [(file_name, text) for file_name, text, _ in batch],
+                retry_budget=self.retry_budget,
+                return_exceptions=True
+            )
+        except Exception as e:
+            logger.error(f"Packed summarization failed: {e}")
+            summaries = [e] * len(batch)
+
+        for (_, _, future), summary in zip(batch, summaries):
+            if isinstance(summary, Exception):
+                future.set_exception(summary)
+            else:
+                future.set_result(summary)
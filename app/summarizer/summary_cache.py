@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryCache:
+    """
+    Content-addressed on-disk cache of summaries, backed by SQLite.
+    Entries are keyed by a hash of the normalized document text plus every
+    setting that influences the summary, and evicted least-recently-used
+    once the stored summaries exceed max_bytes.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): Location of the SQLite database file.
+            max_bytes (int): Upper bound on the total size of stored summaries.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY,"
+            " summary TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_summaries_last_access ON summaries(last_access)"
+        )
+        self._conn.commit()
+        logger.info(f"Summary cache opened: {path}")
+
+
+    @staticmethod
+    def make_key(text: str, **params) -> str:
+        """
+        Build the cache key for a document.
+
+        Args:
+            text (str): Document text. Whitespace is normalized before hashing.
+            **params: Settings that affect the summary (model, temperature, prompts...).
+
+        Returns:
+            str: Hex SHA-256 digest.
+        """
+        normalized = " ".join(text.split())
+        payload = json.dumps(params, sort_keys=True, default=str)
+
+        digest = hashlib.sha256()
+        digest.update(payload.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalized.encode("utf-8"))
+        return digest.hexdigest()
+
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a summary and mark it as recently used.
+
+        Args:
+            key (str): Cache key from make_key.
+
+        Returns:
+            Optional[str]: Cached summary, or None on a miss.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE summaries SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+
+    def set(self, key: str, summary: str):
+        """
+        Store a summary, evicting least-recently-used entries if over budget.
+
+        Args:
+            key (str): Cache key from make_key.
+            summary (str): Summary text to store.
+        """
+        size = len(summary.encode("utf-8"))
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, summary, size, time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+
+    def stats(self) -> Dict:
+        """
+        Return hit/miss counters and current size.
+
+        Returns:
+            Dict: hits, misses, entries, bytes.
+        """
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries"
+            ).fetchone()
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": total,
+        }
+
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._conn.close()
+
+
+    def _evict(self):
+        """
+        Delete least-recently-used entries until the cache fits in max_bytes.
+        Caller must hold the lock.
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        rows = self._conn.execute(
+            "SELECT key, size FROM summaries ORDER BY last_access ASC"
+        ).fetchall()
+
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+
+        logger.info(f"Summary cache evicted {evicted} entries.")
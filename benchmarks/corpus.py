@@ -0,0 +1,120 @@
+"""
+Synthetic document corpora for benchmarks.
+
+Documents are generated in memory from a seeded vocabulary, so the same
+arguments always produce the same corpus (and the same md5Checksums).
+"""
+import io
+import random
+from typing import List, Tuple
+
+import pymupdf
+from docx import Document
+
+PDF_MIME  = "application/pdf"
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TXT_MIME  = "text/plain"
+
+VOCABULARY = (
+    "agreement party obligation term payment invoice delivery schedule notice "
+    "liability warranty service customer supplier period renewal clause report "
+    "quarter revenue budget forecast risk review approval policy data security "
+    "access request project milestone deadline scope change budget resource"
+).split()
+
+
+def sentence(rng: random.Random, words: int = 14) -> str:
+    """
+    One pseudo-random sentence from the vocabulary.
+    """
+    text = " ".join(rng.choice(VOCABULARY) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def make_pdf(rng: random.Random, pages: int, chars_per_page: int = 2500) -> bytes:
+    """
+    PDF with `pages` pages of roughly chars_per_page characters each.
+    """
+    doc = pymupdf.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        text = ""
+        while len(text) < chars_per_page:
+            text += sentence(rng) + " "
+        page.insert_textbox(page.rect + (50, 50, -50, -50), text, fontsize=8)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_docx(rng: random.Random, paragraphs: int, table_every: int = 50) -> bytes:
+    """
+    DOCX with `paragraphs` paragraphs and a small table every table_every paragraphs.
+    """
+    doc = Document()
+    for i in range(paragraphs):
+        doc.add_paragraph(" ".join(sentence(rng) for _ in range(3)))
+        if table_every and i % table_every == table_every - 1:
+            table = doc.add_table(rows=4, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = rng.choice(VOCABULARY)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_txt(rng: random.Random, kilobytes: int) -> bytes:
+    """
+    UTF-8 text file of about `kilobytes` KB, one sentence per line.
+    """
+    lines, size = [], 0
+    while size < kilobytes * 1024:
+        line = sentence(rng) + "\n"
+        lines.append(line)
+        size += len(line)
+    return "".join(lines).encode("utf-8")
+
+
+def make_draft(rng: random.Random, content: bytes, edit_ratio: float = 0.02) -> bytes:
+    """
+    Near-identical revision of a text document: about edit_ratio of its
+    lines are rewritten.
+    """
+    lines = content.decode("utf-8").splitlines(keepends=True)
+    for i in rng.sample(range(len(lines)), max(1, int(len(lines) * edit_ratio))):
+        lines[i] = sentence(rng) + "\n"
+    return "".join(lines).encode("utf-8")
+
+
+def build_corpus(pdf: int = 10, docx: int = 10, txt: int = 10,
+                 pdf_pages: int = 5, docx_paragraphs: int = 200, txt_kb: int = 50,
+                 drafts: int = 0, seed: int = 42) -> List[Tuple[str, str, bytes]]:
+    """
+    Generate a mixed corpus.
+
+    Args:
+        pdf (int): Number of PDF documents.
+        docx (int): Number of DOCX documents.
+        txt (int): Number of TXT documents.
+        pdf_pages (int): Pages per PDF.
+        docx_paragraphs (int): Paragraphs per DOCX.
+        txt_kb (int): Size of each TXT in KB.
+        drafts (int): Near-identical revisions added per TXT document.
+        seed (int): Random seed.
+
+    Returns:
+        List[Tuple[str, str, bytes]]: (file name, MIME type, content) per document.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(pdf):
+        corpus.append((f"report-{i:04d}.pdf", PDF_MIME, make_pdf(rng, pdf_pages)))
+    for i in range(docx):
+        corpus.append((f"contract-{i:04d}.docx", DOCX_MIME, make_docx(rng, docx_paragraphs)))
+    for i in range(txt):
+        content = make_txt(rng, txt_kb)
+        corpus.append((f"notes-{i:04d}.txt", TXT_MIME, content))
+        for version in range(drafts):
+            corpus.append((f"notes-{i:04d}-v{version + 2}.txt", TXT_MIME, make_draft(rng, content)))
+    return corpus
@@ -0,0 +1,389 @@
+"""
+Benchmark: end-to-end Pipeline.run against local fake Drive and OpenAI servers.
+
+Generates a synthetic PDF/DOCX/TXT corpus, serves it from the fake Drive
+API, summarizes through the fake OpenAI API (both with optional latency and
+injected 429s), and reports throughput, p50/p95 latency per stage and peak
+RSS per stage. Results are written as JSON so runs can be compared across
+commits (--baseline prints the differences).
+
+Usage:
+    python -m benchmarks.pipeline_e2e [--pdf 10] [--docx 10] [--txt 10]
+        [--llm-latency 0.2] [--llm-429-every 0] [--drive-latency 0.01]
+        [--mode staged|sequential] [--in-memory] [--output results.json]
+        [--baseline previous.json]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import platform
+import threading
+import subprocess
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+# Measure real parsing and summarization on every run, not cache hits
+os.environ.setdefault("PARSE_CACHE_ENABLED", "false")
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from google.oauth2.credentials import Credentials
+
+from app.config import Config
+from app.clients.drive_client import DriveClient
+from app.clients.llm_client import LLMClient
+from app.summarizer.ai_summarizer import AISummarizer
+from app.services.pipeline import Pipeline
+from app.fakes.fake_drive import FakeDriveState, create_fake_drive_app
+from app.fakes.fake_openai import FakeOpenAIState, create_fake_openai_app
+from app.fakes.server import BackgroundServer
+from app.metrics import LLM_COMPLETION_TOKENS, LLM_PROMPT_TOKENS
+
+from benchmarks.corpus import build_corpus
+
+FOLDER_ID = "benchmark-folder"
+STAGES = ("list", "download", "parse", "summarize")
+
+# Seconds between RSS samples
+RSS_SAMPLE_INTERVAL = 0.01
+
+
+def current_rss() -> int:
+    """
+    Resident set size of this process in bytes (0 if unavailable).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def peak_rss() -> int:
+    """
+    Peak resident set size of this process in bytes (0 if unavailable).
+    """
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """
+    q-th percentile (0-100) with linear interpolation, or None for no values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class StageRecorder:
+    """
+    Records per-call latency of each stage, and the peak RSS sampled while
+    at least one call of that stage was running. Stages overlap in staged
+    mode, so a sample counts toward every stage active at that moment.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.peak_rss: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self._active: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+
+    @contextmanager
+    def track(self, stage: str):
+        """
+        Time the with-block as one call of `stage`.
+        """
+        with self._lock:
+            self._active[stage] += 1
+        self._record_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._record_rss()
+            with self._lock:
+                self._active[stage] -= 1
+                self.latencies[stage].append(elapsed)
+
+    def wrap(self, stage: str, fn):
+        """
+        Return fn wrapped so each call is tracked as `stage`.
+        """
+        def tracked(*args, **kwargs):
+            with self.track(stage):
+                return fn(*args, **kwargs)
+        return tracked
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Latency statistics (seconds) and peak RSS (MB) per stage.
+        """
+        report = {}
+        for stage in STAGES:
+            values = self.latencies[stage]
+            report[stage] = {
+                "calls": len(values),
+                "total_seconds": round(sum(values), 4),
+                "mean_seconds": round(sum(values) / len(values), 4) if values else None,
+                "p50_seconds": _round(percentile(values, 50)),
+                "p95_seconds": _round(percentile(values, 95)),
+                "max_seconds": _round(max(values) if values else None),
+                "peak_rss_mb": round(self.peak_rss[stage] / 1024 / 1024, 1),
+            }
+        return report
+
+    def _sample(self):
+        while not self._stop.wait(RSS_SAMPLE_INTERVAL):
+            self._record_rss()
+
+    def _record_rss(self):
+        rss = current_rss()
+        with self._lock:
+            for stage, active in self._active.items():
+                if active and rss > self.peak_rss[stage]:
+                    self.peak_rss[stage] = rss
+
+
+def git_commit() -> Optional[str]:
+    """
+    Short hash of the checked-out commit, with "-dirty" for uncommitted changes.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args) -> Dict:
+    """
+    Build the corpus, start the fakes and time one Pipeline.run.
+
+    Returns:
+        Dict: JSON-serializable benchmark report.
+    """
+    corpus = build_corpus(
+        pdf=args.pdf, docx=args.docx, txt=args.txt,
+        pdf_pages=args.pdf_pages, docx_paragraphs=args.docx_paragraphs,
+        txt_kb=args.txt_kb, drafts=args.drafts, seed=args.seed
+    )
+    corpus_bytes = sum(len(content) for _, _, content in corpus)
+
+    drive_state = FakeDriveState(
+        latency=args.drive_latency, rate_limit_every=args.drive_429_every
+    )
+    for name, mime_type, content in corpus:
+        drive_state.add_file(FOLDER_ID, name, mime_type, content)
+    del corpus
+
+    llm_state = FakeOpenAIState(
+        latency=args.llm_latency, rate_limit_every=args.llm_429_every,
+        retry_after=args.retry_after, requests_per_minute=args.llm_rpm
+    )
+
+    Config.PARSE_MODE = args.parse_mode
+    Config.DOWNLOAD_IN_MEMORY = args.in_memory
+
+    recorder = StageRecorder()
+    with BackgroundServer(create_fake_drive_app(drive_state)) as drive_server, \
+            BackgroundServer(create_fake_openai_app(llm_state)) as llm_server, \
+            tempfile.TemporaryDirectory() as download_dir:
+
+        drive_client = DriveClient(
+            credentials=Credentials(token="benchmark"),
+            api_endpoint=f"{drive_server.url}/drive/v3/"
+        )
+        llm_client = LLMClient(api_key="benchmark", base_url=f"{llm_server.url}/v1")
+        summarizer = AISummarizer(llm_client=llm_client, use_cache=False)
+        pipeline = Pipeline(
+            folder_id=FOLDER_ID,
+            download_dir=download_dir,
+            incremental=False,
+            staged=args.mode == "staged",
+            drive_client=drive_client,
+            summarizer=summarizer
+        )
+
+        drive_client.list_files = recorder.wrap("list", drive_client.list_files)
+        drive_client.download_entry = recorder.wrap("download", drive_client.download_entry)
+        pipeline._parse_file = recorder.wrap("parse", pipeline._parse_file)
+        pipeline._summarize_file = recorder.wrap("summarize", pipeline._summarize_file)
+
+        prompt_tokens = LLM_PROMPT_TOKENS.value(model=llm_client.model)
+        completion_tokens = LLM_COMPLETION_TOKENS.value(model=llm_client.model)
+
+        recorder.start()
+        start = time.perf_counter()
+        results = pipeline.run()
+        wall = time.perf_counter() - start
+        recorder.stop()
+
+    files = len(drive_state.files)
+    # Throughput counts processed files only; skipped downloads are not throughput
+    sizes = {f["metadata"]["name"]: len(f["content"]) for f in drive_state.files.values()}
+    processed = len(results)
+    processed_bytes = sum(sizes.get(r["file_name"], 0) for r in results)
+    return {
+        "benchmark": "pipeline_e2e",
+        "label": args.label,
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "corpus": {"files": files, "megabytes": round(corpus_bytes / 1024 / 1024, 2)},
+        "wall_seconds": round(wall, 4),
+        "throughput": {
+            "files_per_second": round(processed / wall, 3) if wall else None,
+            "megabytes_per_second": round(processed_bytes / 1024 / 1024 / wall, 3) if wall else None,
+        },
+        "stages": recorder.summary(),
+        "peak_rss_mb": round(peak_rss() / 1024 / 1024, 1),
+        "results": {
+            "success": sum(1 for r in results if r["status"] == "success"),
+            "error": sum(1 for r in results if r["status"] == "error"),
+            # Files whose download failed are dropped by the pipeline
+            "skipped": files - len(results),
+            "near_duplicates": sum(1 for r in results if r.get("duplicate_of")),
+        },
+        "llm": {
+            "requests": llm_state.requests,
+            "rate_limited": llm_state.rate_limited,
+            "max_in_flight": llm_state.max_in_flight,
+            # Adaptive in-flight limit reached by the end of the run
+            "concurrency_limit": (
+                llm_client.concurrency.concurrency_limit if llm_client.concurrency else None
+            ),
+            "prompt_tokens": int(LLM_PROMPT_TOKENS.value(model=llm_client.model) - prompt_tokens),
+            "completion_tokens": int(
+                LLM_COMPLETION_TOKENS.value(model=llm_client.model) - completion_tokens
+            ),
+        },
+        "drive": {
+            "requests": drive_state.requests,
+            "rate_limited": drive_state.rate_limited,
+            "bytes_served": drive_state.bytes_served,
+        },
+    }
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None):
+    """
+    Print the headline numbers, with the change against a baseline report.
+    """
+    def delta(current, previous, lower_is_better=True):
+        if baseline is None or current is None or not previous:
+            return ""
+        change = (current - previous) / previous * 100
+        better = change < 0 if lower_is_better else change > 0
+        return f"  ({change:+.1f}% {'better' if better else 'worse'})"
+
+    base_stages = (baseline or {}).get("stages", {})
+    base_throughput = (baseline or {}).get("throughput", {})
+
+    print(f"Commit {report['commit']} | {report['corpus']['files']} files, "
+          f"{report['corpus']['megabytes']} MB | mode={report['config']['mode']}")
+    print(f"Wall time: {report['wall_seconds']:.2f}s"
+          f"{delta(report['wall_seconds'], (baseline or {}).get('wall_seconds'))}")
+    files_per_second = report["throughput"]["files_per_second"]
+    print(f"Throughput: {files_per_second} files/s"
+          f"{delta(files_per_second, base_throughput.get('files_per_second'), lower_is_better=False)}")
+    print(f"Peak RSS: {report['peak_rss_mb']} MB")
+    print(f"Results: {report['results']} | LLM requests: {report['llm']['requests']} "
+          f"(429s: {report['llm']['rate_limited']}, "
+          f"max in flight: {report['llm']['max_in_flight']}, "
+          f"final limit: {report['llm']['concurrency_limit']})")
+
+    print(f"{'stage':<11}{'calls':>7}{'p50 (s)':>10}{'p95 (s)':>10}{'total (s)':>11}{'peak RSS MB':>13}")
+    for stage, stats in report["stages"].items():
+        p50 = stats["p50_seconds"]
+        p95 = stats["p95_seconds"]
+        print(
+            f"{stage:<11}{stats['calls']:>7}"
+            f"{(f'{p50:.4f}' if p50 is not None else '-'):>10}"
+            f"{(f'{p95:.4f}' if p95 is not None else '-'):>10}"
+            f"{stats['total_seconds']:>11.3f}{stats['peak_rss_mb']:>13}"
+            f"{delta(p95, base_stages.get(stage, {}).get('p95_seconds'))}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pdf", type=int, default=10, help="PDF documents")
+    parser.add_argument("--docx", type=int, default=10, help="DOCX documents")
+    parser.add_argument("--txt", type=int, default=10, help="TXT documents")
+    parser.add_argument("--pdf-pages", type=int, default=5)
+    parser.add_argument("--docx-paragraphs", type=int, default=200)
+    parser.add_argument("--txt-kb", type=int, default=50)
+    parser.add_argument("--drafts", type=int, default=0, help="Near-identical revisions per TXT document")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drive-latency", type=float, default=0.01, help="Seconds per Drive request")
+    parser.add_argument("--drive-429-every", type=int, default=0, help="Throttle every N-th Drive request")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds per chat completion")
+    parser.add_argument("--llm-429-every", type=int, default=0, help="Throttle every N-th chat request")
+    parser.add_argument("--llm-rpm", type=int, default=0,
+                        help="Fake per-minute request quota, reported in x-ratelimit headers (0 = none)")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Retry-After on injected 429s")
+    parser.add_argument("--mode", choices=("staged", "sequential"),
+                        default="staged" if Config.PIPELINE_STAGED else "sequential")
+    parser.add_argument("--parse-mode", choices=("inline", "process"), default=Config.PARSE_MODE)
+    parser.add_argument("--in-memory", action="store_true", help="Parse from download buffers")
+    parser.add_argument("--label", default=None, help="Free-form name stored in the report")
+    parser.add_argument("--output", default=None, help="Report path (default: benchmarks/results/)")
+    parser.add_argument("--baseline", default=None, help="Earlier report to compare against")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+
+    output = args.output or os.path.join(
+        "benchmarks", "results",
+        f"pipeline-{time.strftime('%Y%m%d-%H%M%S')}-{report['commit'] or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(report, baseline)
+    print(f"Report written to {output}")
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import json
+import os
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+import app.parser.parse_cache as parse_cache
+from app.clients.drive_client import DriveClient
+from app.clients.llm_client import LLMClient
+from app.config import Config
+from app.fakes.fake_drive import FakeDriveState, create_fake_drive_app
+from app.fakes.fake_openai import FakeOpenAIState, create_fake_openai_app
+from app.fakes.server import BackgroundServer
+from app.services.backfill_state import BackfillState
+from app.services.pipeline import Pipeline
+from app.summarizer.ai_summarizer import AISummarizer
+
+FOLDER_ID = "backfill-folder"
+
+
+@pytest.fixture
+def fakes(tmp_path, monkeypatch):
+    """
+    Fake Drive folder of three text files and a fake OpenAI Batch API.
+    """
+    monkeypatch.setattr(Config, "BACKFILL_STATE_DIR", str(tmp_path / "backfill"))
+    monkeypatch.setattr(Config, "BACKFILL_POLL_INTERVAL", 0.05)
+    monkeypatch.setattr(parse_cache, "PARSE_CACHE_ENABLED", False)
+
+    drive_state = FakeDriveState()
+    for index in range(3):
+        drive_state.add_file(
+            FOLDER_ID, f"doc{index}.txt", "text/plain",
+            f"Document {index} talks about topic {index}.".encode("utf-8")
+        )
+    llm_state = FakeOpenAIState()
+
+    with BackgroundServer(create_fake_drive_app(drive_state)) as drive_server, \
+            BackgroundServer(create_fake_openai_app(llm_state)) as llm_server:
+
+        def make_pipeline() -> Pipeline:
+            drive_client = DriveClient(
+                credentials=Credentials(token="test"),
+                api_endpoint=f"{drive_server.url}/drive/v3/"
+            )
+            llm_client = LLMClient(api_key="test", base_url=f"{llm_server.url}/v1")
+            return Pipeline(
+                folder_id=FOLDER_ID,
+                download_dir=str(tmp_path / "downloads"),
+                incremental=False,
+                drive_client=drive_client,
+                summarizer=AISummarizer(llm_client=llm_client, use_cache=False),
+                backfill=True,
+            )
+
+        yield llm_state, make_pipeline
+
+
+def _state_path() -> str:
+    return os.path.join(Config.BACKFILL_STATE_DIR, f"{FOLDER_ID}.json")
+
+
+def test_backfill_summarizes_through_one_batch_and_clears_state(fakes):
+    llm_state, make_pipeline = fakes
+
+    results = make_pipeline().run()
+
+    assert [r["status"] for r in results] == ["success"] * 3
+    assert all(r["summary"].startswith("Summary:") for r in results)
+    assert len(llm_state.batches) == 1
+    assert llm_state.requests == 0
+    assert not os.path.exists(_state_path())
+
+
+def test_backfill_resumes_saved_batches_without_resubmitting(fakes, monkeypatch):
+    """
+    A run interrupted after submitting leaves its batch in BackfillState;
+    the next run collects that batch instead of paying for a new one.
+    """
+    llm_state, make_pipeline = fakes
+
+    def crash(*args, **kwargs):
+        raise RuntimeError("process stopped")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Pipeline, "_collect_backfill", crash)
+        with pytest.raises(RuntimeError):
+            make_pipeline().run()
+
+    assert len(BackfillState(_state_path()).pending()) == 1
+
+    results = make_pipeline().run()
+
+    assert [r["status"] for r in results] == ["success"] * 3
+    assert len(llm_state.batches) == 1
+    assert not os.path.exists(_state_path())
+
+
+@pytest.mark.parametrize("status", ["failed", "expired"])
+def test_unfinished_batch_reports_every_file_as_failed(fakes, status):
+    llm_state, make_pipeline = fakes
+    llm_state.batch_status = status
+
+    results = make_pipeline().run()
+
+    assert [r["status"] for r in results] == ["error"] * 3
+    assert all(status in r["error"] for r in results)
+    assert not os.path.exists(_state_path())
+
+
+def test_failed_request_only_fails_its_own_file(fakes):
+    llm_state, make_pipeline = fakes
+    pipeline = make_pipeline()
+    failing = pipeline.drive_client.list_files(FOLDER_ID)[0]
+    llm_state.fail_custom_ids.add(failing["id"])
+
+    results = {r["file_name"]: r for r in pipeline.run()}
+
+    assert results[failing["name"]]["status"] == "error"
+    assert sum(r["status"] == "success" for r in results.values()) == 2
+
+
+def test_chunk_requests_splits_on_count_and_size(monkeypatch):
+    monkeypatch.setattr(Config, "BACKFILL_MAX_REQUESTS", 3)
+    monkeypatch.setattr(Config, "BACKFILL_MAX_FILE_BYTES", 250)
+    requests = [
+        ({"id": str(i)}, None, json.dumps({"custom_id": str(i), "body": "x" * 90}) + "\n")
+        for i in range(7)
+    ]
+
+    chunks = list(Pipeline._chunk_requests(requests))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 2, 1]
+    assert [r for chunk in chunks for r in chunk] == requests
+    assert all(sum(len(line.encode("utf-8")) for _, _, line in chunk) <= 250 for chunk in chunks)
+
+    monkeypatch.setattr(Config, "BACKFILL_MAX_FILE_BYTES", 10_000)
+    assert [len(chunk) for chunk in Pipeline._chunk_requests(requests)] == [3, 3, 1]
@@ -0,0 +1,47 @@
+import random
+
+from app.summarizer.near_duplicates import NearDuplicateIndex
+
+
+def _document(seed: int, words: int = 3000) -> list:
+    rng = random.Random(seed)
+    return [f"w{rng.randrange(50000)}" for _ in range(words)]
+
+
+def _edit(words: list, changes: int, seed: int) -> list:
+    rng = random.Random(seed)
+    edited = list(words)
+    for position in rng.sample(range(len(edited)), changes):
+        edited[position] = f"edit{position}"
+    return edited
+
+
+def test_edited_file_does_not_match_its_previous_version():
+    index = NearDuplicateIndex(threshold=0.9)
+    original = _document(1)
+
+    entry, similarity = index.find_or_add(index.signature(" ".join(original)), "f1.txt", "F1", "folder")
+    assert similarity is None
+    entry.summary.set_result("OLD SUMMARY")
+
+    edited = " ".join(_edit(original, 15, seed=2))
+    match, similarity = index.find_or_add(index.signature(edited), "f1.txt", "F1", "folder")
+
+    assert similarity is None
+    assert match is not entry
+    assert len(index) == 1
+
+
+def test_two_different_drafts_share_a_summary():
+    index = NearDuplicateIndex(threshold=0.9)
+    original = _document(1)
+
+    entry, _ = index.find_or_add(index.signature(" ".join(original)), "draft1.txt", "F1", "folder")
+    entry.summary.set_result("DRAFT SUMMARY")
+
+    draft = " ".join(_edit(original, 15, seed=2))
+    match, similarity = index.find_or_add(index.signature(draft), "draft2.txt", "F2", "folder")
+
+    assert match is entry
+    assert similarity >= 0.9
+    assert match.summary.result() == "DRAFT SUMMARY"
@@ -0,0 +1,40 @@
+import asyncio
+import random
+
+from app.clients.rate_limiter import (
+    AdaptiveConcurrencyController, get_default_limiter, get_rate_budget,
+)
+
+
+def test_fast_first_response_does_not_pin_latency_baseline():
+    """
+    One fast early call followed by slower (document-size dependent) but
+    healthy calls must not stop the limit from growing.
+    """
+    rng = random.Random(0)
+    controller = AdaptiveConcurrencyController("test-baseline", min_limit=1, max_limit=32, initial_limit=4)
+
+    controller.record_success({}, 0.5)
+    for _ in range(2000):
+        controller.record_success({}, rng.uniform(2.0, 10.0))
+
+    assert controller.concurrency_limit == 32
+
+
+def test_rate_limit_halves_the_limit():
+    controller = AdaptiveConcurrencyController("test-429", min_limit=1, max_limit=32, initial_limit=8)
+
+    controller.record_rate_limited()
+
+    assert controller.concurrency_limit == 4
+
+
+def test_each_event_loop_gets_its_own_limiter_on_the_shared_budget():
+    async def current_limiter():
+        return get_default_limiter()
+
+    first = asyncio.run(current_limiter())
+    second = asyncio.run(current_limiter())
+
+    assert first is not second
+    assert first.budget is second.budget is get_rate_budget()